@@ -1,5 +1,6 @@
 from pydantic_settings import BaseSettings
 from functools import lru_cache
+from typing import List, Literal, Optional
 import yaml
 from pathlib import Path
 
@@ -8,6 +9,15 @@ class Settings(BaseSettings):
     REDDIT_CLIENT_ID: str
     REDDIT_CLIENT_SECRET: str
     REDDIT_USER_AGENT: str
+    # Subreddits per combined a+b+c listing (1 scans each on its own), and how
+    # many listings are read at once
+    REDDIT_COMBINED_CHUNK_SIZE: int = 5
+    REDDIT_LISTING_CONCURRENCY: int = 3
+    # Push-style ingestion of new comments, alongside the scheduled scans
+    REDDIT_COMMENT_STREAM_ENABLED: bool = False
+    REDDIT_COMMENT_STREAM_QUEUE_SIZE: int = 5000
+    REDDIT_COMMENT_STREAM_BATCH_SIZE: int = 200
+    REDDIT_COMMENT_STREAM_FLUSH_SECONDS: float = 300
     
     # Resend Email Configuration
     RESEND_API_KEY: str
@@ -17,6 +27,63 @@ class Settings(BaseSettings):
     # Scan Configuration
     SCAN_INTERVAL_MINUTES: int
     
+    # Platform clients are kept between scans and rebuilt after this long
+    CLIENT_MAX_AGE_MINUTES: int = 360
+    
+    # Local state (watermarks, caches) kept in SQLite
+    STATE_DB_PATH: str = "sociallist.db"
+    
+    # Incremental scanning: only items newer than each source's watermark are
+    # fetched, going back at most WATERMARK_MAX_LOOKBACK_MINUTES
+    WATERMARKS_ENABLED: bool = True
+    WATERMARK_MAX_LOOKBACK_MINUTES: int = 1440
+    
+    # Matched posts already handled by an earlier scan are dropped before the
+    # AI filter and email; they are remembered for DEDUP_TTL_HOURS
+    DEDUP_ENABLED: bool = True
+    DEDUP_TTL_HOURS: int = 72
+    DEDUP_FILTER_CAPACITY: int = 100000
+    DEDUP_FILTER_ERROR_RATE: float = 0.01
+    
+    # Platform calls failing with network or server errors are retried with
+    # jittered exponential backoff. After CIRCUIT_FAILURE_THRESHOLD failures in
+    # a row a platform's calls fail fast for CIRCUIT_RESET_SECONDS
+    RETRY_ATTEMPTS: int = 2
+    RETRY_BASE_DELAY_SECONDS: float = 1
+    RETRY_MAX_DELAY_SECONDS: float = 30
+    CIRCUIT_FAILURE_THRESHOLD: int = 5
+    CIRCUIT_RESET_SECONDS: float = 300
+    
+    # Worker threads for the platforms whose SDKs only make blocking calls
+    YOUTUBE_EXECUTOR_WORKERS: int = 8
+    INSTAGRAM_EXECUTOR_WORKERS: int = 2
+    # Builds platform services, whose constructors do blocking setup
+    CLIENT_EXECUTOR_WORKERS: int = 2
+    # Encodes texts for the semantic matcher; one worker keeps the model's phrase cache single-threaded
+    SEMANTIC_EXECUTOR_WORKERS: int = 1
+    
+    # Per-platform deadlines for the aggregate scan, in seconds
+    REDDIT_SCAN_DEADLINE_SECONDS: float = 300
+    TWITTER_SCAN_DEADLINE_SECONDS: float = 600
+    BLUESKY_SCAN_DEADLINE_SECONDS: float = 120
+    YOUTUBE_SCAN_DEADLINE_SECONDS: float = 300
+    INSTAGRAM_SCAN_DEADLINE_SECONDS: float = 600
+    
+    # How long finished scan jobs stay available for polling
+    SCAN_JOB_RETENTION_MINUTES: int = 60
+    
+    # In-process Scheduler Configuration
+    SCHEDULER_ENABLED: bool = False
+    SCHEDULER_PLATFORMS: List[str] = ["reddit", "twitter", "bluesky", "youtube"]
+    SCHEDULER_JITTER_SECONDS: float = 60
+    SCHEDULER_APPLY_AI_FILTER: bool = False
+    # Per-platform run intervals, defaulting to SCAN_INTERVAL_MINUTES
+    REDDIT_SCAN_INTERVAL_MINUTES: Optional[int] = None
+    TWITTER_SCAN_INTERVAL_MINUTES: Optional[int] = None
+    BLUESKY_SCAN_INTERVAL_MINUTES: Optional[int] = None
+    YOUTUBE_SCAN_INTERVAL_MINUTES: Optional[int] = None
+    INSTAGRAM_SCAN_INTERVAL_MINUTES: Optional[int] = None
+    
     # API Authentication
     API_USERNAME: str
     API_PASSWORD: str
@@ -25,22 +92,79 @@ class Settings(BaseSettings):
     TWITTER_USERNAME: str
     TWITTER_PASSWORD: str
     TWITTER_EMAIL: str
+    # Outbound request pacing per account: a token bucket plus a random gap
+    # between consecutive requests
+    TWITTER_REQUESTS_PER_MINUTE: float = 20
+    TWITTER_REQUEST_BURST: int = 3
+    TWITTER_REQUEST_DELAY_MIN_SECONDS: float = 2
+    TWITTER_REQUEST_DELAY_MAX_SECONDS: float = 5
+    # Communities scanned at once, result pages followed per community, and the
+    # longest a quiet community goes without being polled
+    TWITTER_COMMUNITY_CONCURRENCY: int = 3
+    TWITTER_MAX_PAGES: int = 10
+    TWITTER_MAX_POLL_INTERVAL_MINUTES: int = 240
     
     # Bluesky Configuration
     BLUESKY_EMAIL: str
     BLUESKY_PASSWORD: str 
+    BLUESKY_FEED_CONCURRENCY: int = 4
+    BLUESKY_MAX_FEED_PAGES: int = 20
+    # Feed generators can surface a post well after newer ones, so a feed's
+    # watermark is held this far behind the newest post read
+    BLUESKY_FEED_LOOKBACK_MINUTES: int = 60
+    # Push-based ingestion from the public Jetstream firehose
+    BLUESKY_JETSTREAM_ENABLED: bool = False
+    BLUESKY_JETSTREAM_URL: str = "wss://jetstream2.us-east.bsky.network/subscribe"
+    BLUESKY_JETSTREAM_QUEUE_SIZE: int = 10000
+    BLUESKY_JETSTREAM_BATCH_SIZE: int = 500
+    BLUESKY_JETSTREAM_FLUSH_SECONDS: float = 300
 
     # Youtube Configuration
     YOUTUBE_API_KEY: str
+    # "uploads" reads each channel's uploads playlist (1 quota unit),
+    # "search" uses search.list (100 units)
+    YOUTUBE_CRAWL_MODE: Literal["uploads", "search"] = "uploads"
+    # Units this process may spend per day, and how many videos are paged at once
+    YOUTUBE_DAILY_QUOTA: int = 10000
+    YOUTUBE_VIDEO_CONCURRENCY: int = 4
     
     # Instagram Configuration
     INSTAGRAM_USERNAME: str
     INSTAGRAM_PASSWORD: str
     INSTAGRAM_EMAIL: str
     INSTAGRAM_EMAIL_PASSWORD: str
+    INSTAGRAM_REQUESTS_PER_MINUTE: float = 15
+    INSTAGRAM_REQUEST_BURST: int = 3
+    INSTAGRAM_REQUEST_DELAY_MIN_SECONDS: float = 2
+    INSTAGRAM_REQUEST_DELAY_MAX_SECONDS: float = 5
+    # How long looked-up user ids and reel listings are reused. A cached
+    # listing only holds which reels an account has; their comment counts are
+    # looked up again on every scan
+    INSTAGRAM_USER_ID_TTL_HOURS: int = 720
+    INSTAGRAM_REELS_TTL_MINUTES: int = 60
     
     # OpenAI Configuration
     OPENAI_API_KEY: str
+    OPENAI_MODEL: str = "gpt-4-turbo-preview"
+    # Posts evaluated per request (1 sends each post on its own), requests in
+    # flight at once, and the account's rate limits
+    OPENAI_BATCH_SIZE: int = 1
+    OPENAI_CONCURRENCY: int = 4
+    OPENAI_REQUESTS_PER_MINUTE: int = 500
+    OPENAI_TOKENS_PER_MINUTE: int = 30000
+    # Whether a post the filter couldn't evaluate is sent on anyway
+    OPENAI_KEEP_ON_ERROR: bool = True
+    # Verdicts are remembered by normalized title and content, model and prompt
+    # version, for OPENAI_VERDICT_CACHE_TTL_HOURS
+    OPENAI_VERDICT_CACHE_ENABLED: bool = True
+    OPENAI_VERDICT_CACHE_TTL_HOURS: int = 168
+    OPENAI_VERDICT_CACHE_MAX_ENTRIES: int = 50000
+    
+    # Semantic Matching Configuration
+    SEMANTIC_MATCHING_ENABLED: bool = False
+    SEMANTIC_MODEL_NAME: str = "all-MiniLM-L6-v2"
+    SEMANTIC_THRESHOLD: float = 0.8
+    SEMANTIC_BATCH_SIZE: int = 64
     
     class Config:
         env_file = ".env"
@@ -1,12 +1,40 @@
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
-from .routers import reddit, twitter, bluesky, youtube, instagram, aggregate
+from .routers import reddit, twitter, bluesky, youtube, instagram, aggregate, scan_jobs, scheduler, metrics
 from .middleware.auth_middleware import BasicAuthMiddleware
 from .config.settings import get_settings
+from .services.scan_jobs import get_scan_job_manager
+from .services.scan_runner import get_client_registry
+from .services.scheduler import get_scan_scheduler
+from .services.bluesky_jetstream import get_jetstream_consumer
+from .services.reddit_comment_stream import get_reddit_comment_stream
+from .services.blocking import shutdown_executors
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    settings = get_settings()
+    if settings.SCHEDULER_ENABLED:
+        get_scan_scheduler().start()
+    if settings.BLUESKY_JETSTREAM_ENABLED:
+        get_jetstream_consumer().start()
+    if settings.REDDIT_COMMENT_STREAM_ENABLED:
+        get_reddit_comment_stream().start()
+    yield
+    if settings.SCHEDULER_ENABLED:
+        await get_scan_scheduler().stop()
+    if settings.BLUESKY_JETSTREAM_ENABLED:
+        await get_jetstream_consumer().stop()
+    if settings.REDDIT_COMMENT_STREAM_ENABLED:
+        await get_reddit_comment_stream().stop()
+    await get_scan_job_manager().shutdown()
+    await get_client_registry().close()
+    shutdown_executors()
 
 app = FastAPI(
     title="Social Listener",
     description="Social media monitoring tool",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan
 )
 
 # Retrieve settings
@@ -26,6 +54,9 @@ app.include_router(bluesky.router)
 app.include_router(youtube.router)
 app.include_router(instagram.router)
 app.include_router(aggregate.router)
+app.include_router(scan_jobs.router)
+app.include_router(scheduler.router)
+app.include_router(metrics.router)
 
 @app.get("/")
 async def root():
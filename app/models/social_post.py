@@ -17,3 +17,4 @@ class SocialPost(BaseModel):
     likes: Optional[int] = None      # Twitter likes
     retweets: Optional[int] = None   # Twitter retweets
     video_id: Optional[str] = None  # YouTube specific  
+    post_id: Optional[str] = None  # Native id where the URL is shared or varies between sources
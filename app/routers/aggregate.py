@@ -1,13 +1,10 @@
-from fastapi import APIRouter, HTTPException
-from ..services.reddit_service import RedditService
-from ..services.twitter_service import TwitterService
-from ..services.bluesky_service import BlueskyService
-from ..services.youtube_service import YouTubeService
-from ..services.email_service import send_notification
+from fastapi import APIRouter, HTTPException, Query
+from ..services.scan_runner import scan_platforms, filter_and_notify, AGGREGATE_PLATFORMS
+from ..services.scan_stream import streaming_scan_response
+from ..schemas.responses import AggregateScanResponse
 from ..models.social_post import SocialPost
-from typing import List
+from typing import List, Literal
 import logging
-from ..services.openai_service import OpenAIService
 
 router = APIRouter(
     prefix="/aggregate",
@@ -19,51 +16,49 @@ logger = logging.getLogger("uvicorn")
 @router.get("/scan", response_model=List[SocialPost])
 async def scan_all(apply_ai_filter: bool = False):
     """
-    Scan all platforms (excluding Instagram) for posts matching keywords
-    within the configured time interval.
+    Scan all platforms (excluding Instagram) concurrently for posts matching
+    keywords within the configured time interval.
+    
+    Each platform runs under its own deadline. A platform that times out or
+    fails contributes the matches it found so far. Use /aggregate/scan/report
+    to also get each platform's outcome.
     
     Parameters:
-        apply_ai_filter (bool): Whether to apply OpenAI filtering (default: True)
+        apply_ai_filter (bool): Whether to apply OpenAI filtering (default: False)
     """
     logger.info("Starting aggregate scan endpoint")
-    try:
-        # Get initial matches from all services
-        reddit_service = RedditService()
-        twitter_service = TwitterService()
-        bluesky_service = BlueskyService()
-        youtube_service = YouTubeService()
+    return (await _scan(apply_ai_filter)).posts
 
-        # Collect all initial matches
-        all_posts = (
-            await reddit_service.get_matching_posts() +
-            await twitter_service.get_matching_posts() +
-            await bluesky_service.get_matching_posts() +
-            await youtube_service.get_matching_posts()
-        )
-        
-        if all_posts:
-            logger.info(f"Found {len(all_posts)} initial matches")
-            
-            if apply_ai_filter:
-                # Apply OpenAI filter
-                openai_service = OpenAIService()
-                filtered_posts = await openai_service.filter_promotion_worthy(all_posts)
-                
-                if filtered_posts:
-                    logger.info(f"After AI filtering: {len(filtered_posts)} promotion-worthy posts")
-                    await send_notification(filtered_posts)
-                else:
-                    logger.info("No posts passed AI filtering")
-                    
-                return filtered_posts
-            else:
-                logger.info("Skipping AI filtering as requested")
-                await send_notification(all_posts)
-                return all_posts
-        else:
-            logger.info("No initial matches found")
-            return []
+@router.get("/scan/report", response_model=AggregateScanResponse)
+async def scan_all_with_report(apply_ai_filter: bool = False):
+    """
+    Same scan as /aggregate/scan, returning the posts together with a status
+    block per platform: ok, timeout, error or degraded, posts found, duration
+    and error.
+    
+    Parameters:
+        apply_ai_filter (bool): Whether to apply OpenAI filtering (default: False)
+    """
+    logger.info("Starting aggregate scan report endpoint")
+    return await _scan(apply_ai_filter)
+
+async def _scan(apply_ai_filter: bool) -> AggregateScanResponse:
+    try:
+        # Collect initial matches from all services concurrently
+        all_posts, platforms = await scan_platforms(AGGREGATE_PLATFORMS)
+        posts = await filter_and_notify(all_posts, apply_ai_filter)
+        return AggregateScanResponse(posts=posts, platforms=platforms)
             
     except Exception as e:
         logger.error(f"Aggregate scan failed: {str(e)}")
-        raise HTTPException(status_code=500, detail=str(e)) 
\ No newline at end of file
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.get("/scan/stream")
+async def stream_all(stream_format: Literal["ndjson", "sse"] = Query("ndjson", alias="format")):
+    """
+    Stream matches from all platforms (excluding Instagram) as they are found,
+    with progress events per source and a status event per platform, as NDJSON
+    or Server-Sent Events. The AI filter is not applied to streamed posts.
+    """
+    logger.info("Starting aggregate streaming scan endpoint")
+    return streaming_scan_response(AGGREGATE_PLATFORMS, stream_format)
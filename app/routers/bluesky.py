@@ -1,8 +1,12 @@
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, HTTPException, Query
 from ..services.bluesky_service import BlueskyService
-from ..services.email_service import send_notification
+from ..services.scan_runner import filter_and_notify, get_client_registry
+from ..services.scan_stream import streaming_scan_response
+from ..services.bluesky_jetstream import get_jetstream_consumer
+from ..schemas.responses import StreamStatus
+from ..config.settings import get_settings
 from ..models.social_post import SocialPost
-from typing import List
+from typing import List, Literal
 import logging
 
 router = APIRouter(
@@ -20,16 +24,35 @@ async def scan_bluesky():
     """
     logger.info("Starting Bluesky scan endpoint")
     try:
-        bluesky_service = BlueskyService()
-        posts = await bluesky_service.get_matching_posts()
+        async with get_client_registry().lease("bluesky", BlueskyService) as bluesky_service:
+            posts = await bluesky_service.get_matching_posts()
         
         if posts:
-            logger.info(f"Found {len(posts)} matching posts, sending email notification")
-            await send_notification(posts)
+            logger.info(f"Found {len(posts)} matching posts, notifying about new ones")
+            await filter_and_notify(posts, apply_ai_filter=False)
         else:
             logger.info("No matching posts found")
         
         return posts
     except Exception as e:
         logger.error(f"Bluesky scan failed: {str(e)}")
-        raise HTTPException(status_code=500, detail=str(e)) 
\ No newline at end of file
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.get("/scan/stream")
+async def stream_bluesky(stream_format: Literal["ndjson", "sse"] = Query("ndjson", alias="format")):
+    """
+    Stream Bluesky posts from configured feeds as they are matched,
+    followed by a progress event per source, as NDJSON or Server-Sent Events
+    """
+    logger.info("Starting Bluesky streaming scan endpoint")
+    return streaming_scan_response(["bluesky"], stream_format)
+
+@router.get("/jetstream", response_model=StreamStatus)
+async def jetstream_status():
+    """
+    Get the state of the Jetstream firehose consumer.
+    Idle when BLUESKY_JETSTREAM_ENABLED is off.
+    """
+    if not get_settings().BLUESKY_JETSTREAM_ENABLED:
+        return StreamStatus()
+    return get_jetstream_consumer().status()
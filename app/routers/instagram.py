@@ -1,8 +1,9 @@
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, HTTPException, Query
 from ..services.instagram_service import InstagramService
-from ..services.email_service import send_notification
+from ..services.scan_runner import filter_and_notify, get_client_registry
+from ..services.scan_stream import streaming_scan_response
 from ..models.social_post import SocialPost
-from typing import List
+from typing import List, Literal
 import logging
 
 router = APIRouter(
@@ -20,16 +21,25 @@ async def scan_instagram():
     """
     logger.info("Starting Instagram scan endpoint")
     try:
-        instagram_service = InstagramService()
-        posts = await instagram_service.get_matching_posts()
+        async with get_client_registry().lease("instagram", InstagramService) as instagram_service:
+            posts = await instagram_service.get_matching_posts()
         
         if posts:
-            logger.info(f"Found {len(posts)} matching posts, sending email notification")
-            await send_notification(posts)
+            logger.info(f"Found {len(posts)} matching posts, notifying about new ones")
+            await filter_and_notify(posts, apply_ai_filter=False)
         else:
             logger.info("No matching posts found")
         
         return posts
     except Exception as e:
         logger.error(f"Instagram scan failed: {str(e)}")
-        raise HTTPException(status_code=500, detail=str(e)) 
\ No newline at end of file
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.get("/scan/stream")
+async def stream_instagram(stream_format: Literal["ndjson", "sse"] = Query("ndjson", alias="format")):
+    """
+    Stream comments from configured Instagram accounts' reels as they are matched,
+    followed by a progress event per source, as NDJSON or Server-Sent Events
+    """
+    logger.info("Starting Instagram streaming scan endpoint")
+    return streaming_scan_response(["instagram"], stream_format)
@@ -0,0 +1,48 @@
+from fastapi import APIRouter
+from ..services.blocking import executor_stats
+from ..services.pacing import pacer_stats
+from ..services.resilience import breaker_stats
+from ..services.verdict_cache import get_verdict_cache
+from ..services.youtube_quota import get_youtube_quota
+from ..schemas.responses import CircuitStats, ExecutorStats, PacerStats, QuotaStatus, VerdictCacheStats
+from typing import List
+
+router = APIRouter(
+    prefix="/metrics",
+    tags=["metrics"]
+)
+
+@router.get("/executors", response_model=List[ExecutorStats])
+async def get_executor_stats():
+    """
+    Get queued, in-flight and finished blocking SDK calls per platform executor
+    """
+    return executor_stats()
+
+@router.get("/pacing", response_model=List[PacerStats])
+async def get_pacer_stats():
+    """
+    Get requests sent and time spent waiting per platform account pacer
+    """
+    return pacer_stats()
+
+@router.get("/circuits", response_model=List[CircuitStats])
+async def get_circuit_stats():
+    """
+    Get the circuit breaker state of each platform that has made calls
+    """
+    return breaker_stats()
+
+@router.get("/youtube-quota", response_model=QuotaStatus)
+async def get_youtube_quota_status():
+    """
+    Get the YouTube Data API units spent today and when the quota resets
+    """
+    return await get_youtube_quota().status()
+
+@router.get("/openai-cache", response_model=VerdictCacheStats)
+async def get_verdict_cache_stats():
+    """
+    Get the size of the OpenAI verdict cache and its hits and misses since startup
+    """
+    return await get_verdict_cache().stats()
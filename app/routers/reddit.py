@@ -1,8 +1,12 @@
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, HTTPException, Query
 from ..services.reddit_service import RedditService
-from ..services.email_service import send_notification
+from ..services.scan_runner import filter_and_notify, get_client_registry
+from ..services.scan_stream import streaming_scan_response
+from ..services.reddit_comment_stream import get_reddit_comment_stream
+from ..config.settings import get_settings
+from ..schemas.responses import StreamStatus
 from ..models.social_post import SocialPost
-from typing import List
+from typing import List, Literal
 import logging
 
 router = APIRouter(
@@ -20,12 +24,12 @@ async def scan_subreddits():
     """
     logger.info("Starting Reddit scan endpoint")
     try:
-        reddit_service = RedditService()
-        posts = await reddit_service.get_matching_posts()
+        async with get_client_registry().lease("reddit", RedditService) as reddit_service:
+            posts = await reddit_service.get_matching_posts()
         
         if posts:
-            logger.info(f"Found {len(posts)} matching posts, sending email notification")
-            await send_notification(posts)
+            logger.info(f"Found {len(posts)} matching posts, notifying about new ones")
+            await filter_and_notify(posts, apply_ai_filter=False)
         else:
             logger.info("No matching posts found")
         
@@ -33,3 +37,22 @@ async def scan_subreddits():
     except Exception as e:
         logger.error(f"Reddit scan failed: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
+
+@router.get("/scan/stream")
+async def stream_subreddits(stream_format: Literal["ndjson", "sse"] = Query("ndjson", alias="format")):
+    """
+    Stream posts from configured subreddits as they are matched,
+    followed by a progress event per source, as NDJSON or Server-Sent Events
+    """
+    logger.info("Starting Reddit streaming scan endpoint")
+    return streaming_scan_response(["reddit"], stream_format)
+
+@router.get("/comments/stream", response_model=StreamStatus)
+async def comment_stream_status():
+    """
+    Get the state of the comment stream consumer.
+    Idle when REDDIT_COMMENT_STREAM_ENABLED is off.
+    """
+    if not get_settings().REDDIT_COMMENT_STREAM_ENABLED:
+        return StreamStatus()
+    return get_reddit_comment_stream().status()
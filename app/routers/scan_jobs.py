@@ -0,0 +1,48 @@
+from fastapi import APIRouter, HTTPException, Response, status
+from ..services.scan_jobs import get_scan_job_manager
+from ..schemas.responses import ScanJobRequest, ScanJobStatus
+from typing import Optional
+import logging
+
+router = APIRouter(
+    prefix="/scan-jobs",
+    tags=["scan-jobs"]
+)
+
+logger = logging.getLogger("uvicorn")
+
+@router.post("", response_model=ScanJobStatus, status_code=status.HTTP_202_ACCEPTED)
+async def create_scan_job(request: ScanJobRequest, response: Response):
+    """
+    Start a scan in the background and return its job right away.
+    
+    The scope is "aggregate" or a single platform. If a job for the same scope
+    is already running, that job is returned instead of starting another, and
+    its results are filtered as this request asks. The Location header points
+    at the job with this request's apply_ai_filter setting.
+    """
+    logger.info(f"Scan job requested for scope: {request.scope}")
+    try:
+        job, created = get_scan_job_manager().submit(request.scope, request.apply_ai_filter)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    response.headers["Location"] = f"/scan-jobs/{job.id}?apply_ai_filter={str(request.apply_ai_filter).lower()}"
+    if not created:
+        response.status_code = status.HTTP_200_OK
+    return job.snapshot(request.apply_ai_filter)
+
+@router.get("/{job_id}", response_model=ScanJobStatus)
+async def get_scan_job(job_id: str, apply_ai_filter: Optional[bool] = None):
+    """
+    Get a scan job's progress, per-platform timings and matched posts.
+    apply_ai_filter picks the filtered or unfiltered results of a finished job,
+    defaulting to the setting the job was started with. Results with a setting
+    no requester asked for are filtered on first request.
+    """
+    job = get_scan_job_manager().get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Scan job not found")
+    if apply_ai_filter is not None:
+        await job.ensure_view(apply_ai_filter)
+    return job.snapshot(apply_ai_filter)
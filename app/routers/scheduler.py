@@ -0,0 +1,20 @@
+from fastapi import APIRouter
+from ..services.scheduler import get_scan_scheduler
+from ..schemas.responses import ScheduledPlatformStatus
+from ..config.settings import get_settings
+from typing import List
+
+router = APIRouter(
+    prefix="/scheduler",
+    tags=["scheduler"]
+)
+
+@router.get("", response_model=List[ScheduledPlatformStatus])
+async def get_schedule():
+    """
+    Get the in-process scheduler's last and next run for each platform.
+    Empty when SCHEDULER_ENABLED is off.
+    """
+    if not get_settings().SCHEDULER_ENABLED:
+        return []
+    return get_scan_scheduler().status()
@@ -1,8 +1,9 @@
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, HTTPException, Query
 from ..services.twitter_service import TwitterService
-from ..services.email_service import send_notification
+from ..services.scan_runner import filter_and_notify, get_client_registry
+from ..services.scan_stream import streaming_scan_response
 from ..models.social_post import SocialPost
-from typing import List
+from typing import List, Literal
 import logging
 
 router = APIRouter(
@@ -20,16 +21,25 @@ async def scan_communities():
     """
     logger.info("Starting Twitter communities scan endpoint")
     try:
-        twitter_service = TwitterService()
-        posts = await twitter_service.get_matching_posts()
+        async with get_client_registry().lease("twitter", TwitterService) as twitter_service:
+            posts = await twitter_service.get_matching_posts()
         
         if posts:
-            logger.info(f"Found {len(posts)} matching posts, sending email notification")
-            await send_notification(posts)
+            logger.info(f"Found {len(posts)} matching posts, notifying about new ones")
+            await filter_and_notify(posts, apply_ai_filter=False)
         else:
             logger.info("No matching posts found")
         
         return posts
     except Exception as e:
         logger.error(f"Twitter scan failed: {str(e)}")
-        raise HTTPException(status_code=500, detail=str(e)) 
\ No newline at end of file
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.get("/communities/stream")
+async def stream_communities(stream_format: Literal["ndjson", "sse"] = Query("ndjson", alias="format")):
+    """
+    Stream posts from configured Twitter communities as they are matched,
+    followed by a progress event per source, as NDJSON or Server-Sent Events
+    """
+    logger.info("Starting Twitter communities streaming scan endpoint")
+    return streaming_scan_response(["twitter"], stream_format)
@@ -0,0 +1,92 @@
+from pydantic import BaseModel
+from datetime import datetime
+from typing import Dict, List, Optional
+from ..models.social_post import SocialPost
+
+class PlatformScanStatus(BaseModel):
+    status: str  # "ok", "degraded", "timeout" or "error"
+    posts_found: int = 0
+    duration_seconds: float
+    error: Optional[str] = None
+
+class AggregateScanResponse(BaseModel):
+    posts: List[SocialPost]
+    platforms: Dict[str, PlatformScanStatus]
+
+class ScanJobRequest(BaseModel):
+    scope: str = "aggregate"  # "aggregate" or a platform name
+    apply_ai_filter: bool = False
+
+class ScanJobStatus(BaseModel):
+    id: str
+    scope: str
+    apply_ai_filter: bool
+    status: str  # "running", "completed", "failed" or "cancelled"
+    created_at: datetime
+    finished_at: Optional[datetime] = None
+    sources_scanned: int = 0
+    platforms: Dict[str, PlatformScanStatus]
+    posts: List[SocialPost]
+    error: Optional[str] = None
+
+class ScheduledPlatformStatus(BaseModel):
+    platform: str
+    interval_minutes: int
+    next_run_at: Optional[datetime] = None
+    last_run_started_at: Optional[datetime] = None
+    last_run_finished_at: Optional[datetime] = None
+    last_run_duration_seconds: Optional[float] = None
+    last_run_status: Optional[str] = None
+    last_job_id: Optional[str] = None
+    runs: int = 0
+    skipped_runs: int = 0
+
+class StreamStatus(BaseModel):
+    running: bool = False
+    connected: bool = False
+    checkpoint: Optional[datetime] = None  # time of the last item handed to notification
+    messages_received: int = 0
+    posts_matched: int = 0
+    queue_depth: int = 0
+    pending_matches: int = 0
+    reconnects: int = 0
+    last_error: Optional[str] = None
+
+class ExecutorStats(BaseModel):
+    platform: str
+    max_workers: int
+    queued: int  # waiting for a free worker
+    in_flight: int
+    peak_in_flight: int
+    completed: int
+    failed: int
+    busy_seconds: float
+
+class PacerStats(BaseModel):
+    platform: str
+    account: str
+    requests_per_minute: float
+    burst: int
+    requests: int
+    waited_seconds: float
+
+class CircuitStats(BaseModel):
+    platform: str
+    state: str  # "closed", "open" or "half_open"
+    consecutive_failures: int
+    trips: int
+    short_circuited: int  # calls refused while open
+
+class VerdictCacheStats(BaseModel):
+    enabled: bool
+    entries: int
+    max_entries: int
+    hits: int  # posts answered from the cache since startup
+    misses: int
+
+class QuotaStatus(BaseModel):
+    daily_limit: int
+    used: int
+    remaining: int
+    refused_calls: int
+    resets_at: datetime
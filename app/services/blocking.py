@@ -0,0 +1,89 @@
+from ..config.settings import get_settings
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from typing import Any, Callable, Dict, List
+import asyncio
+import logging
+import threading
+import time
+
+logger = logging.getLogger("uvicorn")
+
+class BlockingExecutor:
+    """
+    Bounded thread pool for one platform's blocking SDK calls, so they run off
+    the event loop. Keeps counts of calls waiting, running and finished.
+    """
+
+    def __init__(self, name: str, max_workers: int):
+        self.name = name
+        self.max_workers = max_workers
+        self.pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix=f"{name}-sdk")
+        self.lock = threading.Lock()
+        self.submitted = 0
+        self.in_flight = 0
+        self.peak_in_flight = 0
+        self.completed = 0
+        self.failed = 0
+        self.busy_seconds = 0.0
+
+    async def run(self, fn: Callable[..., Any], *args, **kwargs) -> Any:
+        """Run fn(*args, **kwargs) in the pool and wait for its result"""
+        with self.lock:
+            self.submitted += 1
+        return await asyncio.get_running_loop().run_in_executor(self.pool, partial(self._call, fn, *args, **kwargs))
+
+    def _call(self, fn: Callable[..., Any], *args, **kwargs) -> Any:
+        with self.lock:
+            self.in_flight += 1
+            self.peak_in_flight = max(self.peak_in_flight, self.in_flight)
+        started = time.monotonic()
+        failed = False
+        try:
+            return fn(*args, **kwargs)
+        except Exception:
+            failed = True
+            raise
+        finally:
+            with self.lock:
+                self.in_flight -= 1
+                self.busy_seconds += time.monotonic() - started
+                if failed:
+                    self.failed += 1
+                else:
+                    self.completed += 1
+
+    def stats(self) -> Dict[str, Any]:
+        with self.lock:
+            return {
+                "platform": self.name,
+                "max_workers": self.max_workers,
+                "queued": self.submitted - self.completed - self.failed - self.in_flight,
+                "in_flight": self.in_flight,
+                "peak_in_flight": self.peak_in_flight,
+                "completed": self.completed,
+                "failed": self.failed,
+                "busy_seconds": round(self.busy_seconds, 2),
+            }
+
+    def shutdown(self):
+        self.pool.shutdown(wait=False, cancel_futures=True)
+
+_executors: Dict[str, BlockingExecutor] = {}
+
+def get_executor(platform: str) -> BlockingExecutor:
+    """Shared executor per platform, sized by {PLATFORM}_EXECUTOR_WORKERS"""
+    executor = _executors.get(platform)
+    if executor is None:
+        workers = getattr(get_settings(), f"{platform.upper()}_EXECUTOR_WORKERS")
+        logger.info(f"Starting {platform} executor with {workers} workers")
+        executor = _executors[platform] = BlockingExecutor(platform, workers)
+    return executor
+
+def executor_stats() -> List[Dict[str, Any]]:
+    return [executor.stats() for executor in _executors.values()]
+
+def shutdown_executors():
+    for executor in _executors.values():
+        executor.shutdown()
+    _executors.clear()
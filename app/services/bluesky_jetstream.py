@@ -0,0 +1,176 @@
+from ..models.social_post import SocialPost
+from ..config.settings import get_settings, get_keywords
+from .matchers.base_matcher import BaseMatcher
+from .matchers.question_matcher import QuestionMatcher
+from .matchers.matcher_chain import MatcherChain
+from .watermark_store import WatermarkStore, get_watermark_store
+from .stream_ingest import StreamConsumer
+from . import scan_runner
+from contextlib import asynccontextmanager
+from datetime import datetime, timezone
+from functools import lru_cache
+from typing import Awaitable, Callable, Iterable, List, NamedTuple, Optional
+from urllib.parse import parse_qs, urlencode, urlparse
+import asyncio
+import json
+import logging
+import websockets
+
+logger = logging.getLogger("uvicorn")
+
+POST_COLLECTION = "app.bsky.feed.post"
+JETSTREAM_SOURCE = "jetstream"
+# Jetstream suggests rewinding a few seconds when resuming so nothing is
+# missed; the dedup store drops the repeats
+RESUME_REWIND_US = 5_000_000
+
+class JetstreamPost(NamedTuple):
+    time_us: int
+    did: str
+    rkey: str
+    text: str
+
+def decode_post(message: str) -> Optional[JetstreamPost]:
+    """Pull a newly created post out of a Jetstream event, skipping everything else"""
+    # Most events are likes, follows and reposts; skip them without parsing
+    if POST_COLLECTION not in message:
+        return None
+    event = json.loads(message)
+    commit = event.get("commit")
+    if (
+        event.get("kind") != "commit"
+        or not commit
+        or commit.get("operation") != "create"
+        or commit.get("collection") != POST_COLLECTION
+    ):
+        return None
+    record = commit.get("record") or {}
+    return JetstreamPost(event["time_us"], event["did"], commit["rkey"], record.get("text", ""))
+
+class JetstreamConsumer(StreamConsumer):
+    """
+    Long-running Bluesky ingestion from the Jetstream firehose.
+
+    The reader decodes post events from the socket into the consumer queue;
+    while the queue is full it stops reading, so a slow matcher pushes back on
+    the connection. Reconnects resume from the last received event, and a
+    restart resumes from the saved checkpoint.
+    """
+
+    platform = "bluesky"
+    checkpoint_source = JETSTREAM_SOURCE
+
+    def __init__(
+        self,
+        url: str,
+        matcher: MatcherChain,
+        on_matches: Callable[[List[SocialPost]], Awaitable[bool]],
+        watermarks: WatermarkStore,
+        queue_size: int = 10000,
+        batch_size: int = 500,
+        flush_seconds: float = 300,
+        connect: Callable = websockets.connect,
+        reconnect_delay: float = 1.0,
+    ):
+        super().__init__(matcher, on_matches, watermarks, queue_size, batch_size, flush_seconds, reconnect_delay)
+        self.url = url
+        self.connect = connect
+        self.received_cursor: Optional[int] = None
+
+    async def _subscribe_url(self) -> str:
+        cursor = self.received_cursor
+        if cursor is None:
+            resume_from = await self.resume_from()
+            cursor = int(resume_from.timestamp() * 1_000_000)
+        params = {"wantedCollections": POST_COLLECTION, "cursor": max(cursor - RESUME_REWIND_US, 0)}
+        return f"{self.url}?{urlencode(params)}"
+
+    async def consume(self):
+        url = await self._subscribe_url()
+        async with self.connect(url) as websocket:
+            self.state.connected = True
+            logger.info("Connected to Bluesky Jetstream")
+            async for message in websocket:
+                self.state.messages_received += 1
+                post = decode_post(message)
+                if post is None:
+                    continue
+                await self.enqueue(post)
+                self.received_cursor = post.time_us
+
+    def item_text(self, post: JetstreamPost) -> str:
+        return post.text
+
+    def item_time(self, post: JetstreamPost) -> datetime:
+        return datetime.fromtimestamp(post.time_us / 1_000_000, timezone.utc)
+
+    def normalize_post(self, post: JetstreamPost, matched_keyword: str) -> SocialPost:
+        """Convert a Jetstream post to normalized SocialPost model"""
+        return SocialPost(
+            platform="bluesky",
+            content=post.text,
+            title=None,
+            author=post.did,
+            url=f"https://bsky.app/profile/{post.did}/post/{post.rkey}",
+            timestamp=self.item_time(post),
+            keyword_matched=matched_keyword,
+            community=None,
+            # The feed poller identifies posts the same way, so the dedup store
+            # sees one post whichever path found it
+            post_id=f"at://{post.did}/{POST_COLLECTION}/{post.rkey}",
+        )
+
+class JetstreamReplay:
+    """
+    Stand-in for websockets.connect that replays recorded Jetstream messages,
+    for tests and local runs. Like the real service it skips events at or
+    before the cursor in the URL, and keeps the stream open once the messages
+    run out. With drop_after set, the first connection fails after that many
+    messages.
+    """
+
+    def __init__(self, messages: Iterable[str], drop_after: Optional[int] = None):
+        self.messages = list(messages)
+        self.drop_after = drop_after
+        self.urls: List[str] = []
+
+    @classmethod
+    def from_file(cls, path: str, drop_after: Optional[int] = None) -> "JetstreamReplay":
+        """Load a recording with one Jetstream event per line"""
+        with open(path) as f:
+            return cls([line for line in f if line.strip()], drop_after)
+
+    def __call__(self, url: str, **kwargs):
+        self.urls.append(url)
+        return self._connection(url, self.drop_after if len(self.urls) == 1 else None)
+
+    @asynccontextmanager
+    async def _connection(self, url: str, drop_after: Optional[int]):
+        yield self._stream(url, drop_after)
+
+    async def _stream(self, url: str, drop_after: Optional[int]):
+        query = parse_qs(urlparse(url).query)
+        cursor = int(query["cursor"][0]) if "cursor" in query else None
+        sent = 0
+        for message in self.messages:
+            if cursor is not None and json.loads(message)["time_us"] <= cursor:
+                continue
+            if sent == drop_after:
+                raise ConnectionError("Replay connection dropped")
+            yield message
+            sent += 1
+        await asyncio.Event().wait()
+
+@lru_cache()
+def get_jetstream_consumer() -> JetstreamConsumer:
+    settings = get_settings()
+    keywords = get_keywords()["bluesky"]
+    return JetstreamConsumer(
+        settings.BLUESKY_JETSTREAM_URL,
+        MatcherChain.for_platform(keywords, [BaseMatcher, QuestionMatcher], settings),
+        lambda posts: scan_runner.notify_new(posts, queue_undelivered=False),
+        get_watermark_store(),
+        settings.BLUESKY_JETSTREAM_QUEUE_SIZE,
+        settings.BLUESKY_JETSTREAM_BATCH_SIZE,
+        settings.BLUESKY_JETSTREAM_FLUSH_SECONDS,
+    )
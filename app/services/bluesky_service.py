@@ -1,24 +1,39 @@
-from atproto import Client
+from atproto import AsyncClient
+from atproto_client.exceptions import LoginRequiredError, NetworkError, RequestErrorBase, UnauthorizedError
 from datetime import datetime, timedelta, timezone
 from ..models.social_post import SocialPost
 from ..config.settings import get_settings, get_keywords
 from .matchers.base_matcher import BaseMatcher
 from .matchers.question_matcher import QuestionMatcher
-from typing import List
+from .matchers.matcher_chain import MatcherChain
+from .scan_events import PostCallback, ProgressCallback, report_progress
+from .watermark_store import get_watermark_store
+from .resilience import AUTH, CLIENT, FATAL, TRANSIENT, resilient_caller
+from typing import Dict, List, Optional
+import asyncio
 import logging
 
 logger = logging.getLogger("uvicorn")
 
+# app.bsky.feed.getFeed returns at most 100 posts per page
+FEED_PAGE_SIZE = 100
+
 class BlueskyService:
     def __init__(self):
         self.settings = get_settings()
         self.keywords = get_keywords()["bluesky"]
-        self.client = self._initialize_bluesky()
+        self.matcher = MatcherChain.for_platform(self.keywords, [BaseMatcher, QuestionMatcher], self.settings)
+        self.watermarks = get_watermark_store()
+        self.client = None  # Logged in on first scan
+        self.login_lock = asyncio.Lock()
+        self.caller = resilient_caller("bluesky", self._classify_error, self._reauthenticate)
+        # Feed owner handles resolve to DIDs that rarely change
+        self.dids: Dict[str, str] = {}
 
-    def _initialize_bluesky(self):
+    async def _initialize_bluesky(self) -> AsyncClient:
         try:
-            client = Client()
-            client.login(
+            client = AsyncClient()
+            await client.login(
                 self.settings.BLUESKY_EMAIL,
                 self.settings.BLUESKY_PASSWORD
             )
@@ -28,6 +43,46 @@ class BlueskyService:
             logger.error(f"Failed to initialize Bluesky client: {str(e)}")
             raise
 
+    async def _login(self):
+        async with self.login_lock:
+            if self.client is None:
+                self.client = await self._initialize_bluesky()
+
+    async def _reauthenticate(self):
+        client = self.client
+        async with self.login_lock:
+            # Feeds failing at the same time share one new session
+            if self.client is client:
+                self.client = await self._initialize_bluesky()
+
+    async def ensure_client(self):
+        if self.client is None:
+            await self.caller.login(self._login)
+
+    @staticmethod
+    def _classify_error(e: Exception) -> str:
+        """Sort a failed call for the resilience layer"""
+        if isinstance(e, (UnauthorizedError, LoginRequiredError)):
+            return AUTH
+        if isinstance(e, NetworkError):
+            return TRANSIENT
+        if isinstance(e, RequestErrorBase):
+            content = getattr(e.response, "content", None)
+            if getattr(content, "error", None) in ("ExpiredToken", "InvalidToken"):
+                return AUTH
+            status = getattr(e.response, "status_code", None) or 0
+            if status == 429:
+                return FATAL
+            return TRANSIENT if status >= 500 else CLIENT
+        return TRANSIENT
+
+    async def _resolve_did(self, handle: str) -> str:
+        did = self.dids.get(handle)
+        if did is None:
+            profile = await self.caller.call(lambda: self.client.app.bsky.actor.get_profile({'actor': handle}))
+            did = self.dids[handle] = profile.did
+        return did
+
     def _normalize_post(self, post, matched_keyword: str) -> SocialPost:
         """Convert Bluesky post to normalized SocialPost model"""
         return SocialPost(
@@ -36,59 +91,111 @@ class BlueskyService:
             title=None,
             author=post.author.handle,
             url=f"https://bsky.app/profile/{post.author.handle}/post/{post.uri.split('/')[-1]}",
-            timestamp=datetime.fromisoformat(post.indexed_at.replace('Z', '+00:00')),
+            timestamp=self._post_time(post),
             keyword_matched=matched_keyword,
             community=None,
             likes=getattr(post, 'like_count', 0),
-            retweets=getattr(post, 'repost_count', 0)
+            retweets=getattr(post, 'repost_count', 0),
+            post_id=post.uri
         )
 
-    async def get_matching_posts(self) -> List[SocialPost]:
-        """Get posts matching configured keywords from configured feeds"""
-        matching_posts = []
-        scan_cutoff = datetime.utcnow().replace(tzinfo=timezone.utc) - timedelta(minutes=self.settings.SCAN_INTERVAL_MINUTES)
-        logger.info(f"Starting Bluesky scan, cutoff time: {scan_cutoff}")
+    @staticmethod
+    def _post_time(post) -> datetime:
+        return datetime.fromisoformat(post.indexed_at.replace('Z', '+00:00'))
 
+    async def _scan_feed(
+        self,
+        feed_config: str,
+        scan_cutoff: datetime,
+        matching_posts: List[SocialPost],
+        on_post: Optional[PostCallback],
+        on_progress: Optional[ProgressCallback],
+    ):
+        """Page through one feed until its posts are older than the cutoff"""
+        posts_checked = 0
+        matches_before = len(matching_posts)
         try:
-            for feed_config in self.keywords["feeds"]:
-                try:
-                    # Split the feed config into handle and feed ID
-                    handle, feed_id = feed_config.split('/')
-                    logger.info(f"Getting feed for handle: {handle}, feed_id: {feed_id}")
-
-                    # Get the DID from the handle
-                    profile = self.client.app.bsky.actor.get_profile({'actor': handle})
-                    feed_uri = f"at://{profile.did}/app.bsky.feed.generator/{feed_id}"
-                    logger.info(f"Using feed URI: {feed_uri}")
-
-                    response = self.client.app.bsky.feed.get_feed({
-                        'feed': feed_uri,
-                        'limit': 100
-                    })
-                    
-                    if not response.feed:
-                        logger.info(f"No posts found in feed {feed_uri}")
+            # Split the feed config into handle and feed ID
+            handle, feed_id = feed_config.split('/')
+            feed_uri = f"at://{await self._resolve_did(handle)}/app.bsky.feed.generator/{feed_id}"
+            logger.info(f"Scanning Bluesky feed {feed_uri}")
+
+            cutoff = await self.watermarks.cutoff("bluesky", feed_config, scan_cutoff)
+            newest = None
+            cursor = None
+            complete = False
+            for page in range(self.settings.BLUESKY_MAX_FEED_PAGES):
+                response = await self.caller.call(lambda: self.client.app.bsky.feed.get_feed({
+                    'feed': feed_uri,
+                    'limit': FEED_PAGE_SIZE,
+                    'cursor': cursor,
+                }))
+                posts_checked += len(response.feed)
+
+                recent_posts = []
+                for feed_view in response.feed:
+                    post = feed_view.post
+                    post_time = self._post_time(post)
+                    if post_time <= cutoff:
                         continue
 
-                    for feed_view in response.feed:
-                        post = feed_view.post
-                        post_time = datetime.fromisoformat(post.indexed_at.replace('Z', '+00:00'))
-                        
-                        if post_time < scan_cutoff:
-                            continue
+                    newest = max(newest or post_time, post_time)
+                    recent_posts.append(post)
+
+                results = await self._match_many([post.record.text for post in recent_posts])
+                for post, (matches, keyword) in zip(recent_posts, results):
+                    if matches:
+                        matching_post = self._normalize_post(post, keyword)
+                        matching_posts.append(matching_post)
+                        if on_post:
+                            on_post(matching_post)
+                        logger.info(f"Found matching post with keyword '{keyword}'")
+
+                # Feeds aren't always in time order, so only stop once a whole
+                # page is older than the cutoff
+                cursor = response.cursor
+                if not recent_posts or not cursor:
+                    complete = True
+                    break
+            else:
+                logger.warning(f"Stopped paging feed {feed_config} after {self.settings.BLUESKY_MAX_FEED_PAGES} pages")
 
+            if not complete:
+                # Posts past the last page were never read, so the next scan has
+                # to reach back to the same cutoff
+                await self.watermarks.advance("bluesky", feed_config, cutoff)
+            elif newest:
+                # Posts can show up late with an older indexed_at, so the next
+                # scan reaches back past the newest one; the dedup store keeps
+                # posts read twice from being notified twice
+                lookback = timedelta(minutes=self.settings.BLUESKY_FEED_LOOKBACK_MINUTES)
+                await self.watermarks.advance("bluesky", feed_config, newest - lookback)
+            logger.info(f"Completed feed {feed_config}, checked {posts_checked} posts")
+            report_progress(on_progress, feed_config, posts_checked, len(matching_posts) - matches_before)
 
-                        matches, keyword = self._match_content(post.record.text)
-                        
-                        if matches:
-                            matching_posts.append(
-                                self._normalize_post(post, keyword)
-                            )
-                            logger.info(f"Found matching post with keyword '{keyword}'")
+        except Exception as e:
+            logger.error(f"Error fetching feed {feed_config}: {str(e)}")
+            report_progress(on_progress, feed_config, posts_checked, len(matching_posts) - matches_before, str(e))
+
+    async def get_matching_posts(self, on_post: Optional[PostCallback] = None, on_progress: Optional[ProgressCallback] = None) -> List[SocialPost]:
+        """Get posts matching configured keywords from configured feeds
+
+        Feeds are scanned concurrently. on_post is called with each match as
+        soon as it is found, and on_progress once each feed has been scanned
+        """
+        matching_posts = []
+        scan_cutoff = datetime.now(timezone.utc) - timedelta(minutes=self.settings.SCAN_INTERVAL_MINUTES)
+        logger.info(f"Starting Bluesky scan, cutoff time: {scan_cutoff}")
+
+        try:
+            await self.ensure_client()
+            semaphore = asyncio.Semaphore(self.settings.BLUESKY_FEED_CONCURRENCY)
+
+            async def scan(feed_config: str):
+                async with semaphore:
+                    await self._scan_feed(feed_config, scan_cutoff, matching_posts, on_post, on_progress)
 
-                except Exception as e:
-                    logger.error(f"Error fetching feed {feed_config}: {str(e)}")
-                    continue
+            await asyncio.gather(*(scan(feed_config) for feed_config in self.keywords["feeds"]))
 
         except Exception as e:
             logger.error(f"Error in Bluesky scan: {str(e)}")
@@ -97,18 +204,24 @@ class BlueskyService:
         logger.info(f"Scan complete. Found {len(matching_posts)} total matching posts")
         return matching_posts
 
-    def _match_content(self, text: str) -> tuple[bool, str]:
+    async def _match_content(self, text: str) -> tuple[bool, str]:
         """Match content against keywords and patterns"""
-        # Try base keyword matching first
-        matches, keyword = BaseMatcher.match(text, self.keywords)
-        if matches:
-            logger.info(f"Found matching keyword: {keyword}")
-            return True, keyword
-        
-        # Try question matching
-        matches, pattern = QuestionMatcher.match(text, self.keywords)
-        if matches:
-            logger.info(f"Found matching question pattern: {pattern}")
-            return True, pattern
-        
-        return False, "" 
\ No newline at end of file
+        return (await self._match_many([text]))[0]
+
+    async def _match_many(self, texts: List[str]) -> List[tuple[bool, str]]:
+        """Match a batch of texts against keywords and patterns"""
+        results = await self.matcher.match_many(texts)
+        for matches, label in results:
+            if matches:
+                logger.info(f"Found match: {label}")
+        return results
+
+    async def close(self):
+        """Close the Bluesky client's HTTP connections"""
+        if self.client is None:
+            return
+        try:
+            await self.client.request.close()
+            logger.info("Closed Bluesky client session")
+        except Exception as e:
+            logger.error(f"Error closing Bluesky client: {str(e)}")
@@ -0,0 +1,102 @@
+from .blocking import get_executor
+from contextlib import asynccontextmanager
+from datetime import timedelta
+from typing import Any, AsyncIterator, Callable, Dict
+import asyncio
+import logging
+import time
+
+logger = logging.getLogger("uvicorn")
+
+class _Entry:
+    def __init__(self, service: Any, factory: Callable[[], Any]):
+        self.service = service
+        self.factory = factory
+        self.created = time.monotonic()
+        self.users = 0
+        self.retired = False
+
+class ClientRegistry:
+    """
+    Keeps one authenticated platform service per platform for the life of the
+    app, so scans reuse logins and connection pools instead of building new
+    clients every time.
+
+    Services keep per-scan state such as observed rates and poll times, so a
+    platform's service is leased to one caller at a time and later callers wait
+    their turn. Leases of the same platform can't be nested. Services are built
+    on the client executor, since their constructors do blocking setup.
+
+    Services are created on first use and replaced once they are older than
+    max_age, or after a scan fails with them. A service closed while leased is
+    closed once its scan has finished.
+    """
+
+    def __init__(self, max_age: timedelta):
+        self.max_age = max_age
+        self.entries: Dict[str, _Entry] = {}
+        self.locks: Dict[str, asyncio.Lock] = {}
+
+    def in_use(self, platform: str) -> bool:
+        """Whether a caller holds the platform's service"""
+        lock = self.locks.get(platform)
+        return lock is not None and lock.locked()
+
+    @asynccontextmanager
+    async def lease(self, platform: str, factory: Callable[[], Any]) -> AsyncIterator[Any]:
+        """
+        Use the platform's shared service, creating it with factory if needed.
+        If the caller fails with it, the service may have lost its session, so
+        it is replaced before the next scan.
+        """
+        async with self.locks.setdefault(platform, asyncio.Lock()):
+            entry = await self._entry(platform, factory)
+            entry.users += 1
+            try:
+                yield entry.service
+            except asyncio.TimeoutError:
+                raise
+            except Exception:
+                if self.entries.get(platform) is entry:
+                    logger.info(f"Discarding {platform} client after a failed scan")
+                    await self._retire(platform)
+                raise
+            finally:
+                entry.users -= 1
+                if entry.retired and entry.users == 0:
+                    await self._close(platform, entry)
+
+    async def _entry(self, platform: str, factory: Callable[[], Any]) -> _Entry:
+        entry = self.entries.get(platform)
+        if entry is not None:
+            if entry.factory is not factory:
+                await self._retire(platform)
+            elif time.monotonic() - entry.created > self.max_age.total_seconds():
+                logger.info(f"Refreshing {platform} client after {self.max_age}")
+                await self._retire(platform)
+            else:
+                return entry
+
+        logger.info(f"Creating {platform} client")
+        entry = _Entry(await get_executor("client").run(factory), factory)
+        self.entries[platform] = entry
+        return entry
+
+    async def _retire(self, platform: str):
+        entry = self.entries.pop(platform)
+        entry.retired = True
+        if entry.users == 0:
+            await self._close(platform, entry)
+
+    @staticmethod
+    async def _close(platform: str, entry: _Entry):
+        if hasattr(entry.service, "close"):
+            try:
+                await entry.service.close()
+            except Exception as e:
+                logger.error(f"Error closing {platform} client: {str(e)}")
+
+    async def close(self):
+        """Close every service; ones still in use close when their scans finish"""
+        for platform in list(self.entries):
+            await self._retire(platform)
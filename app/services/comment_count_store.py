@@ -0,0 +1,53 @@
+from ..config.settings import get_settings
+from .sqlite_store import SQLiteStore
+from functools import lru_cache
+from typing import Dict, List
+import logging
+
+logger = logging.getLogger("uvicorn")
+
+# SQLite's default limit on bound parameters is 999
+_QUERY_CHUNK = 500
+
+class CommentCountStore(SQLiteStore):
+    """
+    Remembers the comment count each video or reel had when it was last
+    scanned, so one whose count hasn't changed can be skipped.
+    """
+
+    schema = """
+        CREATE TABLE IF NOT EXISTS comment_counts (
+            platform TEXT NOT NULL,
+            source TEXT NOT NULL,
+            comment_count INTEGER NOT NULL,
+            PRIMARY KEY (platform, source)
+        );
+    """
+
+    async def get_many(self, platform: str, sources: List[str]) -> Dict[str, int]:
+        counts = {}
+        async with self.connect() as db:
+            for start in range(0, len(sources), _QUERY_CHUNK):
+                chunk = sources[start:start + _QUERY_CHUNK]
+                placeholders = ",".join("?" * len(chunk))
+                async with db.execute(
+                    f"SELECT source, comment_count FROM comment_counts WHERE platform = ? AND source IN ({placeholders})",
+                    [platform, *chunk],
+                ) as cursor:
+                    counts.update(await cursor.fetchall())
+        return counts
+
+    async def set(self, platform: str, source: str, comment_count: int):
+        async with self.connect() as db:
+            await db.execute(
+                """
+                INSERT INTO comment_counts (platform, source, comment_count) VALUES (?, ?, ?)
+                ON CONFLICT (platform, source) DO UPDATE SET comment_count = excluded.comment_count
+                """,
+                (platform, source, comment_count),
+            )
+            await db.commit()
+
+@lru_cache()
+def get_comment_count_store() -> CommentCountStore:
+    return CommentCountStore(get_settings().STATE_DB_PATH)
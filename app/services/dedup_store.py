@@ -0,0 +1,158 @@
+from ..models.social_post import SocialPost
+from ..config.settings import get_settings
+from .sqlite_store import SQLiteStore
+from datetime import timedelta
+from functools import lru_cache
+from typing import Iterable, List
+import hashlib
+import logging
+import math
+import time
+
+logger = logging.getLogger("uvicorn")
+
+# SQLite's default limit on bound parameters is 999
+_QUERY_CHUNK = 500
+
+def post_key(post: SocialPost) -> str:
+    """Stable identity of a matched post across scans"""
+    return f"{post.platform}:{post.post_id or post.url}"
+
+class BloomFilter:
+    """
+    Fixed-size probabilistic set. A negative answer is always right, a positive
+    one is wrong at roughly error_rate once capacity keys have been added.
+    """
+
+    def __init__(self, capacity: int, error_rate: float):
+        self.capacity = capacity
+        self.size = max(8, int(-capacity * math.log(error_rate) / math.log(2) ** 2))
+        self.hash_count = max(1, round(self.size / capacity * math.log(2)))
+        self.bits = bytearray((self.size + 7) // 8)
+        self.count = 0
+
+    def _positions(self, key: str) -> Iterable[int]:
+        # Double hashing: two 64-bit halves of one digest give all k positions
+        digest = hashlib.blake2b(key.encode(), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], "little")
+        h2 = int.from_bytes(digest[8:], "little") | 1
+        return ((h1 + i * h2) % self.size for i in range(self.hash_count))
+
+    def add(self, key: str):
+        for position in self._positions(key):
+            self.bits[position >> 3] |= 1 << (position & 7)
+        self.count += 1
+
+    def __contains__(self, key: str) -> bool:
+        return all(self.bits[position >> 3] & (1 << (position & 7)) for position in self._positions(key))
+
+class DedupStore(SQLiteStore):
+    """
+    Remembers which matched posts have already been handled, so posts seen by an
+    earlier scan are dropped before the OpenAI filter and the notification email.
+    Posts are only marked seen once they've been handled; until then they're
+    held as pending, so a concurrent scan doesn't pick them up as well, and a
+    failed notification releases them for the next scan.
+
+    The exact set lives in the state database and forgets posts after the TTL.
+    An in-memory Bloom filter over the same keys answers most lookups for new
+    posts without touching the database.
+    """
+
+    schema = """
+        CREATE TABLE IF NOT EXISTS seen_posts (
+            key TEXT PRIMARY KEY,
+            seen_at REAL NOT NULL
+        );
+        CREATE INDEX IF NOT EXISTS seen_posts_seen_at ON seen_posts (seen_at);
+    """
+
+    def __init__(self, db_path: str, ttl: timedelta, capacity: int, error_rate: float, enabled: bool = True):
+        super().__init__(db_path)
+        self.ttl = ttl
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self.enabled = enabled
+        self.bloom = None
+        self.pending = set()
+
+    async def _load_filter(self, db):
+        """Rebuild the Bloom filter from the keys still inside the TTL"""
+        async with db.execute("SELECT key FROM seen_posts") as cursor:
+            keys = [key for (key,) in await cursor.fetchall()]
+        # Leave headroom so the filter isn't rebuilt on every scan
+        self.bloom = BloomFilter(max(self.capacity, 2 * len(keys)), self.error_rate)
+        for key in keys:
+            self.bloom.add(key)
+        logger.info(f"Loaded {self.bloom.count} seen post keys into the dedup filter")
+
+    async def filter_new(self, posts: List[SocialPost]) -> List[SocialPost]:
+        """
+        Return the posts not seen before and not pending in another scan, and
+        hold them as pending until mark_seen or release
+        """
+        if not self.enabled or not posts:
+            return posts
+
+        now = time.time()
+        unique = {}
+        for post in posts:
+            unique.setdefault(post_key(post), post)
+
+        async with self.connect() as db:
+            await db.execute("DELETE FROM seen_posts WHERE seen_at < ?", (now - self.ttl.total_seconds(),))
+            await db.commit()
+            if self.bloom is None or self.bloom.count > self.bloom.capacity:
+                await self._load_filter(db)
+
+            # Only keys the filter may have seen need an exact lookup
+            maybe_seen = [key for key in unique if key in self.bloom]
+            seen = set()
+            for start in range(0, len(maybe_seen), _QUERY_CHUNK):
+                chunk = maybe_seen[start:start + _QUERY_CHUNK]
+                placeholders = ",".join("?" * len(chunk))
+                async with db.execute(f"SELECT key FROM seen_posts WHERE key IN ({placeholders})", chunk) as cursor:
+                    seen.update(key for (key,) in await cursor.fetchall())
+
+        pending = [key for key in unique if key not in seen and key in self.pending]
+        new_keys = [key for key in unique if key not in seen and key not in self.pending]
+        self.pending.update(new_keys)
+
+        logger.info(
+            f"Dedup: {len(new_keys)} new of {len(posts)} posts "
+            f"({len(maybe_seen)} exact lookups, {len(seen)} already seen, {len(pending)} pending in another scan)"
+        )
+        return [unique[key] for key in new_keys]
+
+    async def mark_seen(self, posts: List[SocialPost]):
+        """Remember handled posts as seen, so later scans drop them"""
+        if not self.enabled or not posts:
+            return
+        now = time.time()
+        keys = list(dict.fromkeys(post_key(post) for post in posts))
+        async with self.connect() as db:
+            if self.bloom is None:
+                await self._load_filter(db)
+            await db.executemany(
+                "INSERT OR REPLACE INTO seen_posts (key, seen_at) VALUES (?, ?)",
+                [(key, now) for key in keys],
+            )
+            await db.commit()
+        for key in keys:
+            self.bloom.add(key)
+        self.pending.difference_update(keys)
+
+    def release(self, posts: List[SocialPost]):
+        """Stop holding posts returned by filter_new, seen or not"""
+        self.pending.difference_update(post_key(post) for post in posts)
+
+@lru_cache()
+def get_dedup_store() -> DedupStore:
+    settings = get_settings()
+    return DedupStore(
+        settings.STATE_DB_PATH,
+        timedelta(hours=settings.DEDUP_TTL_HOURS),
+        settings.DEDUP_FILTER_CAPACITY,
+        settings.DEDUP_FILTER_ERROR_RATE,
+        settings.DEDUP_ENABLED,
+    )
@@ -58,7 +58,8 @@ def create_email_content(posts: List[SocialPost]) -> str:
 
     return html_content
 
-async def send_notification(posts: List[SocialPost]):
+async def send_notification(posts: List[SocialPost]) -> bool:
+    """Email the posts, returning whether the email was sent"""
     settings = get_settings()
     resend.api_key = settings.RESEND_API_KEY
     
@@ -74,7 +75,9 @@ async def send_notification(posts: List[SocialPost]):
 
         response = resend.Emails.send(params)
         logger.info(f"Email notification sent successfully")
+        return True
         
     except Exception as e:
         logger.error(f"Failed to send email notification: {str(e)}")
         # Don't raise the exception - we don't want the scan to fail if email fails
+        return False
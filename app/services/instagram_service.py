@@ -1,13 +1,24 @@
 from instagrapi import Client
 from instagrapi.mixins.challenge import ChallengeChoice
+from instagrapi.exceptions import (
+    ChallengeError, ClientLoginRequired, ClientNotFoundError, ClientThrottledError,
+    LoginRequired, NotFoundError, PleaseWaitFewMinutes,
+)
 from datetime import datetime, timedelta, timezone
 from ..models.social_post import SocialPost
 from ..config.settings import get_settings, get_keywords
 from .matchers.base_matcher import BaseMatcher
 from .matchers.question_matcher import QuestionMatcher
-from typing import List, Tuple
+from .matchers.matcher_chain import MatcherChain
+from .scan_events import PostCallback, ProgressCallback, report_progress
+from .watermark_store import get_watermark_store
+from .blocking import get_executor
+from .pacing import get_pacer
+from .metadata_cache import get_metadata_cache
+from .comment_count_store import get_comment_count_store
+from .resilience import AUTH, CLIENT, FATAL, TRANSIENT, CircuitOpen, resilient_caller
+from typing import AsyncIterator, List, NamedTuple, Tuple, Optional
 import logging
-import asyncio
 import imaplib
 import email
 import re
@@ -17,13 +28,25 @@ import os
 
 logger = logging.getLogger("uvicorn")
 
+class Reel(NamedTuple):
+    id: str
+    code: str
+    comment_count: Optional[int]
+
 class InstagramService:
     def __init__(self):
         logger.info("Initializing InstagramService")
         self.settings = get_settings()
         self.keywords = get_keywords()["instagram"]
+        self.matcher = MatcherChain.for_platform(self.keywords, [BaseMatcher, QuestionMatcher], self.settings)
+        self.watermarks = get_watermark_store()
         self.session_file = "instagram_session.json"
-        self.client = self._initialize_client()
+        self.executor = get_executor("instagram")
+        self.pacer = get_pacer("instagram", self.settings.INSTAGRAM_USERNAME)
+        self.cache = get_metadata_cache()
+        self.comment_counts = get_comment_count_store()
+        self.caller = resilient_caller("instagram", self._classify_error, self._login)
+        self.client = None  # Logged in on first scan, off the event loop
 
     def _change_password_handler(self, username):
         """Handle Instagram's password change challenge"""
@@ -130,6 +153,38 @@ class InstagramService:
             logger.error(f"Failed to initialize Instagram client: {str(e)}")
             raise
 
+    @staticmethod
+    def _classify_error(e: Exception) -> str:
+        """Sort a failed call for the resilience layer"""
+        if isinstance(e, (LoginRequired, ClientLoginRequired)) or "login_required" in str(e).lower():
+            return AUTH
+        if isinstance(e, (NotFoundError, ClientNotFoundError)):
+            return CLIENT
+        if isinstance(e, (ChallengeError, PleaseWaitFewMinutes, ClientThrottledError)):
+            # Retrying a challenge or throttle only makes it worse
+            return FATAL
+        return TRANSIENT
+
+    async def _login(self):
+        await self.pacer.acquire()
+        self.client = await self.executor.run(self._initialize_client)
+
+    async def ensure_client(self):
+        if self.client is None:
+            await self.caller.login(self._login)
+
+    async def _paced_call(self, method: str, *args, **kwargs):
+        await self.pacer.acquire()
+        # Looked up on each attempt, as logging in again replaces the client
+        return await self.executor.run(getattr(self.client, method), *args, **kwargs)
+
+    async def _call(self, method: str, *args, **kwargs):
+        """
+        Run a paced, blocking client call on the executor, retried and logged in
+        again as needed by the resilience layer
+        """
+        return await self.caller.call(self._paced_call, method, *args, **kwargs)
+
     def _normalize_post(self, comment, media, matched_keyword: str) -> SocialPost:
         """Convert Instagram comment to normalized SocialPost model"""
         return SocialPost(
@@ -141,11 +196,70 @@ class InstagramService:
             timestamp=comment.created_at_utc.replace(tzinfo=timezone.utc),
             keyword_matched=matched_keyword,
             community=None,
-            likes=comment.like_count
+            likes=comment.like_count,
+            post_id=str(comment.pk)
         )
 
-    async def get_matching_posts(self) -> List[SocialPost]:
-        """Get comments from configured accounts' reels matching keywords"""
+    async def _user_id(self, username: str) -> str:
+        """Look up an account's user id, cached for INSTAGRAM_USER_ID_TTL_HOURS"""
+        ttl = timedelta(hours=self.settings.INSTAGRAM_USER_ID_TTL_HOURS)
+        user_id = await self.cache.get("instagram_user_id", username, ttl)
+        if user_id is None:
+            user_id = await self._call("user_id_from_username", username)
+            await self.cache.set("instagram_user_id", username, user_id)
+        return user_id
+
+    async def _reels(self, user_id: str) -> List[Reel]:
+        """
+        An account's recent reels, with the listing cached for
+        INSTAGRAM_REELS_TTL_MINUTES. Only a freshly fetched listing carries
+        comment counts; a cached one would repeat the last scan's, so its reels
+        come without and have their counts looked up again.
+        """
+        ttl = timedelta(minutes=self.settings.INSTAGRAM_REELS_TTL_MINUTES)
+        cached = await self.cache.get("instagram_reels", user_id, ttl)
+        if cached is not None:
+            return [Reel(media_id, code, None) for media_id, code in cached]
+
+        medias = await self._call("user_clips", user_id, amount=random.randint(10, 15))
+        reels = [Reel(str(media.id), media.code, getattr(media, "comment_count", None)) for media in medias]
+        await self.cache.set("instagram_reels", user_id, [[reel.id, reel.code] for reel in reels])
+        logger.info(f"Fetched {len(reels)} reels for user {user_id}")
+        return reels
+
+    async def _comment_chunks(self, media_id: str, cutoff: datetime) -> AsyncIterator[list]:
+        """
+        Yield each chunk of a reel's comments newer than the cutoff as it is
+        fetched, and stop paginating once the cutoff is crossed
+        """
+        next_min_id = None
+        chunk_size = random.randint(20, 30)
+        while True:
+            logger.info(f"Fetching comments chunk (size={chunk_size}, min_id={next_min_id})")
+            comments_chunk, next_min_id = await self._call(
+                "media_comments_chunk",
+                media_id,
+                max_amount=chunk_size,
+                min_id=next_min_id
+            )
+            chunk_comments = list(comments_chunk)
+            logger.info(f"Retrieved {len(chunk_comments)} comments in this chunk")
+
+            recent_comments = [
+                c for c in chunk_comments if c.created_at_utc.replace(tzinfo=timezone.utc) > cutoff
+            ]
+            if recent_comments:
+                yield recent_comments
+            if len(recent_comments) < len(chunk_comments) or not next_min_id:
+                logger.info("No more comments to fetch")
+                return
+
+    async def get_matching_posts(self, on_post: Optional[PostCallback] = None, on_progress: Optional[ProgressCallback] = None) -> List[SocialPost]:
+        """Get comments from configured accounts' reels matching keywords
+
+        on_post is called with each match as soon as it is found, and on_progress
+        once each account has been scanned
+        """
         matching_posts = []
         scan_cutoff = datetime.now(timezone.utc) - timedelta(minutes=self.settings.SCAN_INTERVAL_MINUTES)
         logger.info(f"Starting Instagram reels scan, cutoff time: {scan_cutoff}")
@@ -157,151 +271,95 @@ class InstagramService:
         total_matching_comments = 0
 
         try:
+            await self.ensure_client()
             accounts = list(self.keywords["accounts"])
             random.shuffle(accounts)
             
             for username in accounts:
                 logger.info(f"\n{'='*50}\nScanning account: {username}\n{'='*50}")
+                comments_before = total_comments_processed
+                matches_before = len(matching_posts)
                 
                 try:
-                    await asyncio.sleep(random.uniform(3, 6))
-                    try:
-                        user_id = self.client.user_id_from_username(username)
-                    except Exception as e:
-                        if "login_required" in str(e).lower():
-                            logger.warning("Session expired during scan, attempting to re-authenticate")
-                            self.client = self._initialize_client()
-                            user_id = self.client.user_id_from_username(username)
-                        else:
-                            raise
+                    user_id = await self._user_id(username)
                     
                     logger.info(f"Got user_id {user_id} for {username}")
                     
-                    await asyncio.sleep(random.uniform(2, 4))
-                    reels_amount = random.randint(10, 15)
-                    try:
-                        medias = list(self.client.user_clips(user_id, amount=reels_amount))
-                    except Exception as e:
-                        if "login_required" in str(e).lower():
-                            logger.warning("Session expired during scan, attempting to re-authenticate")
-                            self.client = self._initialize_client()
-                            medias = list(self.client.user_clips(user_id, amount=reels_amount))
-                        else:
-                            raise
+                    medias = await self._reels(user_id)
                             
-                    logger.info(f"Fetched {len(medias)} reels for {username}")
+                    logger.info(f"Got {len(medias)} reels for {username}")
                     
                     if not medias:
+                        report_progress(on_progress, username, 0, 0)
                         continue
                         
                     random.shuffle(medias)
+                    last_counts = await self.comment_counts.get_many("instagram", [media.id for media in medias])
                     
                     for media in medias:
                         total_reels_processed += 1
                         logger.info(f"\n{'-'*30}\nProcessing reel {media.code}\n{'-'*30}")
                         
-                        await asyncio.sleep(random.uniform(2, 4))
-                        
                         try:
-                            # Check if reel has comments first
-                            try:
-                                media_info = self.client.media_info(media.id)
-                            except Exception as e:
-                                if "login_required" in str(e).lower():
-                                    logger.warning("Session expired during scan, attempting to re-authenticate")
-                                    self.client = self._initialize_client()
-                                    media_info = self.client.media_info(media.id)
-                                else:
-                                    raise
-                                    
-                            comment_count = getattr(media_info, 'comment_count', 0)
+                            comment_count = media.comment_count
+                            if comment_count is None:
+                                media_info = await self._call("media_info", media.id)
+                                comment_count = getattr(media_info, 'comment_count', 0)
                             
-                            logger.info(f"Comment count from media_info: {comment_count}")
+                            logger.info(f"Comment count: {comment_count}")
                             
                             if comment_count == 0:
                                 logger.info(f"Skipping reel {media.code} - no comments")
                                 continue
+                            if last_counts.get(media.id) == comment_count:
+                                logger.info(f"Skipping reel {media.code} - comment count unchanged at {comment_count}")
+                                continue
                                 
                             logger.info(f"Reel {media.code} has {comment_count} comments")
                             reels_with_comments += 1
                             
-                            await asyncio.sleep(random.uniform(2, 4))
-                            
-                            # Fetch comments with pagination
-                            comments = []
-                            next_min_id = None
-                            chunk_size = random.randint(20, 30)
-                            found_old_comments = False
-                            
-                            while True:
-                                logger.info(f"Fetching comments chunk (size={chunk_size}, min_id={next_min_id})")
-                                try:
-                                    comments_chunk, next_min_id = self.client.media_comments_chunk(
-                                        media.id,
-                                        max_amount=chunk_size,
-                                        min_id=next_min_id
-                                    )
-                                except Exception as e:
-                                    if "login_required" in str(e).lower():
-                                        logger.warning("Session expired during scan, attempting to re-authenticate")
-                                        self.client = self._initialize_client()
-                                        comments_chunk, next_min_id = self.client.media_comments_chunk(
-                                            media.id,
-                                            max_amount=chunk_size,
-                                            min_id=next_min_id
-                                        )
-                                    else:
-                                        raise
-                                        
-                                chunk_comments = list(comments_chunk)
-                                logger.info(f"Retrieved {len(chunk_comments)} comments in this chunk")
-                                
-                                if chunk_comments:
-                                    logger.info(f"Sample comment: {chunk_comments[0].text[:100]}")
-                                    logger.info(f"First comment timestamp: {chunk_comments[0].created_at_utc}")
-                                    if len(chunk_comments) > 1:
-                                        logger.info(f"Last comment timestamp: {chunk_comments[-1].created_at_utc}")
-                                
-                                # Check if we've hit comments older than our cutoff
-                                if chunk_comments and chunk_comments[-1].created_at_utc.replace(tzinfo=timezone.utc) < scan_cutoff:
-                                    # Filter out comments older than cutoff
-                                    chunk_comments = [c for c in chunk_comments 
-                                                    if c.created_at_utc.replace(tzinfo=timezone.utc) >= scan_cutoff]
-                                    logger.info(f"Filtered to {len(chunk_comments)} comments within cutoff time")
-                                    comments.extend(chunk_comments)
-                                    found_old_comments = True
-                                    break
-                                
-                                comments.extend(chunk_comments)
-                                
-                                if not next_min_id or found_old_comments:
-                                    logger.info("No more comments to fetch")
-                                    break
-                                    
-                                await asyncio.sleep(random.uniform(3, 5))
-                            
-                            total_comments_processed += len(comments)
-                            logger.info(f"Processing {len(comments)} total comments for this reel")
-                            
-                            # Randomize comment processing order
-                            random.shuffle(comments)
-                            
-                            for comment in comments:
-                                logger.info(f"Processing comment: {comment.text[:100]}")
-                                matches, keyword = self._match_content(comment.text)
-                                if matches:
-                                    matching_posts.append(
-                                        self._normalize_post(comment, media, keyword)
-                                    )
-                                    total_matching_comments += 1
-                                    logger.info(f"Match found! Keyword: '{keyword}' - Text: {comment.text[:100]}")
+                            cutoff = await self.watermarks.cutoff("instagram", media.id, scan_cutoff)
+                            newest = None
+
+                            async for comments in self._comment_chunks(media.id, cutoff):
+                                total_comments_processed += len(comments)
+                                chunk_newest = max(c.created_at_utc.replace(tzinfo=timezone.utc) for c in comments)
+                                newest = chunk_newest if newest is None else max(newest, chunk_newest)
+
+                                results = await self._match_many([comment.text for comment in comments])
+                                for comment, (matches, keyword) in zip(comments, results):
+                                    if matches:
+                                        post = self._normalize_post(comment, media, keyword)
+                                        matching_posts.append(post)
+                                        if on_post:
+                                            on_post(post)
+                                        total_matching_comments += 1
+                                        logger.info(f"Match found! Keyword: '{keyword}' - Text: {comment.text[:100]}")
+
+                            if newest is not None:
+                                await self.watermarks.advance("instagram", media.id, newest)
+                            await self.comment_counts.set("instagram", media.id, comment_count)
                             
+                        except CircuitOpen:
+                            raise
                         except Exception as e:
                             logger.error(f"Error processing reel {media.code}: {str(e)}")
                             continue
 
+                    report_progress(
+                        on_progress, username,
+                        total_comments_processed - comments_before, len(matching_posts) - matches_before
+                    )
+
                 except Exception as e:
                     logger.error(f"Error scanning account {username}: {str(e)}")
+                    if self._classify_error(e) in (CLIENT, AUTH):
+                        # The account may have been renamed or removed; look it up again next time
+                        await self.cache.invalidate("instagram_user_id", username)
+                    report_progress(
+                        on_progress, username,
+                        total_comments_processed - comments_before, len(matching_posts) - matches_before, str(e)
+                    )
                     continue
 
         except Exception as e:
@@ -318,18 +376,25 @@ class InstagramService:
         
         return matching_posts
 
-    def _match_content(self, text: str) -> Tuple[bool, str]:
+    async def _match_content(self, text: str) -> Tuple[bool, str]:
         """Match content against keywords and patterns"""
-        # Try base keyword matching first
-        matches, keyword = BaseMatcher.match(text, self.keywords)
-        if matches:
-            logger.info(f"Found matching keyword: {keyword}")
-            return True, keyword
-        
-        # Try question matching
-        matches, pattern = QuestionMatcher.match(text, self.keywords)
-        if matches:
-            logger.info(f"Found matching question pattern: {pattern}")
-            return True, pattern
-        
-        return False, "" 
\ No newline at end of file
+        return (await self._match_many([text]))[0]
+
+    async def _match_many(self, texts: List[str]) -> List[Tuple[bool, str]]:
+        """Match a batch of texts against keywords and patterns"""
+        results = await self.matcher.match_many(texts)
+        for matches, label in results:
+            if matches:
+                logger.info(f"Found match: {label}")
+        return results
+
+    async def close(self):
+        """Close the Instagram client's HTTP sessions"""
+        if self.client is None:
+            return
+        try:
+            self.client.private.close()
+            self.client.public.close()
+            logger.info("Closed Instagram client sessions")
+        except Exception as e:
+            logger.error(f"Error closing Instagram client: {str(e)}")
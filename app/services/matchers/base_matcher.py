@@ -1,26 +1,129 @@
-from typing import Tuple, Dict, Any
+from typing import Tuple, Dict, Any, List
 import logging
+import re
 
 logger = logging.getLogger("uvicorn")
 
+class KeywordIndex:
+    """
+    Keyword automaton for one platform section of keywords.yml.
+
+    All include and exclude terms are folded into a single trie-shaped regex, so
+    one scan over the text reports every term it contains. A term's priority is
+    its position in the section (exclude terms first), which lets the index give
+    back the same first-match keyword as checking the lists in order.
+    """
+
+    def __init__(self, keywords: List[str], exclude_keywords: List[str]):
+        self.keywords = list(keywords)
+        self.exclude_count = len(exclude_keywords)
+        terms = [term.lower() for term in exclude_keywords] + [kw.lower() for kw in keywords]
+
+        # Lowest priority wins when the same term is listed more than once
+        self.priorities: Dict[str, int] = {}
+        for priority, term in enumerate(terms):
+            self.priorities.setdefault(term, priority)
+        # An empty term is contained in every text
+        self.always = self.priorities.pop("", None)
+
+        unique_terms = list(self.priorities)
+        # Best priority among all terms found inside each term
+        self.contained = {
+            term: min(self.priorities[other] for other in unique_terms if other in term)
+            for term in unique_terms
+        }
+        # Terms that start inside a term and run past its end, which a
+        # leftmost-longest scan steps over
+        self.overlaps = {
+            term: [
+                (offset, other, self.priorities[other])
+                for offset in range(1, len(term))
+                for other in unique_terms
+                if len(other) > len(term) - offset and other.startswith(term[offset:])
+            ]
+            for term in unique_terms
+        }
+        self.pattern = re.compile(self._trie_pattern(unique_terms)) if unique_terms else None
+
+    @staticmethod
+    def _trie_pattern(terms: List[str]) -> str:
+        """Build a regex that matches the longest term at each position"""
+        trie: Dict[str, Any] = {}
+        for term in terms:
+            node = trie
+            for char in term:
+                node = node.setdefault(char, {})
+            node[""] = {}
+
+        def build(node: Dict[str, Any]) -> str:
+            branches = [re.escape(char) + build(child) for char, child in sorted(node.items()) if char]
+            if not branches:
+                return ""
+            optional = "" in node
+            if len(branches) == 1 and not optional:
+                return branches[0]
+            return "(?:" + "|".join(branches) + ")" + ("?" if optional else "")
+
+        return build(trie)
+
+    def scan(self, text: str) -> int:
+        """Return the best priority of any term in the text, or -1 if none occur"""
+        best = self.always
+        if self.pattern is None or (best is not None and best < self.exclude_count):
+            return -1 if best is None else best
+
+        for found in self.pattern.finditer(text):
+            term = found.group()
+            priority = self.contained[term]
+            start = found.start()
+            for offset, other, other_priority in self.overlaps[term]:
+                if other_priority < priority and text.startswith(other, start + offset):
+                    priority = other_priority
+            if best is None or priority < best:
+                best = priority
+                if best < self.exclude_count:
+                    break
+
+        return -1 if best is None else best
+
+    def match(self, text: str) -> Tuple[bool, str]:
+        priority = self.scan(text.lower())
+        if priority < 0:
+            return False, ""
+        if priority < self.exclude_count:
+            logger.debug("Text excluded due to exclude keyword")
+            return False, ""
+
+        keyword = self.keywords[priority - self.exclude_count]
+        logger.debug(f"Found matching keyword: {keyword}")
+        return True, keyword
+
 class BaseMatcher:
+    # Section dicts come from the cached get_keywords(), so indexes are keyed by
+    # identity; the section is kept alongside its index so the id stays valid
+    _indexes: Dict[int, Tuple[Dict[str, Any], KeywordIndex]] = {}
+
+    @staticmethod
+    def index_for(keywords: Dict[str, Any]) -> KeywordIndex:
+        """Get the compiled keyword index for a platform section, building it once"""
+        cached = BaseMatcher._indexes.get(id(keywords))
+        if cached is None or cached[0] is not keywords:
+            index = KeywordIndex(keywords["keywords"], keywords.get("exclude_keywords", []))
+            cached = (keywords, index)
+            BaseMatcher._indexes[id(keywords)] = cached
+        return cached[1]
+
     @staticmethod
     def match(text: str, keywords: Dict[str, Any]) -> Tuple[bool, str]:
         """
         Basic keyword matching implementation that all services can use
         """
-        text = text.lower()
-        
-        # Check excluded keywords first
-        for excl in keywords.get("exclude_keywords", []):
-            if excl.lower() in text:
-                logger.debug(f"Text excluded due to keyword: {excl}")
-                return False, ""
-
-        # Check included keywords
-        for keyword in keywords["keywords"]:
-            if keyword.lower() in text:
-                logger.debug(f"Found matching keyword: {keyword}")
-                return True, keyword
-
-        return False, "" 
\ No newline at end of file
+        return BaseMatcher.index_for(keywords).match(text)
+
+    @staticmethod
+    def match_many(texts: List[str], keywords: Dict[str, Any]) -> List[Tuple[bool, str]]:
+        """
+        Match a batch of texts, looking the section's index up once
+        """
+        index = BaseMatcher.index_for(keywords)
+        return [index.match(text) for text in texts]
@@ -0,0 +1,59 @@
+from typing import Tuple, Dict, Any, List, Sequence
+import inspect
+import logging
+
+logger = logging.getLogger("uvicorn")
+
+class MatcherChain:
+    """
+    Runs a platform's matchers in order over a batch of texts.
+
+    Each stage only sees the texts that no earlier stage matched, so a text gets
+    the label of the first matcher that accepts it, as with per-item matching.
+    Stages may match synchronously or return an awaitable, as the semantic
+    stage does to encode off the event loop.
+    """
+
+    def __init__(self, keywords: Dict[str, Any], matchers: Sequence[Any]):
+        self.keywords = keywords
+        self.matchers = list(matchers)
+
+    @classmethod
+    def for_platform(cls, keywords: Dict[str, Any], matchers: Sequence[Any], settings) -> "MatcherChain":
+        """Build a platform's chain, adding the semantic stage last when it is enabled"""
+        matchers = list(matchers)
+        if settings.SEMANTIC_MATCHING_ENABLED:
+            # Imported here so numpy is only needed when the stage is on
+            from .semantic_matcher import get_semantic_matcher
+            matchers.append(get_semantic_matcher(
+                settings.SEMANTIC_MODEL_NAME,
+                settings.SEMANTIC_THRESHOLD,
+                settings.SEMANTIC_BATCH_SIZE,
+            ))
+        return cls(keywords, matchers)
+
+    async def match(self, text: str) -> Tuple[bool, str]:
+        """Match a single text"""
+        return (await self.match_many([text]))[0]
+
+    async def match_many(self, texts: List[str]) -> List[Tuple[bool, str]]:
+        """Match a batch of texts, returning one (matches, label) per text"""
+        results: List[Tuple[bool, str]] = [(False, "")] * len(texts)
+        pending = list(range(len(texts)))
+
+        for matcher in self.matchers:
+            if not pending:
+                break
+            stage_results = matcher.match_many([texts[i] for i in pending], self.keywords)
+            if inspect.isawaitable(stage_results):
+                stage_results = await stage_results
+            still_pending = []
+            for i, (matches, label) in zip(pending, stage_results):
+                if matches:
+                    results[i] = (True, label)
+                else:
+                    still_pending.append(i)
+            pending = still_pending
+
+        logger.debug(f"Matched {len(texts) - len(pending)} of {len(texts)} texts")
+        return results
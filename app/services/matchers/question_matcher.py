@@ -1,59 +1,122 @@
-from typing import Tuple, Dict, Any
+from typing import Tuple, Dict, Any, List, Optional
 import re
 import logging
 
 logger = logging.getLogger("uvicorn")
 
+QUESTION_PATTERNS = [
+    # Project/Building related
+    r"(?i)what (are you|'?re you|have you been) (working on|building|developing|coding|creating)",
+    r"(?i)share what you'?ve (been working on|built|developed|created)",
+    r"(?i)show (off|us) your (project|side project|latest project|build)",
+    r"(?i)what side project(s)? (are you|is everyone) working on",
+
+    # Pain points/Problems
+    r"(?i)(what('s| is) your|biggest|main) (pain point|struggle|roadblock|bottleneck)",
+    r"(?i)(what('s| is)|biggest|main) (problem|issue|challenge|frustration) (you'?re facing|with your business|with your startup)?",
+    r"(?i)what('s| is) holding you back",
+    r"(?i)why did your (startup|project|idea) fail",
+    r"(?i)what('s| is) stopping you from launching",
+
+    # SaaS/Ideas related
+    r"(?i)looking for (saas )?(ideas|opportunities|niches|markets)",
+    r"(?i)need (an )?(idea|inspiration|side hustle idea)",
+    r"(?i)need a (business|startup) idea",
+    r"(?i)what('s| is) a good (saas|startup|side project) idea",
+    r"(?i)brainstorm (saas|startup|app|product) ideas",
+    r"(?i)help me come up with (an|a new) idea",
+    r"(?i)anyone have (saas|startup|business) ideas",
+
+    # Self-promotion/Showcase
+    r"(?i)time for self[\-]promotion",
+    r"(?i)showcase your (project|business|startup|side hustle)",
+    r"(?i)post your (product|app|website|startup|SaaS)",
+    r"(?i)plug your (work|project|startup|product|service)",
+    r"(?i)promote your (business|startup|side hustle|SaaS|app)",
+    r"(?i)tell me about your (startup|project|business|product)",
+    r"(?i)what have you launched",
+
+    # Startup Growth/Marketing
+    r"(?i)how do I get users for my (startup|SaaS|MVP|side project)",
+    r"(?i)how to market my (startup|business|SaaS|product)",
+    r"(?i)best way to validate a (startup|SaaS|business) idea",
+    r"(?i)how did you get your first (10|100|1000) users",
+    r"(?i)how do you validate a (business|SaaS|startup) idea",
+]
+
+_CASE_INSENSITIVE = "(?i)"
+
+class PatternSet:
+    """
+    Case-insensitive regex patterns compiled once into a single alternation.
+
+    Each alternative ends in an empty named group, so one search over the
+    lowercased text reports which pattern fired. Patterns listed before that one
+    are then re-checked past the match, so the result is the same first pattern
+    in list order that a loop of re.search calls would return.
+    """
+
+    def __init__(self, patterns: List[str]):
+        self.patterns = list(patterns)
+        folded = [self._fold(pattern) for pattern in self.patterns]
+        self.compiled = [re.compile(pattern) for pattern in folded]
+        # Markers go at the end of each branch; a group at the start would stop
+        # the regex engine from skipping ahead on the branches' first characters
+        self.combined = re.compile("|".join(
+            f"(?:{pattern})(?P<p{i}>)" for i, pattern in enumerate(folded)
+        ))
+
+    @staticmethod
+    def _fold(pattern: str) -> str:
+        """Strip the (?i) flag and lowercase the literals outside escapes"""
+        if not pattern.startswith(_CASE_INSENSITIVE):
+            raise ValueError(f"PatternSet patterns must start with {_CASE_INSENSITIVE}: {pattern}")
+        folded = []
+        escaped = False
+        for char in pattern[len(_CASE_INSENSITIVE):]:
+            folded.append(char if escaped else char.lower())
+            escaped = not escaped and char == "\\"
+        return "".join(folded)
+
+    def search(self, text: str) -> Optional[str]:
+        """Return the first pattern in list order that occurs in the text"""
+        text = text.lower()
+        found = self.combined.search(text)
+        if found is None:
+            return None
+
+        fired = int(found.lastgroup[1:])
+        # No pattern matches before found.start(), and earlier patterns were
+        # already tried at found.start() by the alternation
+        start = found.start() + 1
+        for i in range(fired):
+            if self.compiled[i].search(text, start):
+                return self.patterns[i]
+        return self.patterns[fired]
+
 class QuestionMatcher:
+    _pattern_set = PatternSet(QUESTION_PATTERNS)
+
     @staticmethod
     def match(text: str, keywords: Dict[str, Any]) -> Tuple[bool, str]:
         """
         Matches posts that are asking questions or seeking advice
         """
-        question_patterns = [
-            # Project/Building related
-            r"(?i)what (are you|'?re you|have you been) (working on|building|developing|coding|creating)",
-            r"(?i)share what you'?ve (been working on|built|developed|created)",
-            r"(?i)show (off|us) your (project|side project|latest project|build)",
-            r"(?i)what side project(s)? (are you|is everyone) working on",
-            
-            # Pain points/Problems
-            r"(?i)(what('s| is) your|biggest|main) (pain point|struggle|roadblock|bottleneck)",
-            r"(?i)(what('s| is)|biggest|main) (problem|issue|challenge|frustration) (you'?re facing|with your business|with your startup)?",
-            r"(?i)what('s| is) holding you back",
-            r"(?i)why did your (startup|project|idea) fail",
-            r"(?i)what('s| is) stopping you from launching",
-            
-            # SaaS/Ideas related
-            r"(?i)looking for (saas )?(ideas|opportunities|niches|markets)",
-            r"(?i)need (an )?(idea|inspiration|side hustle idea)",
-            r"(?i)need a (business|startup) idea",
-            r"(?i)what('s| is) a good (saas|startup|side project) idea",
-            r"(?i)brainstorm (saas|startup|app|product) ideas",
-            r"(?i)help me come up with (an|a new) idea",
-            r"(?i)anyone have (saas|startup|business) ideas",
-            
-            # Self-promotion/Showcase
-            r"(?i)time for self[\-]promotion",
-            r"(?i)showcase your (project|business|startup|side hustle)",
-            r"(?i)post your (product|app|website|startup|SaaS)",
-            r"(?i)plug your (work|project|startup|product|service)",
-            r"(?i)promote your (business|startup|side hustle|SaaS|app)",
-            r"(?i)tell me about your (startup|project|business|product)",
-            r"(?i)what have you launched",
-            
-            # Startup Growth/Marketing
-            r"(?i)how do I get users for my (startup|SaaS|MVP|side project)",
-            r"(?i)how to market my (startup|business|SaaS|product)",
-            r"(?i)best way to validate a (startup|SaaS|business) idea",
-            r"(?i)how did you get your first (10|100|1000) users",
-            r"(?i)how do you validate a (business|SaaS|startup) idea",
-        ]
-
-        
-        for pattern in question_patterns:
-            if re.search(pattern, text):
-                logger.debug(f"Found question pattern: {pattern}")
-                return True, f"question:{pattern}"
-        
-        return False, "" 
\ No newline at end of file
+        pattern = QuestionMatcher._pattern_set.search(text)
+        if pattern is not None:
+            logger.debug(f"Found question pattern: {pattern}")
+            return True, f"question:{pattern}"
+
+        return False, ""
+
+    @staticmethod
+    def match_many(texts: List[str], keywords: Dict[str, Any]) -> List[Tuple[bool, str]]:
+        """
+        Match a batch of texts against the compiled question patterns
+        """
+        pattern_set = QuestionMatcher._pattern_set
+        results = []
+        for text in texts:
+            pattern = pattern_set.search(text)
+            results.append((True, f"question:{pattern}") if pattern is not None else (False, ""))
+        return results
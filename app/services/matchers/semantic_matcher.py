@@ -1,19 +1,79 @@
-from typing import Tuple, Dict, Any
-from sentence_transformers import SentenceTransformer
+from ..blocking import get_executor
+from typing import Tuple, Dict, Any, List, Optional
+from functools import lru_cache
+import logging
 import numpy as np
 
+logger = logging.getLogger("uvicorn")
+
 class SemanticMatcher:
-    def __init__(self):
-        self.model = SentenceTransformer('all-MiniLM-L6-v2')
-        
-    def match(self, text: str, keywords: Dict[str, Any], threshold: float = 0.8) -> Tuple[bool, str]:
-        keyword_embeddings = self.model.encode(keywords["keywords"])
-        text_embedding = self.model.encode(text)
-        
-        similarities = np.dot(keyword_embeddings, text_embedding)
-        
-        if np.max(similarities) > threshold:
-            most_similar_idx = np.argmax(similarities)
-            return True, f"semantic:{keywords['keywords'][most_similar_idx]}"
-            
-        return False, "" 
\ No newline at end of file
+    """
+    Embedding similarity matcher, meant to run after the keyword matchers.
+
+    The model is loaded on first use. Each platform section's keywords and
+    semantic_intents are encoded once into a normalized matrix, so matching a
+    batch is one encode call plus one matrix product. Encoding is CPU-bound,
+    so batches are matched on the semantic executor rather than the event loop.
+    """
+
+    def __init__(self, model_name: str = 'all-MiniLM-L6-v2', threshold: float = 0.8, batch_size: int = 64):
+        self.model_name = model_name
+        self.threshold = threshold
+        self.batch_size = batch_size
+        self._model = None
+        # Keyed by section identity like BaseMatcher's indexes
+        self._phrase_embeddings: Dict[int, Tuple[Dict[str, Any], List[str], np.ndarray]] = {}
+
+    @property
+    def model(self):
+        if self._model is None:
+            try:
+                from sentence_transformers import SentenceTransformer
+            except ImportError as e:
+                raise RuntimeError("Semantic matching requires the sentence-transformers package") from e
+            logger.info(f"Loading sentence transformer model {self.model_name}")
+            self._model = SentenceTransformer(self.model_name)
+        return self._model
+
+    def _encode(self, texts: List[str]) -> np.ndarray:
+        return self.model.encode(
+            texts,
+            batch_size=self.batch_size,
+            convert_to_numpy=True,
+            normalize_embeddings=True,
+        )
+
+    def _phrases_for(self, keywords: Dict[str, Any]) -> Tuple[List[str], np.ndarray]:
+        """Get the section's phrases and their embedding matrix, encoding them once"""
+        cached = self._phrase_embeddings.get(id(keywords))
+        if cached is None or cached[0] is not keywords:
+            phrases = list(dict.fromkeys(keywords["keywords"] + keywords.get("semantic_intents", [])))
+            cached = (keywords, phrases, self._encode(phrases))
+            self._phrase_embeddings[id(keywords)] = cached
+        return cached[1], cached[2]
+
+    async def match(self, text: str, keywords: Dict[str, Any], threshold: Optional[float] = None) -> Tuple[bool, str]:
+        return (await self.match_many([text], keywords, threshold))[0]
+
+    async def match_many(self, texts: List[str], keywords: Dict[str, Any], threshold: Optional[float] = None) -> List[Tuple[bool, str]]:
+        if not texts:
+            return []
+        if threshold is None:
+            threshold = self.threshold
+        return await get_executor("semantic").run(self._match_many, texts, keywords, threshold)
+
+    def _match_many(self, texts: List[str], keywords: Dict[str, Any], threshold: float) -> List[Tuple[bool, str]]:
+        phrases, phrase_embeddings = self._phrases_for(keywords)
+        similarities = self._encode(texts) @ phrase_embeddings.T
+
+        best = similarities.argmax(axis=1)
+        scores = similarities[np.arange(len(texts)), best]
+        return [
+            (True, f"semantic:{phrases[idx]}") if score > threshold else (False, "")
+            for idx, score in zip(best, scores)
+        ]
+
+@lru_cache()
+def get_semantic_matcher(model_name: str, threshold: float, batch_size: int) -> SemanticMatcher:
+    """Shared matcher per configuration, so the model is loaded once per process"""
+    return SemanticMatcher(model_name, threshold, batch_size)
@@ -0,0 +1,56 @@
+from ..config.settings import get_settings
+from .sqlite_store import SQLiteStore
+from datetime import datetime, timedelta, timezone
+from functools import lru_cache
+from typing import Any, Optional
+import json
+import logging
+
+logger = logging.getLogger("uvicorn")
+
+class MetadataCache(SQLiteStore):
+    """
+    Small JSON values looked up from platform APIs that rarely change, such as
+    user ids and recent media listings. Each lookup states how old a value may
+    be; older values are treated as missing.
+    """
+
+    schema = """
+        CREATE TABLE IF NOT EXISTS metadata_cache (
+            namespace TEXT NOT NULL,
+            key TEXT NOT NULL,
+            value TEXT NOT NULL,
+            stored_at REAL NOT NULL,
+            PRIMARY KEY (namespace, key)
+        );
+    """
+
+    async def get(self, namespace: str, key: str, ttl: timedelta) -> Optional[Any]:
+        oldest = (datetime.now(timezone.utc) - ttl).timestamp()
+        async with self.connect() as db:
+            async with db.execute(
+                "SELECT value FROM metadata_cache WHERE namespace = ? AND key = ? AND stored_at > ?",
+                (namespace, key, oldest),
+            ) as cursor:
+                row = await cursor.fetchone()
+        return json.loads(row[0]) if row else None
+
+    async def set(self, namespace: str, key: str, value: Any):
+        async with self.connect() as db:
+            await db.execute(
+                """
+                INSERT INTO metadata_cache (namespace, key, value, stored_at) VALUES (?, ?, ?, ?)
+                ON CONFLICT (namespace, key) DO UPDATE SET value = excluded.value, stored_at = excluded.stored_at
+                """,
+                (namespace, key, json.dumps(value), datetime.now(timezone.utc).timestamp()),
+            )
+            await db.commit()
+
+    async def invalidate(self, namespace: str, key: str):
+        async with self.connect() as db:
+            await db.execute("DELETE FROM metadata_cache WHERE namespace = ? AND key = ?", (namespace, key))
+            await db.commit()
+
+@lru_cache()
+def get_metadata_cache() -> MetadataCache:
+    return MetadataCache(get_settings().STATE_DB_PATH)
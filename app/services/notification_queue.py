@@ -0,0 +1,58 @@
+from ..models.social_post import SocialPost
+from ..config.settings import get_settings
+from .dedup_store import post_key
+from .sqlite_store import SQLiteStore
+from functools import lru_cache
+from typing import List
+import logging
+import time
+
+logger = logging.getLogger("uvicorn")
+
+class NotificationQueue(SQLiteStore):
+    """
+    Matches whose notification email failed, kept in the state database until
+    a later notification delivers them. Scans have moved their watermarks past
+    these posts by the time the email is sent, so this queue is the only place
+    they are still held.
+    """
+
+    schema = """
+        CREATE TABLE IF NOT EXISTS undelivered_posts (
+            key TEXT PRIMARY KEY,
+            post TEXT NOT NULL,
+            queued_at REAL NOT NULL
+        );
+    """
+
+    async def add(self, posts: List[SocialPost]):
+        if not posts:
+            return
+        now = time.time()
+        async with self.connect() as db:
+            await db.executemany(
+                "INSERT OR IGNORE INTO undelivered_posts (key, post, queued_at) VALUES (?, ?, ?)",
+                [(post_key(post), post.model_dump_json(), now) for post in posts],
+            )
+            await db.commit()
+        logger.info(f"Queued {len(posts)} undelivered posts for the next notification")
+
+    async def load(self) -> List[SocialPost]:
+        """The queued posts, oldest first"""
+        async with self.connect() as db:
+            async with db.execute("SELECT post FROM undelivered_posts ORDER BY queued_at, key") as cursor:
+                return [SocialPost.model_validate_json(post) for (post,) in await cursor.fetchall()]
+
+    async def remove(self, posts: List[SocialPost]):
+        if not posts:
+            return
+        async with self.connect() as db:
+            await db.executemany(
+                "DELETE FROM undelivered_posts WHERE key = ?",
+                [(post_key(post),) for post in posts],
+            )
+            await db.commit()
+
+@lru_cache()
+def get_notification_queue() -> NotificationQueue:
+    return NotificationQueue(get_settings().STATE_DB_PATH)
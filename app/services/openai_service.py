@@ -1,82 +1,235 @@
-from openai import AsyncOpenAI
+from openai import (
+    AsyncOpenAI, APIConnectionError, APIStatusError, APITimeoutError, AuthenticationError,
+    InternalServerError, PermissionDeniedError, RateLimitError,
+)
 from ..models.social_post import SocialPost
 from ..config.settings import get_settings
-from typing import List
+from .pacing import RequestPacer
+from .resilience import CLIENT, FATAL, TRANSIENT, resilient_caller
+from .verdict_cache import get_verdict_cache, verdict_key
+from functools import lru_cache
+from typing import Any, Dict, List, Optional, Tuple
+import asyncio
 import logging
 import json
 
 logger = logging.getLogger("uvicorn")
 
+# Bump whenever the prompt or tool changes, so cached verdicts aren't reused
+PROMPT_VERSION = "1"
+
+SYSTEM_PROMPT = "You are an expert at identifying potential business leads and networking opportunities."
+
+PROMOTE_CRITERIA = """Return true if ANY of these are true:
+1. The post is asking people to share what they're working on
+2. The author is seeking business/startup ideas
+3. The author is looking for SaaS products or business tools
+4. The post is about lead generation or finding customers"""
+
+PROMOTE_PROPERTY = {
+    "type": "boolean",
+    "description": "Whether this post represents a potential lead"
+}
+
+# Rough token count of a request, for the tokens-per-minute budget
+CHARS_PER_TOKEN = 4
+VERDICT_TOKENS = 20
+
+@lru_cache()
+def get_rate_limits() -> Tuple[RequestPacer, RequestPacer]:
+    """Shared requests-per-minute and tokens-per-minute buckets for the OpenAI account"""
+    settings = get_settings()
+    return (
+        RequestPacer("openai", "requests", settings.OPENAI_REQUESTS_PER_MINUTE, settings.OPENAI_REQUESTS_PER_MINUTE, 0, 0),
+        RequestPacer("openai", "tokens", settings.OPENAI_TOKENS_PER_MINUTE, settings.OPENAI_TOKENS_PER_MINUTE, 0, 0),
+    )
+
 class OpenAIService:
     def __init__(self):
         self.settings = get_settings()
         self.client = AsyncOpenAI(api_key=self.settings.OPENAI_API_KEY)
-        
+        self.request_limit, self.token_limit = get_rate_limits()
+        self.caller = resilient_caller("openai", self._classify_error)
+        self.verdicts = get_verdict_cache()
+
     async def filter_promotion_worthy(self, posts: List[SocialPost]) -> List[SocialPost]:
         """
         Acts as a final filter on matched posts, returning only those worth promoting to.
+
+        Verdicts already cached for a post's text are reused, and posts sharing
+        a text are evaluated once. The rest are sent OPENAI_BATCH_SIZE to a
+        request, OPENAI_CONCURRENCY requests at a time, within the account's
+        request and token limits. A failed batch is retried one post at a time,
+        and a post that still can't be evaluated is kept or dropped according to
+        OPENAI_KEEP_ON_ERROR, without caching that outcome.
         """
         logger.info(f"Filtering {len(posts)} posts through OpenAI analysis")
-        filtered_posts = []
-        
-        for post in posts:
-            should_promote, _ = await self._evaluate_post(post)
-            if should_promote:
-                filtered_posts.append(post)
-                
-        logger.info(f"OpenAI filter: {len(filtered_posts)} posts passed out of {len(posts)}")
+        keys = [verdict_key(post, self.settings.OPENAI_MODEL, PROMPT_VERSION) for post in posts]
+        cached = await self.verdicts.get_many(keys)
+        pending: Dict[str, SocialPost] = {}
+        for key, post in zip(keys, posts):
+            if key not in cached:
+                pending.setdefault(key, post)
+
+        pending_posts = list(pending.values())
+        batch_size = max(self.settings.OPENAI_BATCH_SIZE, 1)
+        batches = [pending_posts[start:start + batch_size] for start in range(0, len(pending_posts), batch_size)]
+        semaphore = asyncio.Semaphore(self.settings.OPENAI_CONCURRENCY)
+
+        async def evaluate(batch: List[SocialPost]) -> List[Optional[bool]]:
+            async with semaphore:
+                return await self._evaluate_batch(batch)
+
+        results = await asyncio.gather(*(evaluate(batch) for batch in batches))
+        evaluated = dict(zip(pending, (verdict for batch_verdicts in results for verdict in batch_verdicts)))
+        await self.verdicts.set_many(
+            (key, verdict) for key, verdict in evaluated.items() if verdict is not None
+        )
+
+        verdicts = {**cached, **evaluated}
+        keep = self.settings.OPENAI_KEEP_ON_ERROR
+        filtered_posts = [
+            post
+            for key, post in zip(keys, posts)
+            if (keep if verdicts[key] is None else verdicts[key])
+        ]
+
+        logger.info(
+            f"OpenAI filter: {len(filtered_posts)} posts passed out of {len(posts)} "
+            f"({len(cached)} cached verdicts, {len(pending_posts)} posts evaluated)"
+        )
         return filtered_posts
 
+    async def _evaluate_batch(self, posts: List[SocialPost]) -> List[Optional[bool]]:
+        """Verdicts for a batch, falling back to one post at a time if the batch fails"""
+        if len(posts) > 1:
+            try:
+                return await self._request_verdicts(posts)
+            except Exception as e:
+                logger.warning(f"OpenAI evaluation of {len(posts)} posts failed, evaluating them one by one: {str(e)}")
+        return [await self._evaluate_isolated(post) for post in posts]
+
+    async def _evaluate_isolated(self, post: SocialPost) -> Optional[bool]:
+        """The post's verdict, or None if it couldn't be evaluated"""
+        try:
+            should_promote, _ = await self._evaluate_post(post)
+            return should_promote
+        except Exception as e:
+            keep = self.settings.OPENAI_KEEP_ON_ERROR
+            logger.error(f"OpenAI evaluation failed for {post.url}, {'keeping' if keep else 'dropping'} it: {str(e)}")
+            return None
+
     async def _evaluate_post(self, post: SocialPost) -> tuple[bool, str]:
         """
         Evaluate if a post is suitable for product promotion
         Returns: (should_promote: bool, reasoning: str)
         """
-        try:
-            response = await self.client.chat.completions.create(
-                model="gpt-4-turbo-preview",
-                messages=[
-                    {"role": "system", "content": "You are an expert at identifying potential business leads and networking opportunities."},
-                    {"role": "user", "content": f"""Here's a post from {post.platform}:
+        should_promote = (await self._request_verdicts([post]))[0]
+        logger.info(f"OpenAI evaluation complete - Should promote: {should_promote}")
+        return should_promote, "AI evaluated post for lead potential"
 
-Title: {post.title if post.title else 'N/A'}
+    @staticmethod
+    def _describe(post: SocialPost) -> str:
+        return f"""Title: {post.title if post.title else 'N/A'}
 Content: {post.content}
-Author: {post.author}
+Author: {post.author}"""
 
-Return true if ANY of these are true:
-1. The post is asking people to share what they're working on
-2. The author is seeking business/startup ideas
-3. The author is looking for SaaS products or business tools
-4. The post is about lead generation or finding customers"""}
-                ],
-                tools=[{
-                    "type": "function",
-                    "function": {
-                        "name": "should_promote",
-                        "description": "Return whether this post represents a lead opportunity",
-                        "parameters": {
+    def _messages(self, posts: List[SocialPost]) -> List[Dict[str, str]]:
+        if len(posts) == 1:
+            post = posts[0]
+            prompt = f"""Here's a post from {post.platform}:
+
+{self._describe(post)}
+
+{PROMOTE_CRITERIA}"""
+        else:
+            described = "\n\n".join(
+                f"Post {number} from {post.platform}:\n{self._describe(post)}"
+                for number, post in enumerate(posts, 1)
+            )
+            prompt = f"""Here are {len(posts)} posts, numbered from 1:
+
+{described}
+
+Give a verdict for every post. For each one, {PROMOTE_CRITERIA[0].lower()}{PROMOTE_CRITERIA[1:]}"""
+        return [
+            {"role": "system", "content": SYSTEM_PROMPT},
+            {"role": "user", "content": prompt},
+        ]
+
+    @staticmethod
+    def _tool(batch_size: int) -> Dict[str, Any]:
+        """The should_promote tool, taking an array of verdicts for a batch"""
+        if batch_size == 1:
+            parameters = {
+                "type": "object",
+                "properties": {"promote": PROMOTE_PROPERTY},
+                "required": ["promote"]
+            }
+        else:
+            parameters = {
+                "type": "object",
+                "properties": {
+                    "verdicts": {
+                        "type": "array",
+                        "items": {
                             "type": "object",
                             "properties": {
-                                "promote": {
-                                    "type": "boolean",
-                                    "description": "Whether this post represents a potential lead"
-                                }
+                                "post": {"type": "integer", "description": "The post's number"},
+                                "promote": PROMOTE_PROPERTY
                             },
-                            "required": ["promote"]
+                            "required": ["post", "promote"]
                         }
                     }
-                }],
+                },
+                "required": ["verdicts"]
+            }
+        return {
+            "type": "function",
+            "function": {
+                "name": "should_promote",
+                "description": "Return whether each post represents a lead opportunity",
+                "parameters": parameters
+            }
+        }
+
+    @staticmethod
+    def _classify_error(e: Exception) -> str:
+        """Sort a failed call for the resilience layer"""
+        if isinstance(e, RateLimitError):
+            # Out of credit, as opposed to over the rate limit
+            return FATAL if getattr(e, "code", None) == "insufficient_quota" else TRANSIENT
+        if isinstance(e, (APIConnectionError, APITimeoutError, InternalServerError)):
+            return TRANSIENT
+        if isinstance(e, (AuthenticationError, PermissionDeniedError)):
+            return FATAL
+        if isinstance(e, APIStatusError):
+            return CLIENT
+        return TRANSIENT
+
+    async def _request_verdicts(self, posts: List[SocialPost]) -> List[bool]:
+        """One chat completion returning a verdict per post, in order"""
+        messages = self._messages(posts)
+        tokens = sum(len(message["content"]) for message in messages) // CHARS_PER_TOKEN + VERDICT_TOKENS * len(posts)
+
+        async def request():
+            await self.request_limit.acquire()
+            await self.token_limit.acquire(tokens)
+            return await self.client.chat.completions.create(
+                model=self.settings.OPENAI_MODEL,
+                messages=messages,
+                tools=[self._tool(len(posts))],
                 tool_choice={"type": "function", "function": {"name": "should_promote"}}
             )
-            
-            tool_call = response.choices[0].message.tool_calls[0]
-            result = json.loads(tool_call.function.arguments)
-            should_promote = result["promote"]
-            
-            logger.info(f"OpenAI evaluation complete - Should promote: {should_promote}")
-            
-            return should_promote, "AI evaluated post for lead potential"
-            
-        except Exception as e:
-            logger.error(f"OpenAI evaluation failed: {str(e)}")
-            raise 
\ No newline at end of file
+
+        response = await self.caller.call(request)
+        tool_call = response.choices[0].message.tool_calls[0]
+        result = json.loads(tool_call.function.arguments)
+        if len(posts) == 1:
+            return [bool(result["promote"])]
+
+        verdicts = {verdict["post"]: bool(verdict["promote"]) for verdict in result["verdicts"]}
+        missing = [number for number in range(1, len(posts) + 1) if number not in verdicts]
+        if missing:
+            raise ValueError(f"No verdict for posts {missing}")
+        return [verdicts[number] for number in range(1, len(posts) + 1)]
@@ -0,0 +1,106 @@
+from ..config.settings import get_settings
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+import asyncio
+import logging
+import random
+import time
+
+logger = logging.getLogger("uvicorn")
+
+class RequestPacer:
+    """
+    Spaces out the outbound API requests of one platform account.
+
+    A token bucket refilled at requests_per_minute caps the sustained rate and
+    allows up to burst requests back to back. On top of that, each request
+    starts a random min_delay to max_delay seconds after the previous one. Time
+    spent on local work between requests counts toward that delay, so only
+    requests ever wait. Waiters are served one at a time, in order.
+    """
+
+    def __init__(
+        self,
+        platform: str,
+        account: str,
+        requests_per_minute: float,
+        burst: int,
+        min_delay: float,
+        max_delay: float,
+        clock: Callable[[], float] = time.monotonic,
+        sleep: Callable[[float], Awaitable[Any]] = asyncio.sleep,
+    ):
+        self.platform = platform
+        self.account = account
+        self.requests_per_minute = requests_per_minute
+        self.burst = burst
+        self.min_delay = min_delay
+        self.max_delay = max_delay
+        self.clock = clock
+        self.sleep = sleep
+        self.lock = asyncio.Lock()
+        self.tokens = float(burst)
+        self.updated: Optional[float] = None
+        self.last_request: Optional[float] = None
+        self.requests = 0
+        self.waited_seconds = 0.0
+
+    def _refill(self, now: float):
+        if self.updated is not None:
+            self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.requests_per_minute / 60)
+        self.updated = now
+
+    async def acquire(self, cost: float = 1):
+        """Wait until the next request, taking cost tokens from the bucket, may be sent"""
+        # A cost above the bucket size could never be met
+        cost = min(cost, self.burst)
+        async with self.lock:
+            now = self.clock()
+            self._refill(now)
+            delay = 0.0
+            if self.last_request is not None:
+                delay = self.last_request + random.uniform(self.min_delay, self.max_delay) - now
+            if self.tokens < cost:
+                delay = max(delay, (cost - self.tokens) * 60 / self.requests_per_minute)
+            if delay > 0:
+                await self.sleep(delay)
+                self.waited_seconds += delay
+                now = self.clock()
+                self._refill(now)
+            self.tokens -= cost
+            self.last_request = now
+            self.requests += 1
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "platform": self.platform,
+            "account": self.account,
+            "requests_per_minute": self.requests_per_minute,
+            "burst": self.burst,
+            "requests": self.requests,
+            "waited_seconds": round(self.waited_seconds, 2),
+        }
+
+_pacers: Dict[Tuple[str, str], RequestPacer] = {}
+
+def get_pacer(platform: str, account: str) -> RequestPacer:
+    """
+    Shared pacer per platform account, configured by {PLATFORM}_REQUESTS_PER_MINUTE,
+    {PLATFORM}_REQUEST_BURST and {PLATFORM}_REQUEST_DELAY_MIN/MAX_SECONDS
+    """
+    key = (platform, account)
+    pacer = _pacers.get(key)
+    if pacer is None:
+        settings = get_settings()
+        prefix = platform.upper()
+        pacer = _pacers[key] = RequestPacer(
+            platform,
+            account,
+            getattr(settings, f"{prefix}_REQUESTS_PER_MINUTE"),
+            getattr(settings, f"{prefix}_REQUEST_BURST"),
+            getattr(settings, f"{prefix}_REQUEST_DELAY_MIN_SECONDS"),
+            getattr(settings, f"{prefix}_REQUEST_DELAY_MAX_SECONDS"),
+        )
+    return pacer
+
+def pacer_stats() -> List[Dict[str, Any]]:
+    return [pacer.stats() for pacer in _pacers.values()]
@@ -0,0 +1,121 @@
+from ..models.social_post import SocialPost
+from ..config.settings import get_settings, get_keywords
+from .matchers.base_matcher import BaseMatcher
+from .matchers.question_matcher import QuestionMatcher
+from .matchers.matcher_chain import MatcherChain
+from .reddit_service import RedditService
+from .blocking import get_executor
+from .stream_ingest import StreamConsumer
+from .watermark_store import WatermarkStore, get_watermark_store
+from . import scan_runner
+from collections import OrderedDict
+from datetime import datetime, timezone
+from functools import lru_cache
+from typing import Awaitable, Callable, List, Optional
+import logging
+
+logger = logging.getLogger("uvicorn")
+
+COMMENTS_SOURCE = "comments"
+# Ids of the latest comments received, to recognize them when relisted. Well
+# over the 100 comments a relisting returns.
+RECENT_COMMENT_IDS = 1000
+
+class RedditCommentStream(StreamConsumer):
+    """
+    Long-running ingestion of new comments in the configured subreddits.
+
+    Reads the combined subreddit's comment stream through asyncpraw, which
+    polls /comments and backs off while nothing new arrives. The stream is
+    only advanced when the consumer queue has room, so a slow matcher or
+    notifier holds back polling instead of buffering. On start and after a
+    failure the newest comments are listed again. Those already received are
+    recognized by id, since several comments can share a second, and after a
+    restart those older than the saved checkpoint are skipped too.
+    Each connection opens its own Reddit client and closes it when the stream
+    ends, rather than holding the scans' shared client from the registry for
+    as long as it runs.
+    """
+
+    platform = "reddit"
+    checkpoint_source = COMMENTS_SOURCE
+
+    def __init__(
+        self,
+        subreddits: List[str],
+        matcher: MatcherChain,
+        on_matches: Callable[[List[SocialPost]], Awaitable[bool]],
+        watermarks: WatermarkStore,
+        queue_size: int = 5000,
+        batch_size: int = 200,
+        flush_seconds: float = 300,
+        reconnect_delay: float = 1.0,
+    ):
+        super().__init__(matcher, on_matches, watermarks, queue_size, batch_size, flush_seconds, reconnect_delay)
+        self.subreddits = subreddits
+        self.resume_after: Optional[datetime] = None
+        self.recent_ids: "OrderedDict[str, None]" = OrderedDict()
+
+    def _seen(self, comment_id: str) -> bool:
+        """Whether the comment was received before, remembering it if not"""
+        if comment_id in self.recent_ids:
+            return True
+        self.recent_ids[comment_id] = None
+        if len(self.recent_ids) > RECENT_COMMENT_IDS:
+            self.recent_ids.popitem(last=False)
+        return False
+
+    async def consume(self):
+        if self.resume_after is None:
+            self.resume_after = await self.resume_from()
+
+        service = await get_executor("client").run(RedditService)
+        try:
+            await service.ensure_client()
+            subreddit = await service.reddit.subreddit("+".join(self.subreddits))
+            self.state.connected = True
+            logger.info(f"Streaming comments from {len(self.subreddits)} subreddits")
+            async for comment in subreddit.stream.comments(skip_existing=False):
+                self.state.messages_received += 1
+                # Comments in the checkpoint's own second are relisted after a
+                # restart; the dedup store drops the ones already notified
+                if self.item_time(comment) < self.resume_after or self._seen(comment.id):
+                    continue
+                await self.enqueue(comment)
+        finally:
+            await service.close()
+
+    def item_text(self, comment) -> str:
+        return comment.body
+
+    def item_time(self, comment) -> datetime:
+        return datetime.fromtimestamp(comment.created_utc, timezone.utc)
+
+    def normalize_post(self, comment, matched_keyword: str) -> SocialPost:
+        """Convert a Reddit comment to normalized SocialPost model"""
+        return SocialPost(
+            platform="reddit",
+            content=comment.body,
+            title=getattr(comment, "link_title", None),
+            author=str(comment.author),
+            url=f"https://reddit.com{comment.permalink}",
+            timestamp=self.item_time(comment),
+            keyword_matched=matched_keyword,
+            subreddit=str(comment.subreddit),
+            score=comment.score,
+            post_id=f"t1_{comment.id}",
+        )
+
+@lru_cache()
+def get_reddit_comment_stream() -> RedditCommentStream:
+    settings = get_settings()
+    keywords = get_keywords()["reddit"]
+    return RedditCommentStream(
+        keywords["subreddits"],
+        MatcherChain.for_platform(keywords, [BaseMatcher, QuestionMatcher], settings),
+        lambda posts: scan_runner.notify_new(posts, queue_undelivered=False),
+        get_watermark_store(),
+        settings.REDDIT_COMMENT_STREAM_QUEUE_SIZE,
+        settings.REDDIT_COMMENT_STREAM_BATCH_SIZE,
+        settings.REDDIT_COMMENT_STREAM_FLUSH_SECONDS,
+    )
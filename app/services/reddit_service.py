@@ -1,24 +1,47 @@
 import asyncpraw
+from asyncprawcore.exceptions import BadRequest, Forbidden, NotFound, Redirect, TooManyRequests
 import ssl
 import certifi
 from aiohttp import ClientSession, TCPConnector
 from ..models.social_post import SocialPost
 from ..config.settings import get_settings, get_keywords
 from .matchers.base_matcher import BaseMatcher
-from .matchers.question_matcher import QuestionMatcher
-from datetime import datetime, timedelta
-from typing import List
+from .matchers.question_matcher import QuestionMatcher, PatternSet
+from .matchers.matcher_chain import MatcherChain
+from .scan_events import PostCallback, ProgressCallback, report_progress
+from .watermark_store import get_watermark_store
+from .resilience import CLIENT, FATAL, TRANSIENT, CircuitOpen, get_breaker
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List, Optional
+import asyncio
 import logging
-import re
 
 logger = logging.getLogger("uvicorn")
 
+# Reddit listings return at most 100 submissions per request, and 1000 in total
+LISTING_PAGE_SIZE = 100
+MAX_LISTING_LIMIT = 1000
+# Room above the expected post count when sizing a listing
+LISTING_LIMIT_HEADROOM = 1.5
+
+REDDIT_QUESTION_PATTERNS = PatternSet([
+    r"(?i)how (do|can|should) (i|you|one)",
+    r"(?i)what('s| is) (the best|a good)",
+    r"(?i)anyone know (of|about|how)",
+])
+
 class RedditService:
     def __init__(self):
         logger.info("Initializing RedditService")
         self.settings = get_settings()
         self.keywords = get_keywords()["reddit"]
-        self.reddit = self._initialize_reddit()
+        self.matcher = MatcherChain.for_platform(self.keywords, [BaseMatcher, QuestionMatcher], self.settings)
+        self.watermarks = get_watermark_store()
+        # Observed posts per minute by lowercased subreddit name
+        self.post_rates: Dict[str, float] = {}
+        # asyncpraw retries failed requests itself, so listings only go through the breaker
+        self.breaker = get_breaker("reddit")
+        self.reddit = None  # Created on first scan, as its session needs the event loop
         logger.info(f"Configured to scan subreddits: {', '.join(self.keywords['subreddits'])}")
 
     def _initialize_reddit(self):
@@ -46,35 +69,48 @@ class RedditService:
             logger.error(f"Failed to initialize Reddit client: {str(e)}")
             raise
 
+    async def ensure_client(self):
+        if self.reddit is None:
+            self.reddit = self._initialize_reddit()
+
     def _check_reddit_specific_patterns(self, text: str) -> tuple[bool, str]:
         """Reddit-specific pattern matching"""
-        question_patterns = [
-            r"(?i)how (do|can|should) (i|you|one)",
-            r"(?i)what('s| is) (the best|a good)",
-            r"(?i)anyone know (of|about|how)",
-        ]
-        
-        for pattern in question_patterns:
-            if re.search(pattern, text):
-                return True, f"question_pattern:{pattern}"
-        
+        pattern = REDDIT_QUESTION_PATTERNS.search(text)
+        if pattern is not None:
+            return True, f"question_pattern:{pattern}"
+
         return False, ""
 
-    def _match_content(self, text: str) -> tuple[bool, str]:
+    async def _match_content(self, text: str) -> tuple[bool, str]:
         """Match content against keywords and patterns"""
-        # Try base keyword matching first
-        matches, keyword = BaseMatcher.match(text, self.keywords)
-        if matches:
-            logger.info(f"Found matching keyword: {keyword}")
-            return True, keyword
-            
-        # Try question matching
-        matches, pattern = QuestionMatcher.match(text, self.keywords)
-        if matches:
-            logger.info(f"Found matching question pattern: {pattern}")
-            return True, pattern
-        
-        return False, ""
+        return (await self._match_many([text]))[0]
+
+    async def _match_many(self, texts: List[str]) -> List[tuple[bool, str]]:
+        """Match a batch of texts against keywords and patterns"""
+        results = await self.matcher.match_many(texts)
+        for matches, label in results:
+            if matches:
+                logger.info(f"Found match: {label}")
+        return results
+
+    async def _match_page(self, submissions) -> List[SocialPost]:
+        """Match a page of fetched submissions and normalize the hits"""
+        results = await self._match_many([
+            f"{submission.title} {submission.selftext}" for submission in submissions
+        ])
+        return [
+            self._normalize_post(submission, keyword)
+            for submission, (matches, keyword) in zip(submissions, results)
+            if matches
+        ]
+
+    @staticmethod
+    def _collect(matching_posts: List[SocialPost], posts: List[SocialPost], on_post: Optional[PostCallback]):
+        """Add matches to the scan results and report each one"""
+        for post in posts:
+            matching_posts.append(post)
+            if on_post:
+                on_post(post)
 
     def _normalize_post(self, submission, matched_keyword: str) -> SocialPost:
         """Convert Reddit submission to normalized SocialPost model"""
@@ -91,41 +127,146 @@ class RedditService:
             num_comments=submission.num_comments
         )
 
-    async def get_matching_posts(self) -> List[SocialPost]:
-        """Get posts matching configured keywords from configured subreddits"""
+    @staticmethod
+    def _classify_error(e: Exception) -> str:
+        """Sort a failed listing for the circuit breaker"""
+        if isinstance(e, (NotFound, Forbidden, Redirect, BadRequest)):
+            # Private, banned or misspelled subreddits
+            return CLIENT
+        if isinstance(e, TooManyRequests):
+            return FATAL
+        return TRANSIENT
+
+    def _listing_limit(self, cutoffs: Dict[str, datetime]) -> int:
+        """How many posts a listing needs to reach back to its cutoffs, from observed post rates"""
+        if any(key not in self.post_rates for key in cutoffs):
+            return MAX_LISTING_LIMIT
+        now = datetime.now(timezone.utc)
+        expected = sum(
+            self.post_rates[key] * (now - cutoff).total_seconds() / 60
+            for key, cutoff in cutoffs.items()
+        )
+        return min(max(int(expected * LISTING_LIMIT_HEADROOM), LISTING_PAGE_SIZE), MAX_LISTING_LIMIT)
+
+    def _observe_rate(self, key: str, posts: int, cutoff: datetime, complete: bool):
+        """Update a subreddit's posts-per-minute estimate"""
+        minutes = max((datetime.now(timezone.utc) - cutoff).total_seconds() / 60, 1)
+        rate = posts / minutes
+        previous = self.post_rates.get(key)
+        if not complete:
+            # The listing ran out before the cutoff, so the real rate is higher
+            rate = max(rate, (previous or rate) * 2)
+        self.post_rates[key] = rate if previous is None else (previous + rate) / 2
+
+    async def _scan_listing(
+        self,
+        names: List[str],
+        scan_cutoff: datetime,
+        matching_posts: List[SocialPost],
+        on_post: Optional[PostCallback],
+        on_progress: Optional[ProgressCallback],
+    ):
+        """Scan one combined a+b+c listing, keeping each subreddit's own cutoff and counts"""
+        listing = "+".join(names)
+        keys = {name.lower(): name for name in names}
+        checked = dict.fromkeys(keys, 0)
+        matched = dict.fromkeys(keys, 0)
+        newest: Dict[str, datetime] = {}
+
+        async def collect(page):
+            posts = await self._match_page(page)
+            for post in posts:
+                matched[post.subreddit.lower()] += 1
+            self._collect(matching_posts, posts, on_post)
+
+        try:
+            cutoffs = {
+                key: await self.watermarks.cutoff("reddit", f"r/{name}", scan_cutoff)
+                for key, name in keys.items()
+            }
+            oldest_cutoff = min(cutoffs.values())
+            limit = self._listing_limit(cutoffs)
+            logger.info(f"Scanning r/{listing} (limit {limit})")
+
+            self.breaker.check()
+            subreddit = await self.reddit.subreddit(listing)
+            posts_read = 0
+            complete = False
+            oldest_read: Optional[datetime] = None
+            page = []
+            async for submission in subreddit.new(limit=limit):
+                posts_read += 1
+                post_time = datetime.fromtimestamp(submission.created_utc, timezone.utc)
+                oldest_read = post_time
+                if post_time <= oldest_cutoff:
+                    logger.info(f"Reached cutoff time in r/{listing} after checking {posts_read} posts")
+                    complete = True
+                    break
+
+                key = str(submission.subreddit).lower()
+                if key not in cutoffs or post_time <= cutoffs[key]:
+                    continue
+                checked[key] += 1
+                newest[key] = max(newest.get(key, post_time), post_time)
+                page.append(submission)
+                if len(page) == LISTING_PAGE_SIZE:
+                    await collect(page)
+                    page = []
+
+            if page:
+                await collect(page)
+            self.breaker.record_success()
+            if not complete and posts_read == limit:
+                logger.warning(f"r/{listing} listing hit its limit of {limit} before the cutoff")
+            else:
+                complete = True
+
+            for key, name in keys.items():
+                # A truncated listing still covers subreddits whose own cutoff it reached
+                covered = complete or (oldest_read is not None and oldest_read <= cutoffs[key])
+                self._observe_rate(key, checked[key], cutoffs[key], covered)
+                if not covered:
+                    # Posts between the last one read and the cutoff were never
+                    # fetched, so the next scan has to reach back to the same cutoff
+                    await self.watermarks.advance("reddit", f"r/{name}", cutoffs[key])
+                elif key in newest:
+                    await self.watermarks.advance("reddit", f"r/{name}", newest[key])
+                logger.info(f"Completed scanning r/{name}, checked {checked[key]} posts, found {matched[key]} matches")
+                report_progress(on_progress, f"r/{name}", checked[key], matched[key])
+
+        except Exception as e:
+            logger.error(f"Error scanning r/{listing}: {str(e)}")
+            if not isinstance(e, CircuitOpen):
+                self.breaker.record(self._classify_error(e))
+            for key, name in keys.items():
+                report_progress(on_progress, f"r/{name}", checked[key], matched[key], str(e))
+
+    async def get_matching_posts(self, on_post: Optional[PostCallback] = None, on_progress: Optional[ProgressCallback] = None) -> List[SocialPost]:
+        """Get posts matching configured keywords from configured subreddits
+
+        Subreddits are read through combined a+b+c listings of
+        REDDIT_COMBINED_CHUNK_SIZE subreddits, several at a time. on_post is
+        called with each match as soon as it is found, and on_progress once
+        each subreddit has been scanned
+        """
         matching_posts = []
-        scan_cutoff = datetime.utcnow() - timedelta(minutes=self.settings.SCAN_INTERVAL_MINUTES)
+        scan_cutoff = datetime.now(timezone.utc) - timedelta(minutes=self.settings.SCAN_INTERVAL_MINUTES)
         logger.info(f"Starting Reddit scan, cutoff time: {scan_cutoff}")
 
         try:
-            for subreddit_name in self.keywords["subreddits"]:
-                try:
-                    logger.info(f"Scanning r/{subreddit_name}")
-                    subreddit = await self.reddit.subreddit(subreddit_name)
-                    posts_checked = 0
-                    
-                    async for submission in subreddit.new(limit=500):
-                        posts_checked += 1
-                        post_time = datetime.fromtimestamp(submission.created_utc)
-                        if post_time < scan_cutoff:
-                            logger.info(f"Reached cutoff time in r/{subreddit_name} after checking {posts_checked} posts")
-                            break
-
-                        post_text = f"{submission.title} {submission.selftext}"
-                        matches, keyword = self._match_content(post_text)
-                        
-                        logger.debug(f"Post {posts_checked}: Match={matches}, Keyword={keyword}, Title={submission.title[:50]}...")
-                        
-                        if matches:
-                            matching_posts.append(
-                                self._normalize_post(submission, keyword)
-                            )
-
-                    logger.info(f"Completed scanning r/{subreddit_name}, checked {posts_checked} posts, found {len(matching_posts)} matches")
-                    
-                except Exception as e:
-                    logger.error(f"Error scanning r/{subreddit_name}: {str(e)}")
-                    continue
+            await self.ensure_client()
+            subreddits = list(self.keywords["subreddits"])
+            chunk_size = max(self.settings.REDDIT_COMBINED_CHUNK_SIZE, 1)
+            semaphore = asyncio.Semaphore(self.settings.REDDIT_LISTING_CONCURRENCY)
+
+            async def scan(names: List[str]):
+                async with semaphore:
+                    await self._scan_listing(names, scan_cutoff, matching_posts, on_post, on_progress)
+
+            await asyncio.gather(*(
+                scan(subreddits[start:start + chunk_size])
+                for start in range(0, len(subreddits), chunk_size)
+            ))
 
         except Exception as e:
             logger.error(f"Error in Reddit scan: {str(e)}")
@@ -136,6 +277,8 @@ class RedditService:
 
     async def close(self):
         """Close the Reddit client session"""
+        if self.reddit is None:
+            return
         try:
             await self.reddit.close()
             logger.info("Closed Reddit client session")
@@ -0,0 +1,202 @@
+from ..config.settings import get_settings
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+import asyncio
+import logging
+import random
+import time
+
+logger = logging.getLogger("uvicorn")
+
+# How a failed platform call is handled, as decided by each service's classifier
+AUTH = "auth"            # session expired: log in again once, then retry
+TRANSIENT = "transient"  # network or server trouble: retry with backoff
+FATAL = "fatal"          # the platform refuses us (throttled, challenged): no retry
+CLIENT = "client"        # the request itself was bad (not found, disabled): the platform is fine
+LOCAL = "local"          # refused before any request was made (out of quota): says nothing about the platform
+
+ErrorClassifier = Callable[[Exception], str]
+
+def always_transient(error: Exception) -> str:
+    return TRANSIENT
+
+class CircuitOpen(Exception):
+    """Raised instead of calling a platform whose circuit breaker is open"""
+
+class CircuitBreaker:
+    """
+    Counts consecutive failed calls to one platform. After failure_threshold of
+    them the circuit opens and calls fail fast with CircuitOpen. Once
+    reset_seconds have passed calls are let through again (half-open). The first
+    success closes the circuit, and another failure opens it again straight away.
+    """
+
+    def __init__(self, platform: str, failure_threshold: int, reset_seconds: float, clock: Callable[[], float] = time.monotonic):
+        self.platform = platform
+        self.failure_threshold = failure_threshold
+        self.reset_seconds = reset_seconds
+        self.clock = clock
+        self.consecutive_failures = 0
+        self.opened_at: Optional[float] = None
+        self.trips = 0
+        self.short_circuited = 0
+
+    @property
+    def state(self) -> str:
+        if self.opened_at is None:
+            return "closed"
+        if self.clock() - self.opened_at < self.reset_seconds:
+            return "open"
+        return "half_open"
+
+    def check(self):
+        """Raise CircuitOpen while the circuit is open"""
+        if self.state == "open":
+            self.short_circuited += 1
+            retry_in = self.reset_seconds - (self.clock() - self.opened_at)
+            raise CircuitOpen(
+                f"{self.platform} circuit open after {self.consecutive_failures} consecutive failures, "
+                f"retrying in {retry_in:.0f}s"
+            )
+
+    def record_success(self):
+        if self.opened_at is not None:
+            logger.info(f"{self.platform} circuit closed")
+        self.consecutive_failures = 0
+        self.opened_at = None
+
+    def record_failure(self):
+        self.consecutive_failures += 1
+        if self.state == "open":
+            return
+        if self.opened_at is not None or self.consecutive_failures >= self.failure_threshold:
+            logger.warning(f"{self.platform} circuit opened after {self.consecutive_failures} consecutive failures")
+            self.opened_at = self.clock()
+            self.trips += 1
+
+    def record(self, kind: str):
+        """Record a call that failed with an error of the given kind"""
+        if kind == LOCAL:
+            return
+        if kind == CLIENT:
+            self.record_success()
+        else:
+            self.record_failure()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "platform": self.platform,
+            "state": self.state,
+            "consecutive_failures": self.consecutive_failures,
+            "trips": self.trips,
+            "short_circuited": self.short_circuited,
+        }
+
+class ResilientCaller:
+    """
+    Calls one platform's API through its circuit breaker. The classifier sorts
+    errors into AUTH, TRANSIENT, FATAL, CLIENT and LOCAL. Transient errors are
+    retried up to retries times with full-jitter exponential backoff. An auth
+    error runs the reauth hook once and then retries. LOCAL errors are raised
+    as they are, without telling the breaker.
+    """
+
+    def __init__(
+        self,
+        breaker: CircuitBreaker,
+        retries: int,
+        base_delay: float,
+        max_delay: float,
+        classify: ErrorClassifier = always_transient,
+        reauth: Optional[Callable[[], Awaitable[Any]]] = None,
+        sleep: Callable[[float], Awaitable[Any]] = asyncio.sleep,
+    ):
+        self.breaker = breaker
+        self.retries = retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.classify = classify
+        self.reauth = reauth
+        self.sleep = sleep
+
+    async def call(self, fn: Callable[..., Awaitable[Any]], *args, **kwargs) -> Any:
+        """Await fn(*args, **kwargs), re-authenticating and retrying as needed"""
+        return await self._call(fn, args, kwargs, self.reauth)
+
+    async def login(self, fn: Callable[..., Awaitable[Any]], *args, **kwargs) -> Any:
+        """Await a login call: retried like any other, but an auth error is final"""
+        return await self._call(fn, args, kwargs, None)
+
+    def _backoff(self, attempt: int) -> float:
+        return random.uniform(0, min(self.max_delay, self.base_delay * 2 ** attempt))
+
+    async def _call(self, fn, args, kwargs, reauth) -> Any:
+        attempt = 0
+        while True:
+            self.breaker.check()
+            try:
+                result = await fn(*args, **kwargs)
+            except CircuitOpen:
+                raise
+            except Exception as e:
+                kind = self.classify(e)
+                if kind == AUTH and reauth is not None:
+                    logger.warning(f"{self.breaker.platform} session expired, attempting to re-authenticate")
+                    # Another auth error after this one is final
+                    hook, reauth = reauth, None
+                    try:
+                        await hook()
+                    except CircuitOpen:
+                        raise
+                    except Exception:
+                        self.breaker.record_failure()
+                        raise
+                    continue
+
+                self.breaker.record(kind)
+                if kind != TRANSIENT or attempt >= self.retries or self.breaker.state == "open":
+                    raise
+                delay = self._backoff(attempt)
+                attempt += 1
+                logger.warning(
+                    f"{self.breaker.platform} call failed: {str(e)}, retry {attempt}/{self.retries} in {delay:.1f}s"
+                )
+                await self.sleep(delay)
+                continue
+
+            self.breaker.record_success()
+            return result
+
+_breakers: Dict[str, CircuitBreaker] = {}
+
+def get_breaker(platform: str) -> CircuitBreaker:
+    """Shared circuit breaker per platform"""
+    breaker = _breakers.get(platform)
+    if breaker is None:
+        settings = get_settings()
+        breaker = _breakers[platform] = CircuitBreaker(
+            platform, settings.CIRCUIT_FAILURE_THRESHOLD, settings.CIRCUIT_RESET_SECONDS
+        )
+    return breaker
+
+def find_breaker(platform: str) -> Optional[CircuitBreaker]:
+    """The platform's breaker, or None if it hasn't made any calls yet"""
+    return _breakers.get(platform)
+
+def resilient_caller(
+    platform: str,
+    classify: ErrorClassifier = always_transient,
+    reauth: Optional[Callable[[], Awaitable[Any]]] = None,
+) -> ResilientCaller:
+    """A caller on the platform's shared breaker, with the configured retry policy"""
+    settings = get_settings()
+    return ResilientCaller(
+        get_breaker(platform),
+        settings.RETRY_ATTEMPTS,
+        settings.RETRY_BASE_DELAY_SECONDS,
+        settings.RETRY_MAX_DELAY_SECONDS,
+        classify,
+        reauth,
+    )
+
+def breaker_stats() -> List[Dict[str, Any]]:
+    return [breaker.stats() for breaker in _breakers.values()]
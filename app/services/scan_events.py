@@ -0,0 +1,17 @@
+from ..models.social_post import SocialPost
+from typing import Any, Callable, Dict, Optional
+
+# Callbacks services report to while a scan runs
+PostCallback = Callable[[SocialPost], None]
+ProgressCallback = Callable[[Dict[str, Any]], None]
+
+def report_progress(
+    on_progress: Optional[ProgressCallback],
+    source: str,
+    checked: int,
+    matched: int,
+    error: Optional[str] = None,
+):
+    """Report that a subreddit, community, feed, channel or account is done"""
+    if on_progress:
+        on_progress({"source": source, "checked": checked, "matched": matched, "error": error})
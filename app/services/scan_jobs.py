@@ -0,0 +1,179 @@
+from ..models.social_post import SocialPost
+from ..schemas.responses import PlatformScanStatus, ScanJobStatus
+from ..config.settings import get_settings
+from . import scan_runner
+from datetime import datetime, timedelta, timezone
+from functools import lru_cache
+from typing import Dict, List, Optional, Set, Tuple
+import asyncio
+import logging
+import time
+import uuid
+
+logger = logging.getLogger("uvicorn")
+
+class ScanJob:
+    """
+    A scan running in the background, updated as platforms report back.
+
+    Requesters sharing the job can ask for its results with or without the AI
+    filter; each setting asked for gets its own view of the matches.
+    """
+
+    def __init__(self, scope: str, platforms: List[str], apply_ai_filter: bool):
+        self.id = uuid.uuid4().hex
+        self.scope = scope
+        self.platforms = platforms
+        self.apply_ai_filter = apply_ai_filter  # the view of the first requester
+        self.ai_filter_views: Set[bool] = {apply_ai_filter}
+        self.status = "running"  # then "completed", "failed" or "cancelled"
+        self.created_at = datetime.now(timezone.utc)
+        self.finished_at: Optional[datetime] = None
+        self.sources_scanned = 0
+        self.posts: List[SocialPost] = []  # matches as they are found
+        self.views: Dict[bool, List[SocialPost]] = {}
+        self.platform_status: Dict[str, PlatformScanStatus] = {}
+        self.platform_started: Dict[str, float] = {}
+        self.error: Optional[str] = None
+        self.task: Optional[asyncio.Task] = None
+
+    @property
+    def done(self) -> bool:
+        return self.status != "running"
+
+    async def ensure_view(self, apply_ai_filter: bool):
+        """Build a finished job's view for a setting none of its requesters asked for"""
+        if self.status != "completed" or apply_ai_filter in self.views:
+            return
+        self.ai_filter_views.add(apply_ai_filter)
+        self.views[apply_ai_filter] = await scan_runner.ai_filter(self.posts) if apply_ai_filter else list(self.posts)
+
+    def snapshot(self, apply_ai_filter: Optional[bool] = None) -> ScanJobStatus:
+        """
+        The job's status, with its posts as seen with or without the AI filter.
+        A finished job must have the view; see ensure_view.
+        """
+        if apply_ai_filter is None:
+            apply_ai_filter = self.apply_ai_filter
+        platforms = {}
+        for platform in self.platforms:
+            if platform in self.platform_status:
+                platforms[platform] = self.platform_status[platform]
+            else:
+                started = self.platform_started.get(platform, time.monotonic())
+                platforms[platform] = PlatformScanStatus(
+                    status="running",
+                    duration_seconds=round(time.monotonic() - started, 2),
+                )
+        if self.status == "completed":
+            if apply_ai_filter not in self.views:
+                raise ValueError(f"Scan job {self.id} has no view with apply_ai_filter={apply_ai_filter}")
+            posts = self.views[apply_ai_filter]
+        else:
+            posts = self.posts
+        return ScanJobStatus(
+            id=self.id,
+            scope=self.scope,
+            apply_ai_filter=apply_ai_filter,
+            status=self.status,
+            created_at=self.created_at,
+            finished_at=self.finished_at,
+            sources_scanned=self.sources_scanned,
+            platforms=platforms,
+            posts=list(posts),
+            error=self.error,
+        )
+
+class ScanJobManager:
+    """
+    Keeps scan jobs in memory. A request for a scope that already has a running
+    job joins that job instead of logging in and fetching a second time,
+    whichever apply_ai_filter setting it asks for.
+    """
+
+    def __init__(self, retention: timedelta):
+        self.retention = retention
+        self.jobs: Dict[str, ScanJob] = {}
+        self.running: Dict[str, ScanJob] = {}
+
+    @staticmethod
+    def platforms_for(scope: str) -> List[str]:
+        if scope == "aggregate":
+            return list(scan_runner.AGGREGATE_PLATFORMS)
+        if scope in scan_runner.PLATFORM_SERVICES:
+            return [scope]
+        raise ValueError(f"Unknown scan scope: {scope}")
+
+    def submit(self, scope: str, apply_ai_filter: bool = False) -> Tuple[ScanJob, bool]:
+        """Start a job for the scope, or return the running one. The flag is True for a new job."""
+        platforms = self.platforms_for(scope)
+        self._prune()
+
+        existing = self.running.get(scope)
+        if existing is not None and not existing.done:
+            logger.info(f"Joining running {scope} scan job {existing.id}")
+            existing.ai_filter_views.add(apply_ai_filter)
+            return existing, False
+
+        job = ScanJob(scope, platforms, apply_ai_filter)
+        self.jobs[job.id] = job
+        self.running[scope] = job
+        job.task = asyncio.create_task(self._run(job))
+        logger.info(f"Started {scope} scan job {job.id}")
+        return job, True
+
+    def get(self, job_id: str) -> Optional[ScanJob]:
+        return self.jobs.get(job_id)
+
+    def is_busy(self, platform: str) -> bool:
+        """Whether a running job is scanning the platform"""
+        return any(platform in job.platforms for job in self.running.values() if not job.done)
+
+    async def _scan_platform(self, job: ScanJob, platform: str) -> List[SocialPost]:
+        job.platform_started[platform] = time.monotonic()
+
+        def on_progress(event):
+            job.sources_scanned += 1
+
+        posts, status = await scan_runner.scan_platform(platform, job.posts.append, on_progress)
+        job.platform_status[platform] = status
+        return posts
+
+    async def _run(self, job: ScanJob):
+        try:
+            results = await asyncio.gather(*(self._scan_platform(job, platform) for platform in job.platforms))
+            matches = [post for posts in results for post in posts]
+            job.views = await scan_runner.filter_and_notify_views(matches, set(job.ai_filter_views))
+            # Requesters who joined while the posts were being filtered
+            while missing := job.ai_filter_views - job.views.keys():
+                apply_ai_filter = missing.pop()
+                job.views[apply_ai_filter] = await scan_runner.ai_filter(matches) if apply_ai_filter else matches
+            job.status = "completed"
+        except asyncio.CancelledError:
+            job.status = "cancelled"
+            raise
+        except Exception as e:
+            logger.error(f"Scan job {job.id} failed: {str(e)}")
+            job.status = "failed"
+            job.error = str(e)
+        finally:
+            job.finished_at = datetime.now(timezone.utc)
+            self.running.pop(job.scope, None)
+            logger.info(f"Scan job {job.id} {job.status} with {len(job.posts)} matches")
+
+    def _prune(self):
+        cutoff = datetime.now(timezone.utc) - self.retention
+        for job_id, job in list(self.jobs.items()):
+            if job.done and job.finished_at < cutoff:
+                del self.jobs[job_id]
+
+    async def shutdown(self):
+        """Cancel jobs that are still running"""
+        tasks = [job.task for job in self.running.values() if job.task and not job.task.done()]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+@lru_cache()
+def get_scan_job_manager() -> ScanJobManager:
+    return ScanJobManager(timedelta(minutes=get_settings().SCAN_JOB_RETENTION_MINUTES))
@@ -0,0 +1,192 @@
+from ..models.social_post import SocialPost
+from ..schemas.responses import PlatformScanStatus
+from ..config.settings import get_settings
+from .reddit_service import RedditService
+from .twitter_service import TwitterService
+from .bluesky_service import BlueskyService
+from .youtube_service import YouTubeService
+from .instagram_service import InstagramService
+from .openai_service import OpenAIService
+from .email_service import send_notification
+from .dedup_store import get_dedup_store, post_key
+from .notification_queue import get_notification_queue
+from .scan_events import PostCallback, ProgressCallback
+from .client_registry import ClientRegistry
+from .resilience import find_breaker
+from datetime import timedelta
+from functools import lru_cache
+from typing import Collection, Dict, List, Optional, Tuple
+import asyncio
+import logging
+import time
+
+logger = logging.getLogger("uvicorn")
+
+PLATFORM_SERVICES = {
+    "reddit": RedditService,
+    "twitter": TwitterService,
+    "bluesky": BlueskyService,
+    "youtube": YouTubeService,
+    "instagram": InstagramService,
+}
+
+# Instagram is left out of the aggregate scan
+AGGREGATE_PLATFORMS = ["reddit", "twitter", "bluesky", "youtube"]
+
+@lru_cache()
+def get_client_registry() -> ClientRegistry:
+    return ClientRegistry(timedelta(minutes=get_settings().CLIENT_MAX_AGE_MINUTES))
+
+def is_scanning(platform: str) -> bool:
+    """
+    Whether a scan of the platform is running, from any entry point. Every
+    scan leases the platform's service, so this is whether it is leased.
+    """
+    return get_client_registry().in_use(platform)
+
+def platform_deadline(platform: str) -> float:
+    """Seconds a platform may spend on one scan"""
+    return getattr(get_settings(), f"{platform.upper()}_SCAN_DEADLINE_SECONDS")
+
+async def scan_platform(
+    platform: str,
+    on_post: Optional[PostCallback] = None,
+    on_progress: Optional[ProgressCallback] = None,
+) -> Tuple[List[SocialPost], PlatformScanStatus]:
+    """
+    Scan one platform under its deadline. Matches found before a timeout or
+    error are kept and returned with the platform's status.
+    """
+    posts: List[SocialPost] = []
+
+    def collect(post: SocialPost):
+        posts.append(post)
+        if on_post:
+            on_post(post)
+
+    def progress(event):
+        if on_progress:
+            on_progress({"platform": platform, **event})
+
+    deadline = platform_deadline(platform)
+    started = time.monotonic()
+    status, error = "ok", None
+    try:
+        async with get_client_registry().lease(platform, PLATFORM_SERVICES[platform]) as service:
+            await asyncio.wait_for(service.get_matching_posts(on_post=collect, on_progress=progress), timeout=deadline)
+    except asyncio.TimeoutError:
+        status, error = "timeout", f"Scan exceeded {deadline:.0f}s deadline"
+        logger.warning(f"{platform} scan timed out after {deadline:.0f}s with {len(posts)} matches so far")
+    except Exception as e:
+        status, error = "error", str(e)
+        logger.error(f"{platform} scan failed: {str(e)}")
+    else:
+        breaker = find_breaker(platform)
+        if breaker is not None and breaker.state != "closed":
+            # Sources after the breaker opened were skipped
+            status, error = "degraded", f"{platform} circuit {breaker.state} after {breaker.consecutive_failures} consecutive failures"
+            logger.warning(f"{platform} scan degraded: {error}")
+
+    return posts, PlatformScanStatus(
+        status=status,
+        posts_found=len(posts),
+        duration_seconds=round(time.monotonic() - started, 2),
+        error=error,
+    )
+
+async def scan_platforms(
+    platforms: List[str],
+    on_post: Optional[PostCallback] = None,
+    on_progress: Optional[ProgressCallback] = None,
+) -> Tuple[List[SocialPost], Dict[str, PlatformScanStatus]]:
+    """Scan platforms concurrently, returning all matches and a status per platform"""
+    results = await asyncio.gather(*(
+        scan_platform(platform, on_post, on_progress) for platform in platforms
+    ))
+
+    all_posts: List[SocialPost] = []
+    statuses: Dict[str, PlatformScanStatus] = {}
+    for platform, (posts, status) in zip(platforms, results):
+        all_posts.extend(posts)
+        statuses[platform] = status
+    return all_posts, statuses
+
+async def ai_filter(posts: List[SocialPost]) -> List[SocialPost]:
+    """Keep the posts the OpenAI filter judges worth promoting to"""
+    if not posts:
+        return []
+    posts = await OpenAIService().filter_promotion_worthy(posts)
+    if posts:
+        logger.info(f"After AI filtering: {len(posts)} promotion-worthy posts")
+    else:
+        logger.info("No posts passed AI filtering")
+    return posts
+
+async def notify_new(
+    posts: List[SocialPost], emailed: Optional[List[SocialPost]] = None, queue_undelivered: bool = True,
+) -> bool:
+    """
+    Email the posts earlier scans haven't handled and mark them seen. emailed
+    narrows what is sent, such as to the posts the AI filter kept; the other
+    new posts are marked seen all the same. Every notification first sends
+    whatever is in the notification queue.
+
+    Scans have already moved their watermarks past these posts, so if the email
+    fails they are kept in the notification queue. Callers that can retry the
+    posts themselves pass queue_undelivered=False instead: the posts are left
+    unseen and False is returned.
+    """
+    dedup_store = get_dedup_store()
+    queue = get_notification_queue()
+    new_posts = await dedup_store.filter_new(posts)
+    try:
+        if posts and not new_posts:
+            logger.info("All matches were already handled by earlier scans")
+        new_keys = {post_key(post) for post in new_posts}
+        candidates = posts if emailed is None else emailed
+        fresh = list({post_key(post): post for post in candidates if post_key(post) in new_keys}.values())
+        queued = await queue.load()
+        if fresh or queued:
+            if queued:
+                logger.info(f"Retrying {len(queued)} posts from a failed notification")
+            if await send_notification(queued + fresh):
+                await queue.remove(queued)
+            elif queue_undelivered:
+                await queue.add(fresh)
+            else:
+                return False
+        await dedup_store.mark_seen(new_posts)
+        return True
+    finally:
+        dedup_store.release(new_posts)
+
+async def filter_and_notify_views(
+    posts: List[SocialPost], ai_filter_views: Collection[bool]
+) -> Dict[bool, List[SocialPost]]:
+    """
+    Build the scan's matches into one view per requested apply_ai_filter
+    setting, then email the posts of the least filtered view that earlier
+    scans haven't handled. Only one view is emailed, so requesters sharing a
+    scan don't get the same posts twice. The views hold every match, new or
+    not, and are returned.
+    """
+    views: Dict[bool, List[SocialPost]] = {apply_ai_filter: [] for apply_ai_filter in ai_filter_views}
+    if posts:
+        logger.info(f"Found {len(posts)} initial matches")
+        for apply_ai_filter in views:
+            views[apply_ai_filter] = await ai_filter(posts) if apply_ai_filter else list(posts)
+        if True not in views:
+            logger.info("Skipping AI filtering as requested")
+    else:
+        logger.info("No initial matches found")
+
+    await notify_new(posts, views[False] if False in views else views[True])
+    return views
+
+async def filter_and_notify(posts: List[SocialPost], apply_ai_filter: bool) -> List[SocialPost]:
+    """
+    Optionally run the OpenAI filter over the matches, email the ones not
+    handled by earlier scans, and return all that passed
+    """
+    views = await filter_and_notify_views(posts, [apply_ai_filter])
+    return views[apply_ai_filter]
@@ -0,0 +1,86 @@
+from fastapi.responses import StreamingResponse
+from .scan_runner import scan_platforms, filter_and_notify
+from typing import Any, AsyncIterator, Dict, List, Set
+import asyncio
+import json
+import logging
+
+logger = logging.getLogger("uvicorn")
+
+STREAM_MEDIA_TYPES = {
+    "ndjson": "application/x-ndjson",
+    "sse": "text/event-stream",
+}
+
+# Keeps proxies from dropping the connection while a platform is paced
+HEARTBEAT_SECONDS = 15
+
+def format_event(event: str, data: Dict[str, Any], stream_format: str) -> str:
+    """Encode one event as an NDJSON line or a Server-Sent Event"""
+    payload = json.dumps(data, default=str)
+    if stream_format == "sse":
+        return f"event: {event}\ndata: {payload}\n\n"
+    return json.dumps({"event": event, "data": data}, default=str) + "\n"
+
+def format_heartbeat(stream_format: str) -> str:
+    if stream_format == "sse":
+        return ": heartbeat\n\n"
+    return json.dumps({"event": "heartbeat", "data": {}}) + "\n"
+
+# Scans whose client went away, kept referenced until they finish
+_detached_scans: Set[asyncio.Task] = set()
+
+async def stream_scan(platforms: List[str], stream_format: str) -> AsyncIterator[str]:
+    """
+    Yield each match as it is found, a progress event per scanned source, the
+    status of every platform, and a final done event once notifications are sent.
+
+    Services advance their watermarks as they go, so a scan whose client
+    disconnects still runs to completion and sends its notification in the
+    background rather than losing the matches it has already passed.
+    """
+    queue: asyncio.Queue = asyncio.Queue()
+
+    async def run_scan():
+        try:
+            posts, statuses = await scan_platforms(
+                platforms,
+                on_post=lambda post: queue.put_nowait(("post", post.model_dump(mode="json"))),
+                on_progress=lambda event: queue.put_nowait(("progress", event)),
+            )
+            for platform, status in statuses.items():
+                queue.put_nowait(("platform", {"platform": platform, **status.model_dump()}))
+
+            if posts:
+                logger.info(f"Streamed {len(posts)} matching posts")
+                await filter_and_notify(posts, apply_ai_filter=False)
+            queue.put_nowait(("done", {"posts_found": len(posts)}))
+        except Exception as e:
+            logger.error(f"Streaming scan failed: {str(e)}")
+            queue.put_nowait(("error", {"detail": str(e)}))
+        finally:
+            queue.put_nowait(None)
+
+    scan = asyncio.create_task(run_scan())
+    try:
+        while True:
+            try:
+                item = await asyncio.wait_for(queue.get(), timeout=HEARTBEAT_SECONDS)
+            except asyncio.TimeoutError:
+                yield format_heartbeat(stream_format)
+                continue
+            if item is None:
+                break
+            yield format_event(*item, stream_format)
+    finally:
+        if not scan.done():
+            logger.info("Scan stream client disconnected, finishing the scan in the background")
+            _detached_scans.add(scan)
+            scan.add_done_callback(_detached_scans.discard)
+
+def streaming_scan_response(platforms: List[str], stream_format: str) -> StreamingResponse:
+    return StreamingResponse(
+        stream_scan(platforms, stream_format),
+        media_type=STREAM_MEDIA_TYPES[stream_format],
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
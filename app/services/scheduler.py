@@ -0,0 +1,106 @@
+from ..schemas.responses import ScheduledPlatformStatus
+from ..config.settings import get_settings
+from .scan_jobs import ScanJobManager, get_scan_job_manager
+from . import scan_runner
+from datetime import datetime, timedelta, timezone
+from functools import lru_cache
+from typing import Dict, List
+import asyncio
+import logging
+import random
+
+logger = logging.getLogger("uvicorn")
+
+def platform_interval(platform: str) -> int:
+    """Minutes between scheduled runs of a platform"""
+    settings = get_settings()
+    interval = getattr(settings, f"{platform.upper()}_SCAN_INTERVAL_MINUTES", None)
+    return interval or settings.SCAN_INTERVAL_MINUTES
+
+class ScanScheduler:
+    """
+    Runs each platform's scan on its own interval through the job manager.
+
+    The next run is planned only once the current one has finished, so runs of a
+    platform never overlap. A run is skipped when a job already covers the
+    platform or another scan of it is running, such as a direct /scan request,
+    and every start is delayed by a random jitter.
+    """
+
+    def __init__(self, manager: ScanJobManager, platforms: List[str], jitter_seconds: float, apply_ai_filter: bool):
+        self.manager = manager
+        self.platforms = platforms
+        self.jitter_seconds = jitter_seconds
+        self.apply_ai_filter = apply_ai_filter
+        self.state: Dict[str, ScheduledPlatformStatus] = {
+            platform: ScheduledPlatformStatus(platform=platform, interval_minutes=platform_interval(platform))
+            for platform in platforms
+        }
+        self.tasks: List[asyncio.Task] = []
+
+    def _jitter(self) -> timedelta:
+        return timedelta(seconds=random.uniform(0, self.jitter_seconds))
+
+    def start(self):
+        if self.tasks:
+            return
+        logger.info(f"Starting scan scheduler for: {', '.join(self.platforms)}")
+        self.tasks = [asyncio.create_task(self._run_platform(platform)) for platform in self.platforms]
+
+    async def stop(self):
+        for task in self.tasks:
+            task.cancel()
+        await asyncio.gather(*self.tasks, return_exceptions=True)
+        self.tasks = []
+
+    def status(self) -> List[ScheduledPlatformStatus]:
+        return [state.model_copy() for state in self.state.values()]
+
+    async def _run_platform(self, platform: str):
+        state = self.state[platform]
+        interval = timedelta(minutes=state.interval_minutes)
+        state.next_run_at = datetime.now(timezone.utc) + self._jitter()
+
+        while True:
+            delay = (state.next_run_at - datetime.now(timezone.utc)).total_seconds()
+            await asyncio.sleep(max(delay, 0))
+
+            started = datetime.now(timezone.utc)
+            if self.manager.is_busy(platform) or scan_runner.is_scanning(platform):
+                logger.info(f"Skipping scheduled {platform} scan, a scan is already running")
+                state.skipped_runs += 1
+            else:
+                await self._run_once(platform, state, started)
+
+            state.next_run_at = max(started + interval, datetime.now(timezone.utc)) + self._jitter()
+            logger.info(f"Next scheduled {platform} scan at {state.next_run_at}")
+
+    async def _run_once(self, platform: str, state: ScheduledPlatformStatus, started: datetime):
+        state.last_run_started_at = started
+        state.last_run_status = "running"
+        try:
+            job, _ = self.manager.submit(platform, self.apply_ai_filter)
+            state.last_job_id = job.id
+            await asyncio.shield(job.task)
+            state.last_run_status = job.status
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.error(f"Scheduled {platform} scan failed: {str(e)}")
+            state.last_run_status = "failed"
+        finally:
+            state.runs += 1
+            state.last_run_finished_at = datetime.now(timezone.utc)
+            state.last_run_duration_seconds = round(
+                (state.last_run_finished_at - started).total_seconds(), 2
+            )
+
+@lru_cache()
+def get_scan_scheduler() -> ScanScheduler:
+    settings = get_settings()
+    return ScanScheduler(
+        get_scan_job_manager(),
+        settings.SCHEDULER_PLATFORMS,
+        settings.SCHEDULER_JITTER_SECONDS,
+        settings.SCHEDULER_APPLY_AI_FILTER,
+    )
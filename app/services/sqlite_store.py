@@ -0,0 +1,27 @@
+from contextlib import asynccontextmanager
+from typing import AsyncIterator
+import aiosqlite
+import logging
+
+logger = logging.getLogger("uvicorn")
+
+class SQLiteStore:
+    """
+    Base for the small persistent stores kept in the app's state database.
+    Subclasses set schema, which is applied on first use.
+    """
+
+    schema = ""
+
+    def __init__(self, db_path: str):
+        self.db_path = db_path
+        self._schema_ready = False
+
+    @asynccontextmanager
+    async def connect(self) -> AsyncIterator[aiosqlite.Connection]:
+        async with aiosqlite.connect(self.db_path) as db:
+            if not self._schema_ready:
+                await db.executescript(self.schema)
+                await db.commit()
+                self._schema_ready = True
+            yield db
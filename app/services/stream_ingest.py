@@ -0,0 +1,172 @@
+from ..models.social_post import SocialPost
+from ..schemas.responses import StreamStatus
+from .matchers.matcher_chain import MatcherChain
+from .watermark_store import WatermarkStore
+from abc import ABC, abstractmethod
+from datetime import datetime, timezone
+from typing import Any, Awaitable, Callable, List, Optional
+import asyncio
+import logging
+
+logger = logging.getLogger("uvicorn")
+
+MAX_RECONNECT_DELAY_SECONDS = 60
+
+class StreamConsumer(ABC):
+    """
+    Base for long-running, push-style ingestion.
+
+    Subclasses implement consume(), which reads from the source and hands
+    items to enqueue(). The queue is bounded, so when matching falls behind,
+    enqueue() waits and the reader stops pulling from its source. A matcher
+    task drains the queue in batches. Every flush_seconds the matches go to
+    on_matches, and once it reports them delivered the time of the last matched
+    item is saved in the watermark store as the checkpoint to resume from.
+    consume() is restarted with exponential backoff whenever it fails or its
+    source ends.
+    """
+
+    platform = ""
+    checkpoint_source = ""
+
+    def __init__(
+        self,
+        matcher: MatcherChain,
+        on_matches: Callable[[List[SocialPost]], Awaitable[bool]],
+        watermarks: WatermarkStore,
+        queue_size: int = 10000,
+        batch_size: int = 500,
+        flush_seconds: float = 300,
+        reconnect_delay: float = 1.0,
+    ):
+        self.matcher = matcher
+        self.on_matches = on_matches
+        self.watermarks = watermarks
+        self.queue_size = queue_size
+        self.batch_size = batch_size
+        self.flush_seconds = flush_seconds
+        self.reconnect_delay = reconnect_delay
+        self.queue: Optional[asyncio.Queue] = None
+        self.pending: List[SocialPost] = []
+        self.matched_checkpoint: Optional[datetime] = None
+        self.state = StreamStatus()
+        self.tasks: List[asyncio.Task] = []
+
+    @property
+    def name(self) -> str:
+        return f"{self.platform} {self.checkpoint_source}"
+
+    @abstractmethod
+    async def consume(self):
+        """Read from the source until it fails or ends, passing items to enqueue()"""
+
+    @abstractmethod
+    def item_text(self, item: Any) -> str:
+        ...
+
+    @abstractmethod
+    def item_time(self, item: Any) -> datetime:
+        ...
+
+    @abstractmethod
+    def normalize_post(self, item: Any, matched_keyword: str) -> SocialPost:
+        ...
+
+    def start(self):
+        if self.tasks:
+            return
+        logger.info(f"Starting {self.name} stream consumer")
+        self.queue = asyncio.Queue(maxsize=self.queue_size)
+        self.tasks = [
+            asyncio.create_task(self._receive_loop()),
+            asyncio.create_task(self._match_loop()),
+            asyncio.create_task(self._flush_loop()),
+        ]
+        self.state.running = True
+
+    async def stop(self):
+        for task in self.tasks:
+            task.cancel()
+        await asyncio.gather(*self.tasks, return_exceptions=True)
+        self.tasks = []
+        self.state.running = False
+        await self.flush()
+
+    def status(self) -> StreamStatus:
+        return self.state.model_copy(update={
+            "queue_depth": self.queue.qsize() if self.queue else 0,
+            "pending_matches": len(self.pending),
+        })
+
+    async def resume_from(self) -> datetime:
+        """The saved checkpoint, capped at the watermark lookback, or now if there is none"""
+        now = datetime.now(timezone.utc)
+        return await self.watermarks.cutoff(self.platform, self.checkpoint_source, now)
+
+    async def enqueue(self, item: Any):
+        # Waits while the queue is full, holding back the reader
+        await self.queue.put(item)
+
+    async def _receive_loop(self):
+        delay = self.reconnect_delay
+        while True:
+            received = self.state.messages_received
+            try:
+                await self.consume()
+                raise ConnectionError(f"{self.name} stream ended")
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self.state.last_error = str(e)
+                logger.warning(f"{self.name} stream lost: {str(e)}, reconnecting in {delay:.0f}s")
+            finally:
+                self.state.connected = False
+
+            if self.state.messages_received > received:
+                delay = self.reconnect_delay
+            self.state.reconnects += 1
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, MAX_RECONNECT_DELAY_SECONDS)
+
+    async def _match_loop(self):
+        while True:
+            batch = [await self.queue.get()]
+            while len(batch) < self.batch_size and not self.queue.empty():
+                batch.append(self.queue.get_nowait())
+
+            results = await self.matcher.match_many([self.item_text(item) for item in batch])
+            for item, (matches, keyword) in zip(batch, results):
+                if matches:
+                    self.pending.append(self.normalize_post(item, keyword))
+                    self.state.posts_matched += 1
+            self.matched_checkpoint = max(self.item_time(item) for item in batch)
+            # Let the reader refill the queue between batches
+            await asyncio.sleep(0)
+
+    async def _flush_loop(self):
+        while True:
+            await asyncio.sleep(self.flush_seconds)
+            await self.flush()
+
+    async def flush(self):
+        """
+        Hand pending matches to on_matches and save the checkpoint they cover.
+        If they aren't delivered, they stay pending and the checkpoint stays
+        put, so the next flush tries them again.
+        """
+        checkpoint = self.matched_checkpoint
+        posts, self.pending = self.pending, []
+        if posts:
+            try:
+                delivered = await self.on_matches(posts)
+            except Exception as e:
+                logger.error(f"Failed to handle {len(posts)} {self.name} matches: {str(e)}")
+                delivered = False
+            if not delivered:
+                logger.warning(f"Keeping {len(posts)} undelivered {self.name} matches for the next flush")
+                self.pending = posts + self.pending
+                return
+
+        if checkpoint is not None and checkpoint != self.state.checkpoint:
+            await self.watermarks.advance(self.platform, self.checkpoint_source, checkpoint)
+            self.state.checkpoint = checkpoint
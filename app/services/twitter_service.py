@@ -1,168 +1,304 @@
 from twikit import Client
+from twikit.errors import (
+    AccountLocked, AccountSuspended, RequestTimeout, ServerError, TooManyRequests, TwitterException, Unauthorized,
+)
 from datetime import datetime, timedelta, timezone
 from ..models.social_post import SocialPost
 from ..config.settings import get_settings, get_keywords
 from .matchers.base_matcher import BaseMatcher
 from .matchers.question_matcher import QuestionMatcher
-from typing import List, Tuple
+from .matchers.matcher_chain import MatcherChain
+from .scan_events import PostCallback, ProgressCallback, report_progress
+from .watermark_store import get_watermark_store
+from .pacing import get_pacer
+from .resilience import AUTH, CLIENT, FATAL, TRANSIENT, resilient_caller
+from typing import Any, Awaitable, Callable, Dict, List, Tuple, Optional
+import asyncio
 import logging
-from asyncio import sleep
 import random
 import os
 import json
 
 logger = logging.getLogger("uvicorn")
 
+# Community timelines are requested newest first, this many tweets a page
+MIN_TWEET_PAGE_SIZE = 20
+MAX_TWEET_PAGE_SIZE = 40
+# Room above the expected tweet count when sizing a page
+PAGE_SIZE_HEADROOM = 1.5
+# A community is polled again once this many new tweets are expected, or
+# after TWITTER_MAX_POLL_INTERVAL_MINUTES
+MIN_EXPECTED_TWEETS = 1
+
 class TwitterService:
     def __init__(self):
         self.settings = get_settings()
         self.keywords = get_keywords()["twitter"]
-        self.max_tweets = random.randint(90, 100)  # Randomize max tweets per community
+        self.matcher = MatcherChain.for_platform(self.keywords, [BaseMatcher, QuestionMatcher], self.settings)
+        self.watermarks = get_watermark_store()
+        self.pacer = get_pacer("twitter", self.settings.TWITTER_USERNAME)
+        self.login_lock = asyncio.Lock()
+        self.caller = resilient_caller("twitter", self._classify_error, self._reauthenticate)
+        # Observed tweets per minute and last request time by community
+        self.tweet_rates: Dict[str, float] = {}
+        self.last_polled: Dict[str, datetime] = {}
         self.client = None  # Initialize as None, will be set later
 
-    async def _initialize_twitter(self):
-        max_retries = 3
-        retry_delay = 60  # seconds
+    async def _initialize_twitter(self, use_cookies: bool = True):
         cookies_file = "cookies.json"
         # Instead of a fixed threshold, choose a random threshold between 2 and 4 days
         random_days = random.uniform(2, 4)
         cookies_age_limit = timedelta(days=random_days)
         logger.info(f"Using a cookies refresh threshold of {random_days:.2f} days")
 
-        for attempt in range(max_retries):
-            try:
-                client = Client(language='en-US')
-
-                # Check if cookies exist and are still within the randomized valid window
-                if os.path.exists(cookies_file):
-                    with open(cookies_file, 'r') as f:
-                        cookies_data = json.load(f)
-                        last_refreshed = datetime.fromisoformat(
-                            cookies_data.get('last_refreshed', '1970-01-01T00:00:00')
-                        )
-                    
-                    if datetime.now() - last_refreshed < cookies_age_limit:
-                        client.load_cookies(cookies_file)
-                        logger.info("Loaded saved cookies, skipping login")
-                        return client
-
-                # Perform login and save cookies with a timestamp
-                await client.login(
-                    auth_info_1=self.settings.TWITTER_USERNAME,
-                    auth_info_2=self.settings.TWITTER_EMAIL,
-                    password=self.settings.TWITTER_PASSWORD
-                )
-                client.save_cookies(cookies_file)
-
-                # Update cookies file with a new timestamp
-                with open(cookies_file, 'r+') as f:
+        try:
+            client = Client(language='en-US')
+
+            # Check if cookies exist and are still within the randomized valid window
+            if use_cookies and os.path.exists(cookies_file):
+                with open(cookies_file, 'r') as f:
                     cookies_data = json.load(f)
-                    cookies_data['last_refreshed'] = datetime.now().isoformat()
-                    f.seek(0)
-                    json.dump(cookies_data, f)
-                    f.truncate()
-
-                logger.info("Logged in and saved cookies")
-                return client
-            except Exception as e:
-                # If blocked, retry with exponential backoff
-                if "blocked" in str(e).lower():
-                    if attempt < max_retries - 1:
-                        wait_time = retry_delay * (2 ** attempt)
-                        logger.warning(f"Twitter login blocked, waiting {wait_time}s before retry {attempt + 1}/{max_retries}")
-                        await sleep(wait_time)
-                        continue
-                logger.error("Failed to initialize Twitter client")
-                raise
+                    last_refreshed = datetime.fromisoformat(
+                        cookies_data.get('last_refreshed', '1970-01-01T00:00:00')
+                    )
+                
+                if datetime.now() - last_refreshed < cookies_age_limit:
+                    client.load_cookies(cookies_file)
+                    logger.info("Loaded saved cookies, skipping login")
+                    return client
+
+            # Perform login and save cookies with a timestamp
+            await self.pacer.acquire()
+            await client.login(
+                auth_info_1=self.settings.TWITTER_USERNAME,
+                auth_info_2=self.settings.TWITTER_EMAIL,
+                password=self.settings.TWITTER_PASSWORD
+            )
+            client.save_cookies(cookies_file)
+
+            # Update cookies file with a new timestamp
+            with open(cookies_file, 'r+') as f:
+                cookies_data = json.load(f)
+                cookies_data['last_refreshed'] = datetime.now().isoformat()
+                f.seek(0)
+                json.dump(cookies_data, f)
+                f.truncate()
+
+            logger.info("Logged in and saved cookies")
+            return client
+        except Exception as e:
+            logger.error(f"Failed to initialize Twitter client: {str(e)}")
+            raise
+
+    async def _login(self):
+        async with self.login_lock:
+            if self.client is None:
+                self.client = await self._initialize_twitter()
+
+    async def _reauthenticate(self):
+        client = self.client
+        async with self.login_lock:
+            # Communities failing at the same time share one fresh login, since
+            # concurrent logins tend to be answered with a challenge or lock.
+            # The saved cookies are what expired, so they aren't reused.
+            if self.client is client:
+                self.client = await self._initialize_twitter(use_cookies=False)
 
     async def ensure_client(self):
         if self.client is None:
-            self.client = await self._initialize_twitter()
+            await self.caller.login(self._login)
+
+    @staticmethod
+    def _classify_error(e: Exception) -> str:
+        """Sort a failed call for the resilience layer"""
+        if isinstance(e, Unauthorized):
+            return AUTH
+        if isinstance(e, (TooManyRequests, AccountLocked, AccountSuspended)):
+            return FATAL
+        if isinstance(e, (ServerError, RequestTimeout)) or "blocked" in str(e).lower():
+            return TRANSIENT
+        if isinstance(e, TwitterException):
+            return CLIENT
+        return TRANSIENT
+
+    async def _paced(self, request: Callable[[], Awaitable[Any]]) -> Any:
+        await self.pacer.acquire()
+        return await request()
 
-    def _match_content(self, text: str) -> Tuple[bool, str]:
+    async def _match_content(self, text: str) -> Tuple[bool, str]:
         """Match content against keywords and patterns"""
-        matches, keyword = BaseMatcher.match(text, self.keywords)
-        if matches:
-            logger.info(f"Found matching keyword: {keyword}")
-            return True, keyword
-        
-        matches, pattern = QuestionMatcher.match(text, self.keywords)
-        if matches:
-            logger.info(f"Found matching question pattern: {pattern}")
-            return True, pattern
-        
-        return False, ""
-
-    async def get_matching_posts(self) -> List[SocialPost]:
-        """Get posts from configured communities matching keywords"""
-        # Add a random delay (2-5 minutes) before starting the service to mimic a non-automated behavior.
-        random_delay = random.uniform(0, 2)
-        logger.info(f"Waiting for {random_delay:.2f} seconds before starting Twitter service")
-        await sleep(random_delay)
+        return (await self._match_many([text]))[0]
+
+    async def _match_many(self, texts: List[str]) -> List[Tuple[bool, str]]:
+        """Match a batch of texts against keywords and patterns"""
+        results = await self.matcher.match_many(texts)
+        for matches, label in results:
+            if matches:
+                logger.info(f"Found match: {label}")
+        return results
+
+    @staticmethod
+    def _tweet_time(tweet) -> datetime:
+        # Ensure tweet time is timezone-aware
+        tweet_time = tweet.created_at_datetime
+        if tweet_time.tzinfo is None:
+            tweet_time = tweet_time.replace(tzinfo=timezone.utc)
+        return tweet_time
+
+    def _normalize_post(self, tweet, tweet_time: datetime, community_id: str, matched_keyword: str) -> SocialPost:
+        """Convert a tweet to normalized SocialPost model"""
+        return SocialPost(
+            platform="twitter",
+            content=tweet.text,
+            url=f"https://twitter.com/i/web/status/{tweet.id}",
+            timestamp=tweet_time,
+            author=tweet.user.screen_name,
+            community=community_id,
+            keyword_matched=matched_keyword
+        )
+
+    def _page_size(self, community_id: str, cutoff: datetime) -> int:
+        """How many tweets to ask for per page, from the community's observed tweet rate"""
+        rate = self.tweet_rates.get(community_id)
+        if rate is None:
+            return MAX_TWEET_PAGE_SIZE
+        expected = rate * (datetime.now(timezone.utc) - cutoff).total_seconds() / 60
+        return min(max(int(expected * PAGE_SIZE_HEADROOM), MIN_TWEET_PAGE_SIZE), MAX_TWEET_PAGE_SIZE)
+
+    def _poll_due(self, community_id: str, now: datetime) -> bool:
+        """Whether enough new tweets are expected to be worth a request"""
+        rate = self.tweet_rates.get(community_id)
+        last_polled = self.last_polled.get(community_id)
+        if rate is None or last_polled is None:
+            return True
+        minutes = (now - last_polled).total_seconds() / 60
+        return rate * minutes >= MIN_EXPECTED_TWEETS or minutes >= self.settings.TWITTER_MAX_POLL_INTERVAL_MINUTES
+
+    def _observe_rate(self, community_id: str, tweets: int, cutoff: datetime, complete: bool):
+        """Update a community's tweets-per-minute estimate"""
+        minutes = max((datetime.now(timezone.utc) - cutoff).total_seconds() / 60, 1)
+        rate = tweets / minutes
+        previous = self.tweet_rates.get(community_id)
+        if not complete:
+            # Pagination stopped before the cutoff, so the real rate is higher
+            rate = max(rate, (previous or rate) * 2)
+        self.tweet_rates[community_id] = rate if previous is None else (previous + rate) / 2
 
+    async def _scan_community(
+        self,
+        community_id: str,
+        scan_cutoff: datetime,
+        matching_posts: List[SocialPost],
+        on_post: Optional[PostCallback],
+        on_progress: Optional[ProgressCallback],
+    ):
+        """Page through a community's latest tweets back to its cutoff"""
+        checked = 0
+        matched = 0
+        try:
+            now = datetime.now(timezone.utc)
+            if not self._poll_due(community_id, now):
+                logger.info(f"Skipping community {community_id}, no new tweets expected yet")
+                report_progress(on_progress, community_id, 0, 0)
+                return
+
+            cutoff = await self.watermarks.cutoff("twitter", community_id, scan_cutoff)
+            count = self._page_size(community_id, cutoff)
+            logger.info(f"Fetching tweets from community {community_id} (page size {count})")
+
+            page = await self.caller.call(self._paced, lambda: self.client.get_community_tweets(
+                community_id=community_id,
+                tweet_type='Latest',
+                count=count
+            ))
+            # Only a successful request counts as a poll, so a failed one is retried next scan
+            self.last_polled[community_id] = now
+            pages = 1
+            newest = None
+            complete = False
+            while True:
+                tweets = list(page)
+                recent_tweets = []
+                for tweet in tweets:
+                    tweet_time = self._tweet_time(tweet)
+                    if tweet_time <= cutoff:
+                        complete = True
+                        continue
+                    recent_tweets.append((tweet, tweet_time))
+
+                checked += len(recent_tweets)
+                results = await self._match_many([tweet.text for tweet, _ in recent_tweets])
+                for (tweet, tweet_time), (matches, keyword) in zip(recent_tweets, results):
+                    if matches:
+                        logger.info(f"Match found for tweet: {tweet.text} with keyword: {keyword}")
+                        post = self._normalize_post(tweet, tweet_time, community_id, keyword)
+                        matched += 1
+                        matching_posts.append(post)
+                        if on_post:
+                            on_post(post)
+                if recent_tweets:
+                    page_newest = max(tweet_time for _, tweet_time in recent_tweets)
+                    newest = page_newest if newest is None else max(newest, page_newest)
+
+                if complete or not tweets:
+                    complete = True
+                    break
+                if pages >= self.settings.TWITTER_MAX_PAGES:
+                    logger.warning(f"Community {community_id} hit {pages} pages before the cutoff")
+                    break
+                page = await self.caller.call(self._paced, page.next)
+                pages += 1
+
+            self._observe_rate(community_id, checked, cutoff, complete)
+            if not complete:
+                # Tweets between the last page and the cutoff were never read, so
+                # the next scan has to reach back to the same cutoff
+                await self.watermarks.advance("twitter", community_id, cutoff)
+            elif newest is not None:
+                await self.watermarks.advance("twitter", community_id, newest)
+            logger.info(f"Scanned community {community_id}: {checked} new tweets in {pages} pages, {matched} matches")
+            report_progress(on_progress, community_id, checked, matched)
+
+        except Exception as e:
+            logger.error(f"Error processing community {community_id}: {str(e)}")
+            report_progress(on_progress, community_id, checked, matched, str(e))
+
+    async def get_matching_posts(self, on_post: Optional[PostCallback] = None, on_progress: Optional[ProgressCallback] = None) -> List[SocialPost]:
+        """Get posts from configured communities matching keywords
+
+        Communities are scanned TWITTER_COMMUNITY_CONCURRENCY at a time, with
+        their requests spaced by the account's pacer. on_post is called with
+        each match as soon as it is found, and on_progress once each community
+        has been scanned
+        """
         await self.ensure_client()
         try:
             matching_posts = []
-            scan_cutoff = datetime.utcnow().replace(tzinfo=timezone.utc) - timedelta(minutes=self.settings.SCAN_INTERVAL_MINUTES)
-            
+            scan_cutoff = datetime.now(timezone.utc) - timedelta(minutes=self.settings.SCAN_INTERVAL_MINUTES)
+
             communities = list(self.keywords.get("communities", []))
             random.shuffle(communities)
-            
-            for community_id in communities:
-                try:
-                    # Random delay between communities (2-5 seconds)
-                    await sleep(random.uniform(2, 5))
-                    
-                    # Randomize tweet count for this community
-                    tweet_count = random.randint(30, self.max_tweets)
-                    logger.info(f"Fetching {tweet_count} tweets from community {community_id}")
-                    
-                    tweets = await self.client.get_community_tweets(
-                        community_id=community_id,
-                        tweet_type='Latest',
-                        count=tweet_count
-                    )
-                    
-                    # Convert to list and randomize processing order
-                    tweets_list = list(tweets)
-                    random.shuffle(tweets_list)
-                    
-                    for tweet in tweets_list:
-                        # Random delay between tweet processing (0.5-2 seconds)
-                        await sleep(random.uniform(0.5, 2))
-                        
-                        # Ensure tweet time is timezone-aware
-                        tweet_time = tweet.created_at_datetime
-                        if tweet_time.tzinfo is None:
-                            tweet_time = tweet_time.replace(tzinfo=timezone.utc)
-                        
-                        if tweet_time < scan_cutoff:
-                            continue
-                        
-                        matches, keyword = self._match_content(tweet.text)
-                        if matches:
-                            logger.info(f"Match found for tweet: {tweet.text} with keyword: {keyword}")
-                            matching_posts.append(SocialPost(
-                                platform="twitter",
-                                content=tweet.text,
-                                url=f"https://twitter.com/i/web/status/{tweet.id}",
-                                timestamp=tweet_time,
-                                author=tweet.user.screen_name,
-                                community=community_id,
-                                keyword_matched=keyword
-                            ))
-                            
-                            # Random delay after finding a match (1-3 seconds)
-                            await sleep(random.uniform(1, 3))
-                    
-                except Exception as e:
-                    logger.error(f"Error processing community {community_id}: {str(e)}")
-                    await sleep(random.uniform(5, 10))
-                    continue
+            semaphore = asyncio.Semaphore(self.settings.TWITTER_COMMUNITY_CONCURRENCY)
+
+            async def scan(community_id: str):
+                async with semaphore:
+                    await self._scan_community(community_id, scan_cutoff, matching_posts, on_post, on_progress)
+
+            await asyncio.gather(*(scan(community_id) for community_id in communities))
 
             logger.info(f"Found {len(matching_posts)} matching Twitter posts")
             return matching_posts
 
         except Exception as e:
             logger.error(f"Failed to get matching Twitter posts: {str(e)}")
-            raise 
\ No newline at end of file
+            raise 
+
+    async def close(self):
+        """Close the Twitter client's HTTP connections"""
+        if self.client is None:
+            return
+        try:
+            await self.client.http.aclose()
+            logger.info("Closed Twitter client session")
+        except Exception as e:
+            logger.error(f"Error closing Twitter client: {str(e)}")
@@ -0,0 +1,121 @@
+from ..models.social_post import SocialPost
+from ..schemas.responses import VerdictCacheStats
+from ..config.settings import get_settings
+from .sqlite_store import SQLiteStore
+from datetime import timedelta
+from functools import lru_cache
+from typing import Dict, Iterable, List, Tuple
+import hashlib
+import re
+import time
+
+# SQLite's default limit on bound parameters is 999
+_QUERY_CHUNK = 500
+
+_WHITESPACE = re.compile(r"\s+")
+
+def _normalize(text: str) -> str:
+    return _WHITESPACE.sub(" ", text or "").strip().lower()
+
+def verdict_key(post: SocialPost, model: str, prompt_version: str) -> str:
+    """
+    Identity of a post's verdict: its title and content with case and whitespace
+    normalized, so cross-posts and reposts share one, plus the model and prompt
+    version that produced it
+    """
+    text = f"{_normalize(post.title)}\n{_normalize(post.content)}"
+    return hashlib.sha256(f"{model}\n{prompt_version}\n{text}".encode()).hexdigest()
+
+class VerdictCache(SQLiteStore):
+    """
+    Remembers the OpenAI filter's verdict for each post's content, so the same
+    text seen again within the TTL isn't sent for evaluation a second time.
+    The table holds at most max_entries verdicts, dropping the least recently
+    used ones first.
+    """
+
+    schema = """
+        CREATE TABLE IF NOT EXISTS verdicts (
+            key TEXT PRIMARY KEY,
+            promote INTEGER NOT NULL,
+            stored_at REAL NOT NULL,
+            used_at REAL NOT NULL
+        );
+        CREATE INDEX IF NOT EXISTS verdicts_used_at ON verdicts (used_at);
+    """
+
+    def __init__(self, db_path: str, ttl: timedelta, max_entries: int, enabled: bool = True):
+        super().__init__(db_path)
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.enabled = enabled
+        self.hits = 0
+        self.misses = 0
+
+    async def get_many(self, keys: List[str]) -> Dict[str, bool]:
+        """Cached verdicts for the keys still inside the TTL"""
+        if not self.enabled or not keys:
+            return {}
+        now = time.time()
+        keys = list(dict.fromkeys(keys))
+        verdicts = {}
+        async with self.connect() as db:
+            for start in range(0, len(keys), _QUERY_CHUNK):
+                chunk = keys[start:start + _QUERY_CHUNK]
+                placeholders = ",".join("?" * len(chunk))
+                async with db.execute(
+                    f"SELECT key, promote FROM verdicts WHERE stored_at >= ? AND key IN ({placeholders})",
+                    [now - self.ttl.total_seconds(), *chunk],
+                ) as cursor:
+                    verdicts.update((key, bool(promote)) for key, promote in await cursor.fetchall())
+            await db.executemany("UPDATE verdicts SET used_at = ? WHERE key = ?", [(now, key) for key in verdicts])
+            await db.commit()
+        self.hits += len(verdicts)
+        self.misses += len(keys) - len(verdicts)
+        return verdicts
+
+    async def set_many(self, verdicts: Iterable[Tuple[str, bool]]):
+        """Store verdicts, then drop expired ones and any beyond max_entries"""
+        verdicts = list(verdicts)
+        if not self.enabled or not verdicts:
+            return
+        now = time.time()
+        async with self.connect() as db:
+            await db.executemany(
+                """
+                INSERT INTO verdicts (key, promote, stored_at, used_at) VALUES (?, ?, ?, ?)
+                ON CONFLICT (key) DO UPDATE SET
+                    promote = excluded.promote, stored_at = excluded.stored_at, used_at = excluded.used_at
+                """,
+                [(key, int(promote), now, now) for key, promote in verdicts],
+            )
+            await db.execute("DELETE FROM verdicts WHERE stored_at < ?", (now - self.ttl.total_seconds(),))
+            await db.execute(
+                "DELETE FROM verdicts WHERE key IN (SELECT key FROM verdicts ORDER BY used_at DESC LIMIT -1 OFFSET ?)",
+                (self.max_entries,),
+            )
+            await db.commit()
+
+    async def stats(self) -> VerdictCacheStats:
+        entries = 0
+        if self.enabled:
+            async with self.connect() as db:
+                async with db.execute("SELECT COUNT(*) FROM verdicts") as cursor:
+                    (entries,) = await cursor.fetchone()
+        return VerdictCacheStats(
+            enabled=self.enabled,
+            entries=entries,
+            max_entries=self.max_entries,
+            hits=self.hits,
+            misses=self.misses,
+        )
+
+@lru_cache()
+def get_verdict_cache() -> VerdictCache:
+    settings = get_settings()
+    return VerdictCache(
+        settings.STATE_DB_PATH,
+        timedelta(hours=settings.OPENAI_VERDICT_CACHE_TTL_HOURS),
+        settings.OPENAI_VERDICT_CACHE_MAX_ENTRIES,
+        settings.OPENAI_VERDICT_CACHE_ENABLED,
+    )
@@ -0,0 +1,73 @@
+from ..config.settings import get_settings
+from .sqlite_store import SQLiteStore
+from datetime import datetime, timedelta, timezone
+from functools import lru_cache
+from typing import Optional
+import logging
+
+logger = logging.getLogger("uvicorn")
+
+class WatermarkStore(SQLiteStore):
+    """
+    Remembers the newest item processed per source (subreddit, community, feed,
+    video or reel), so a scan only looks at what arrived since the last one.
+    """
+
+    schema = """
+        CREATE TABLE IF NOT EXISTS watermarks (
+            platform TEXT NOT NULL,
+            source TEXT NOT NULL,
+            last_seen REAL NOT NULL,
+            PRIMARY KEY (platform, source)
+        );
+    """
+
+    def __init__(self, db_path: str, max_lookback: timedelta, enabled: bool = True):
+        super().__init__(db_path)
+        self.max_lookback = max_lookback
+        self.enabled = enabled
+
+    async def get(self, platform: str, source: str) -> Optional[datetime]:
+        if not self.enabled:
+            return None
+        async with self.connect() as db:
+            async with db.execute(
+                "SELECT last_seen FROM watermarks WHERE platform = ? AND source = ?",
+                (platform, source),
+            ) as cursor:
+                row = await cursor.fetchone()
+        return datetime.fromtimestamp(row[0], timezone.utc) if row else None
+
+    async def advance(self, platform: str, source: str, timestamp: datetime):
+        """Move a source's watermark forward; older timestamps are ignored"""
+        if not self.enabled:
+            return
+        async with self.connect() as db:
+            await db.execute(
+                """
+                INSERT INTO watermarks (platform, source, last_seen) VALUES (?, ?, ?)
+                ON CONFLICT (platform, source) DO UPDATE SET last_seen = MAX(last_seen, excluded.last_seen)
+                """,
+                (platform, source, timestamp.timestamp()),
+            )
+            await db.commit()
+
+    async def cutoff(self, platform: str, source: str, default: datetime) -> datetime:
+        """
+        Items at or before the returned time have been processed already.
+        Sources without a watermark fall back to the default cutoff, and an old
+        watermark is capped at the maximum lookback.
+        """
+        watermark = await self.get(platform, source)
+        if watermark is None:
+            return default
+        return max(watermark, datetime.now(timezone.utc) - self.max_lookback)
+
+@lru_cache()
+def get_watermark_store() -> WatermarkStore:
+    settings = get_settings()
+    return WatermarkStore(
+        settings.STATE_DB_PATH,
+        timedelta(minutes=settings.WATERMARK_MAX_LOOKBACK_MINUTES),
+        settings.WATERMARKS_ENABLED,
+    )
@@ -0,0 +1,95 @@
+from ..schemas.responses import QuotaStatus
+from ..config.settings import get_settings
+from .sqlite_store import SQLiteStore
+from datetime import datetime, time, timedelta, timezone
+from functools import lru_cache
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+
+# Quota units per call, from the YouTube Data API cost table
+METHOD_COSTS = {
+    "search.list": 100,
+    "channels.list": 1,
+    "playlistItems.list": 1,
+    "videos.list": 1,
+    "commentThreads.list": 1,
+}
+
+# The daily quota resets at midnight Pacific time
+try:
+    QUOTA_TIMEZONE = ZoneInfo("America/Los_Angeles")
+except ZoneInfoNotFoundError:
+    QUOTA_TIMEZONE = timezone(timedelta(hours=-8))
+
+class QuotaExhausted(Exception):
+    pass
+
+def next_reset(now: datetime) -> datetime:
+    local = now.astimezone(QUOTA_TIMEZONE)
+    return datetime.combine(local.date() + timedelta(days=1), time(0), tzinfo=QUOTA_TIMEZONE)
+
+def quota_day(now: datetime) -> str:
+    """The Pacific-time date a moment's usage counts against"""
+    return now.astimezone(QUOTA_TIMEZONE).date().isoformat()
+
+class QuotaBudget(SQLiteStore):
+    """
+    Tracks YouTube Data API units spent against the daily limit. Usage is kept
+    per quota day in the state database, so a restart doesn't forget what was
+    already spent. Every attempt at a call, retries included, draws its cost up
+    front, and an attempt that would go over the limit is refused, so a scan
+    stops cleanly instead of failing on an HttpError halfway through.
+    """
+
+    schema = """
+        CREATE TABLE IF NOT EXISTS youtube_quota (
+            day TEXT PRIMARY KEY,
+            used INTEGER NOT NULL
+        );
+    """
+
+    def __init__(self, db_path: str, daily_limit: int):
+        super().__init__(db_path)
+        self.daily_limit = daily_limit
+        self.refused = 0
+
+    async def used(self) -> int:
+        """Units spent so far in the current quota day"""
+        async with self.connect() as db:
+            async with db.execute(
+                "SELECT used FROM youtube_quota WHERE day = ?", (quota_day(datetime.now(timezone.utc)),)
+            ) as cursor:
+                row = await cursor.fetchone()
+        return row[0] if row else 0
+
+    async def acquire(self, method: str):
+        """Spend the method's cost, or raise QuotaExhausted if it doesn't fit"""
+        cost = METHOD_COSTS[method]
+        now = datetime.now(timezone.utc)
+        day = quota_day(now)
+        async with self.connect() as db:
+            await db.execute("DELETE FROM youtube_quota WHERE day < ?", (day,))
+            await db.execute("INSERT OR IGNORE INTO youtube_quota (day, used) VALUES (?, 0)", (day,))
+            # Checked and spent in one statement, so concurrent calls can't overspend
+            cursor = await db.execute(
+                "UPDATE youtube_quota SET used = used + ? WHERE day = ? AND used + ? <= ?",
+                (cost, day, cost, self.daily_limit),
+            )
+            await db.commit()
+        if cursor.rowcount == 0:
+            self.refused += 1
+            raise QuotaExhausted(f"YouTube quota exhausted until {next_reset(now).isoformat()}, {method} needs {cost} units")
+
+    async def status(self) -> QuotaStatus:
+        used = await self.used()
+        return QuotaStatus(
+            daily_limit=self.daily_limit,
+            used=used,
+            remaining=max(self.daily_limit - used, 0),
+            refused_calls=self.refused,
+            resets_at=next_reset(datetime.now(timezone.utc)),
+        )
+
+@lru_cache()
+def get_youtube_quota() -> QuotaBudget:
+    settings = get_settings()
+    return QuotaBudget(settings.STATE_DB_PATH, settings.YOUTUBE_DAILY_QUOTA)
@@ -1,21 +1,45 @@
 from googleapiclient.discovery import build
+from googleapiclient.http import build_http
 from datetime import datetime, timedelta, timezone
 from ..models.social_post import SocialPost
 from ..config.settings import get_settings, get_keywords
 from .matchers.base_matcher import BaseMatcher
-from typing import List, Tuple
+from .matchers.matcher_chain import MatcherChain
+from .scan_events import PostCallback, ProgressCallback, report_progress
+from .watermark_store import get_watermark_store
+from .blocking import get_executor
+from .comment_count_store import get_comment_count_store
+from .youtube_quota import QuotaExhausted, get_youtube_quota
+from .resilience import CLIENT, FATAL, LOCAL, TRANSIENT, resilient_caller
+from typing import Any, AsyncIterator, Dict, List, Tuple, Optional
 import logging
 import asyncio
+import threading
 from googleapiclient.errors import HttpError
 
 logger = logging.getLogger("uvicorn")
 
+# channels.list and videos.list take up to 50 ids per call
+ID_BATCH_SIZE = 50
+RECENT_VIDEOS = 10
+
 class YouTubeService:
     def __init__(self):
         logger.info("Initializing YouTubeService")
         self.settings = get_settings()
         self.keywords = get_keywords()["youtube"]
+        self.matcher = MatcherChain.for_platform(self.keywords, [BaseMatcher], self.settings)
+        self.watermarks = get_watermark_store()
+        self.comment_counts = get_comment_count_store()
+        # Channel id to uploads playlist id, which never changes
+        self.uploads_playlists: Dict[str, str] = {}
         self.youtube = self._initialize_youtube()
+        self.executor = get_executor("youtube")
+        self.quota = get_youtube_quota()
+        self.caller = resilient_caller("youtube", self._classify_error)
+        # httplib2 connections aren't thread-safe, so each worker thread gets its own
+        self._local = threading.local()
+        self._thread_https = []
 
     def _initialize_youtube(self):
         try:
@@ -25,6 +49,35 @@ class YouTubeService:
             logger.error(f"Failed to initialize YouTube client: {str(e)}")
             raise
 
+    def _execute_in_thread(self, request):
+        http = getattr(self._local, "http", None)
+        if http is None:
+            http = self._local.http = build_http()
+            self._thread_https.append(http)
+        return request.execute(http=http)
+
+    @staticmethod
+    def _classify_error(e: Exception) -> str:
+        """Sort a failed call for the resilience layer"""
+        if isinstance(e, QuotaExhausted):
+            return LOCAL
+        if isinstance(e, HttpError):
+            if e.resp.status in (429, 500, 502, 503, 504):
+                return TRANSIENT
+            if e.resp.status == 403 and ("quotaExceeded" in str(e) or "rateLimitExceeded" in str(e)):
+                return FATAL
+            # Comments disabled, video gone and the like
+            return CLIENT
+        return TRANSIENT
+
+    async def _execute(self, method: str, request):
+        """Execute the request on the executor with retries, spending the method's quota on each attempt"""
+        async def attempt():
+            await self.quota.acquire(method)
+            return await self.executor.run(self._execute_in_thread, request)
+
+        return await self.caller.call(attempt)
+
     def _normalize_post(self, comment, video_id, video_title, matched_keyword: str) -> SocialPost:
         """Convert YouTube comment to normalized SocialPost model"""
         return SocialPost(
@@ -40,96 +93,221 @@ class YouTubeService:
             video_id=video_id
         )
 
-    async def get_matching_posts(self) -> List[SocialPost]:
-        """Get comments created in the last X minutes matching configured keywords"""
+    async def _load_uploads_playlists(self, channel_ids: List[str]):
+        """Look up uploads playlist ids for channels not seen yet, 50 channels per call"""
+        missing = [channel_id for channel_id in channel_ids if channel_id not in self.uploads_playlists]
+        for start in range(0, len(missing), ID_BATCH_SIZE):
+            response = await self._execute("channels.list", self.youtube.channels().list(
+                part="contentDetails",
+                id=",".join(missing[start:start + ID_BATCH_SIZE]),
+                maxResults=ID_BATCH_SIZE
+            ))
+            for channel in response.get("items", []):
+                self.uploads_playlists[channel["id"]] = channel["contentDetails"]["relatedPlaylists"]["uploads"]
+
+    async def _recent_videos(self, channel_id: str) -> List[str]:
+        """Ids of the channel's latest videos"""
+        if self.settings.YOUTUBE_CRAWL_MODE == "search":
+            response = await self._execute("search.list", self.youtube.search().list(
+                channelId=channel_id,
+                order="date",
+                part="snippet",
+                maxResults=RECENT_VIDEOS,
+                type="video"
+            ))
+            return [video["id"]["videoId"] for video in response.get("items", [])]
+
+        playlist_id = self.uploads_playlists.get(channel_id)
+        if playlist_id is None:
+            raise ValueError(f"No uploads playlist found for channel {channel_id}")
+        response = await self._execute("playlistItems.list", self.youtube.playlistItems().list(
+            part="contentDetails",
+            playlistId=playlist_id,
+            maxResults=RECENT_VIDEOS
+        ))
+        return [item["contentDetails"]["videoId"] for item in response.get("items", [])]
+
+    async def _video_details(self, video_ids: List[str]) -> Dict[str, Dict[str, Any]]:
+        """Title and comment count per video, 50 videos per call
+
+        The comment count is None when comments are disabled
+        """
+        details = {}
+        for start in range(0, len(video_ids), ID_BATCH_SIZE):
+            response = await self._execute("videos.list", self.youtube.videos().list(
+                part="snippet,statistics",
+                id=",".join(video_ids[start:start + ID_BATCH_SIZE]),
+                maxResults=ID_BATCH_SIZE
+            ))
+            for video in response.get("items", []):
+                comment_count = video.get("statistics", {}).get("commentCount")
+                details[video["id"]] = {
+                    "title": video["snippet"]["title"],
+                    "comment_count": int(comment_count) if comment_count is not None else None,
+                }
+        return details
+
+    async def _comment_pages(self, video_id: str, cutoff: datetime) -> AsyncIterator[List[dict]]:
+        """
+        Yield each page of a video's comments newer than the cutoff as it is
+        fetched, newest first, and stop paginating once the cutoff is crossed
+        """
+        next_page_token = None
+        while True:
+            try:
+                comments_response = await self._execute("commentThreads.list", self.youtube.commentThreads().list(
+                    part="snippet",
+                    videoId=video_id,
+                    maxResults=100,
+                    order="time",
+                    pageToken=next_page_token
+                ))
+            except HttpError as e:
+                if "commentsDisabled" in str(e):
+                    logger.info(f"Skipping video {video_id} - comments are disabled")
+                    return
+                raise
+
+            recent_comments = []
+            reached_cutoff = False
+            for comment_thread in comments_response.get("items", []):
+                comment = comment_thread["snippet"]["topLevelComment"]
+                if self._comment_time(comment) <= cutoff:
+                    reached_cutoff = True
+                    break
+                recent_comments.append(comment)
+
+            if recent_comments:
+                yield recent_comments
+            if reached_cutoff or "nextPageToken" not in comments_response:
+                return
+            next_page_token = comments_response["nextPageToken"]
+
+    @staticmethod
+    def _comment_time(comment: dict) -> datetime:
+        return datetime.fromisoformat(comment["snippet"]["publishedAt"].replace('Z', '+00:00'))
+
+    async def _scan_video(
+        self,
+        video_id: str,
+        video_title: str,
+        scan_cutoff: datetime,
+        matching_posts: List[SocialPost],
+        on_post: Optional[PostCallback],
+    ) -> int:
+        """Match a video's comments page by page back to the cutoff, returning how many were read"""
+        logger.info(f"Processing video: {video_title} (ID: {video_id})")
+        cutoff = await self.watermarks.cutoff("youtube", video_id, scan_cutoff)
+        comments_processed = 0
+        newest = None
+
+        async for comments in self._comment_pages(video_id, cutoff):
+            comments_processed += len(comments)
+            logger.info(f"Processing {len(comments)} comments from video {video_title} (Total: {comments_processed})")
+            if newest is None:
+                # Comments come newest first
+                newest = self._comment_time(comments[0])
+
+            results = await self._match_many([
+                comment["snippet"]["textDisplay"] for comment in comments
+            ])
+            for comment, (matches, keyword) in zip(comments, results):
+                if matches:
+                    logger.info(f"Found matching comment in video {video_title} with keyword: {keyword}")
+                    post = self._normalize_post(comment, video_id, video_title, keyword)
+                    matching_posts.append(post)
+                    if on_post:
+                        on_post(post)
+
+        if newest:
+            await self.watermarks.advance("youtube", video_id, newest)
+        logger.info(f"Completed processing video {video_title} - processed {comments_processed} comments")
+        return comments_processed
+
+    async def get_matching_posts(self, on_post: Optional[PostCallback] = None, on_progress: Optional[ProgressCallback] = None) -> List[SocialPost]:
+        """Get comments created in the last X minutes matching configured keywords
+
+        Recent videos come from each channel's uploads playlist (or search, with
+        YOUTUBE_CRAWL_MODE=search). Their comment counts are fetched in batches,
+        and videos whose count hasn't changed since the last scan are skipped.
+        Channels and their videos are scanned concurrently, and every call is
+        charged to the shared quota budget; videos that don't fit are left for
+        a later scan. on_post is called with each match as soon as it is found,
+        and on_progress once each channel has been scanned
+        """
         matching_posts = []
-        scan_cutoff = datetime.utcnow().replace(tzinfo=timezone.utc) - timedelta(minutes=self.settings.SCAN_INTERVAL_MINUTES)
+        scan_cutoff = datetime.now(timezone.utc) - timedelta(minutes=self.settings.SCAN_INTERVAL_MINUTES)
         logger.info(f"Starting YouTube scan, cutoff time: {scan_cutoff}")
 
         try:
-            for channel_id in self.keywords["channels"]:
+            channel_ids = list(self.keywords["channels"])
+            if self.settings.YOUTUBE_CRAWL_MODE == "uploads":
                 try:
-                    # Get videos from channel
-                    videos_response = self.youtube.search().list(
-                        channelId=channel_id,
-                        order="date",
-                        part="snippet",
-                        maxResults=10,
-                        type="video"
-                    ).execute()
-
-                    videos = videos_response.get("items", [])
-                    logger.info(f"Found {len(videos)} videos for channel {channel_id}")
-                    video_details = [
-                        (video["id"]["videoId"], video["snippet"]["title"])
-                        for video in videos
-                    ]
-
-                    for video_id, video_title in video_details:
-                        try:
-                            logger.info(f"Processing video: {video_title} (ID: {video_id})")
-                            next_page_token = None
-                            comments_to_process = True
-                            comments_processed = 0
-
-                            while comments_to_process:
-                                try:
-                                    logger.debug(f"Fetching comments page {comments_processed//100 + 1} for video {video_id}")
-                                    comments_response = self.youtube.commentThreads().list(
-                                        part="snippet",
-                                        videoId=video_id,
-                                        maxResults=100,
-                                        order="time",
-                                        pageToken=next_page_token
-                                    ).execute()
-                                except HttpError as e:
-                                    if "commentsDisabled" in str(e):
-                                        logger.info(f"Skipping video {video_id} - comments are disabled")
-                                        break
-                                    raise
-
-                                comments = comments_response.get("items", [])
-                                comments_processed += len(comments)
-                                logger.info(f"Processing {len(comments)} comments from video {video_title} (Total: {comments_processed})")
-
-                                for comment_thread in comments:
-                                    comment = comment_thread["snippet"]["topLevelComment"]
-                                    comment_time = datetime.fromisoformat(
-                                        comment["snippet"]["publishedAt"].replace('Z', '+00:00')
-                                    )
-                                    
-                                    if comment_time < scan_cutoff:
-                                        logger.info(f"Reached cutoff time in video {video_title} after {comments_processed} comments")
-                                        comments_to_process = False
-                                        break
-
-                                    matches, keyword = BaseMatcher.match(
-                                        comment["snippet"]["textDisplay"], 
-                                        self.keywords
-                                    )
-                                    
-                                    if matches:
-                                        logger.info(f"Found matching comment in video {video_title} with keyword: {keyword}")
-                                        matching_posts.append(
-                                            self._normalize_post(comment, video_id, video_title, keyword)
-                                        )
-
-                                if not comments_to_process or "nextPageToken" not in comments_response:
-                                    logger.debug(f"No more comments to process for video {video_id}")
-                                    comments_to_process = False
-                                else:
-                                    next_page_token = comments_response["nextPageToken"]
-                                    await asyncio.sleep(0.1)
-
-                            logger.info(f"Completed processing video {video_title} - processed {comments_processed} comments")
-
-                        except Exception as e:
-                            logger.error(f"Error processing video {video_id}: {str(e)}")
-                            continue
+                    await self._load_uploads_playlists(channel_ids)
+                except Exception as e:
+                    logger.error(f"Error looking up uploads playlists: {str(e)}")
 
+            async def recent_videos(channel_id: str) -> Optional[List[str]]:
+                try:
+                    videos = await self._recent_videos(channel_id)
+                    logger.info(f"Found {len(videos)} videos for channel {channel_id}")
+                    return videos
                 except Exception as e:
                     logger.error(f"Error scanning channel {channel_id}: {str(e)}")
-                    continue
+                    report_progress(on_progress, channel_id, 0, 0, str(e))
+                    return None
+
+            found = await asyncio.gather(*(recent_videos(channel_id) for channel_id in channel_ids))
+            channel_videos = {
+                channel_id: videos for channel_id, videos in zip(channel_ids, found) if videos is not None
+            }
+
+            video_ids = list(dict.fromkeys(video_id for videos in channel_videos.values() for video_id in videos))
+            try:
+                details = await self._video_details(video_ids)
+            except Exception as e:
+                # Without counts every video is scanned, as before
+                logger.error(f"Error fetching video statistics: {str(e)}")
+                details = {}
+            last_counts = await self.comment_counts.get_many("youtube", video_ids)
+            semaphore = asyncio.Semaphore(self.settings.YOUTUBE_VIDEO_CONCURRENCY)
+
+            async def scan_video(video_id: str) -> int:
+                video = details.get(video_id)
+                if video is None:
+                    # No statistics for it, so scan it anyway
+                    video_title, comment_count = video_id, None
+                else:
+                    video_title, comment_count = video["title"], video["comment_count"]
+                    if not comment_count:
+                        logger.info(f"Skipping video {video_id} - no comments or comments disabled")
+                        return 0
+                    if last_counts.get(video_id) == comment_count:
+                        logger.info(f"Skipping video {video_id} - comment count unchanged at {comment_count}")
+                        return 0
+
+                async with semaphore:
+                    comments = await self._scan_video(video_id, video_title, scan_cutoff, matching_posts, on_post)
+                if comment_count is not None:
+                    await self.comment_counts.set("youtube", video_id, comment_count)
+                return comments
+
+            async def scan_channel(channel_id: str, videos: List[str]):
+                matches_before = len(matching_posts)
+                results = await asyncio.gather(*(scan_video(video_id) for video_id in videos), return_exceptions=True)
+                error = None
+                for video_id, result in zip(videos, results):
+                    if isinstance(result, QuotaExhausted):
+                        # Left for the next scan; its watermark and count weren't updated
+                        error = str(result)
+                    elif isinstance(result, Exception):
+                        logger.error(f"Error processing video {video_id}: {str(result)}")
+                if error:
+                    logger.warning(f"Deferred videos in channel {channel_id}: {error}")
+                channel_comments = sum(result for result in results if isinstance(result, int))
+                report_progress(on_progress, channel_id, channel_comments, len(matching_posts) - matches_before, error)
+
+            await asyncio.gather(*(scan_channel(channel_id, videos) for channel_id, videos in channel_videos.items()))
 
         except Exception as e:
             logger.error(f"Error in YouTube scan: {str(e)}")
@@ -138,24 +316,21 @@ class YouTubeService:
         logger.info(f"YouTube scan complete. Found {len(matching_posts)} matching posts")
         return matching_posts
 
-    def _match_content(self, text: str) -> Tuple[bool, str]:
+    async def _match_content(self, text: str) -> Tuple[bool, str]:
         """Check if text matches any configured keywords"""
-        text = text.lower()
-        
-        # Log the text being checked and the keywords
-        logger.debug(f"Checking text against keywords: {self.keywords['keywords']}")
-        logger.debug(f"Text: {text[:100]}...")  # First 100 chars
-
-        # Check excluded keywords first
-        for excl in self.keywords.get("exclude_keywords", []):
-            if excl.lower() in text:
-                logger.debug(f"Text excluded due to keyword: {excl}")
-                return False, ""
-
-        # Check included keywords
-        for keyword in self.keywords["keywords"]:
-            if keyword.lower() in text:
-                logger.debug(f"Found matching keyword: {keyword}")
-                return True, keyword
-
-        return False, "" 
\ No newline at end of file
+        return (await self._match_many([text]))[0]
+
+    async def _match_many(self, texts: List[str]) -> List[Tuple[bool, str]]:
+        """Check a batch of texts against the configured keywords"""
+        logger.debug(f"Checking {len(texts)} texts against keywords")
+        return await self.matcher.match_many(texts)
+
+    async def close(self):
+        """Close the YouTube API client's HTTP connections"""
+        try:
+            self.youtube.close()
+            for http in self._thread_https:
+                http.close()
+            logger.info("Closed YouTube client session")
+        except Exception as e:
+            logger.error(f"Error closing YouTube client: {str(e)}")
@@ -0,0 +1,88 @@
+"""
+Micro-benchmark for the keyword and question matchers.
+
+Runs the previous per-call implementations and the compiled matchers over the
+same corpus of synthetic posts and prints the mean latency per text.
+
+    python -m benchmarks.bench_matchers [--posts 5000]
+"""
+import argparse
+import random
+import re
+import time
+from app.config.settings import get_keywords
+from app.services.matchers.base_matcher import BaseMatcher
+from app.services.matchers.question_matcher import QuestionMatcher, QUESTION_PATTERNS
+
+FILLER = (
+    "the my our app launch users growth marketing customers revenue this week today "
+    "help feedback please code team landing page pricing churn onboarding newsletter "
+    "lorem ipsum dolor sit amet consectetur adipiscing elit sed do eiusmod tempor"
+).split()
+
+PHRASES = [
+    "what are you working on this week",
+    "share what you've built",
+    "what's your biggest pain point",
+    "looking for saas ideas",
+    "how did you get your first 100 users",
+    "time for self-promotion",
+    "anyone have startup ideas",
+]
+
+def legacy_keyword_match(text, keywords):
+    text = text.lower()
+    for excl in keywords.get("exclude_keywords", []):
+        if excl.lower() in text:
+            return False, ""
+    for keyword in keywords["keywords"]:
+        if keyword.lower() in text:
+            return True, keyword
+    return False, ""
+
+def legacy_question_match(text, keywords):
+    for pattern in list(QUESTION_PATTERNS):
+        if re.search(pattern, text):
+            return True, f"question:{pattern}"
+    return False, ""
+
+def build_corpus(size, seed=42):
+    rng = random.Random(seed)
+    corpus = []
+    for _ in range(size):
+        words = [rng.choice(FILLER) for _ in range(rng.randint(15, 150))]
+        if rng.random() < 0.2:
+            words.insert(rng.randrange(len(words)), rng.choice(PHRASES))
+        corpus.append(" ".join(words))
+    return corpus
+
+def time_per_text(func, corpus, keywords, rounds):
+    best = float("inf")
+    for _ in range(rounds):
+        start = time.perf_counter()
+        for text in corpus:
+            func(text, keywords)
+        best = min(best, time.perf_counter() - start)
+    return best / len(corpus) * 1e6
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--posts", type=int, default=5000)
+    parser.add_argument("--rounds", type=int, default=3)
+    args = parser.parse_args()
+
+    keywords = get_keywords()["reddit"]
+    corpus = build_corpus(args.posts)
+
+    for name, before, after in [
+        ("keyword", legacy_keyword_match, BaseMatcher.match),
+        ("question", legacy_question_match, QuestionMatcher.match),
+    ]:
+        assert [before(t, keywords) for t in corpus] == [after(t, keywords) for t in corpus]
+        before_us = time_per_text(before, corpus, keywords, args.rounds)
+        after_us = time_per_text(after, corpus, keywords, args.rounds)
+        print(f"{name:<9} before {before_us:8.2f} us/text  after {after_us:8.2f} us/text  "
+              f"({before_us / after_us:.1f}x)")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+import pytest
+from app.config.settings import get_keywords, get_settings
+from app.services import blocking, pacing, resilience, scan_runner
+from app.services.comment_count_store import get_comment_count_store
+from app.services.dedup_store import get_dedup_store
+from app.services.metadata_cache import get_metadata_cache
+from app.services.notification_queue import get_notification_queue
+from app.services.openai_service import get_rate_limits
+from app.services.scan_runner import get_client_registry
+from app.services.verdict_cache import get_verdict_cache
+from app.services.watermark_store import get_watermark_store
+from app.services.youtube_quota import get_youtube_quota
+
+# Credentials the settings require; no test talks to a real platform
+CREDENTIALS = {
+    "REDDIT_CLIENT_ID": "test", "REDDIT_CLIENT_SECRET": "test", "REDDIT_USER_AGENT": "sociallist-tests",
+    "RESEND_API_KEY": "test", "EMAIL_FROM": "from@example.com", "EMAIL_TO": "to@example.com",
+    "API_USERNAME": "test", "API_PASSWORD": "test",
+    "TWITTER_USERNAME": "test", "TWITTER_PASSWORD": "test", "TWITTER_EMAIL": "test@example.com",
+    "BLUESKY_EMAIL": "test@example.com", "BLUESKY_PASSWORD": "test",
+    "YOUTUBE_API_KEY": "test",
+    "INSTAGRAM_USERNAME": "test", "INSTAGRAM_PASSWORD": "test",
+    "INSTAGRAM_EMAIL": "test@example.com", "INSTAGRAM_EMAIL_PASSWORD": "test",
+    "OPENAI_API_KEY": "test",
+}
+
+# Scans run without pacing gaps or retry backoff
+TEST_DEFAULTS = {
+    "SCAN_INTERVAL_MINUTES": "60",
+    "RETRY_ATTEMPTS": "0",
+    "TWITTER_REQUESTS_PER_MINUTE": "6000", "TWITTER_REQUEST_BURST": "10",
+    "TWITTER_REQUEST_DELAY_MIN_SECONDS": "0", "TWITTER_REQUEST_DELAY_MAX_SECONDS": "0",
+    "INSTAGRAM_REQUESTS_PER_MINUTE": "6000", "INSTAGRAM_REQUEST_BURST": "10",
+    "INSTAGRAM_REQUEST_DELAY_MIN_SECONDS": "0", "INSTAGRAM_REQUEST_DELAY_MAX_SECONDS": "0",
+    "OPENAI_REQUESTS_PER_MINUTE": "6000", "OPENAI_TOKENS_PER_MINUTE": "10000000",
+}
+
+CACHED_GETTERS = [
+    get_settings, get_watermark_store, get_comment_count_store, get_dedup_store, get_metadata_cache,
+    get_verdict_cache, get_youtube_quota, get_notification_queue, get_rate_limits, get_client_registry,
+]
+
+def reset_shared_state():
+    """Forget settings, stores and per-platform executors, pacers and breakers"""
+    for getter in CACHED_GETTERS:
+        getter.cache_clear()
+    blocking.shutdown_executors()
+    pacing._pacers.clear()
+    resilience._breakers.clear()
+
+@pytest.fixture
+def settings(tmp_path, monkeypatch):
+    """
+    The real settings, read from test environment variables with state kept in
+    a database of the test's own. Services built while the fixture is active
+    get these settings and fresh stores, and attributes set on it before a
+    service is built are seen by that service.
+    """
+    for name, value in {**CREDENTIALS, **TEST_DEFAULTS, "STATE_DB_PATH": str(tmp_path / "state.db")}.items():
+        monkeypatch.setenv(name, value)
+    reset_shared_state()
+    yield get_settings()
+    reset_shared_state()
+
+@pytest.fixture
+def keywords(monkeypatch):
+    """Replace a platform's keywords section for the test: keywords(platform, section)"""
+    def replace(platform, section):
+        monkeypatch.setitem(get_keywords(), platform, section)
+    return replace
+
+@pytest.fixture
+def platform_services(settings, monkeypatch):
+    """
+    Replace the platforms the scan runner knows for the test:
+    platform_services({platform: service class}, deadline=5). Scans lease them
+    from the fresh client registry the settings fixture provides.
+    """
+    def replace(services, deadline=5):
+        monkeypatch.setattr(scan_runner, "PLATFORM_SERVICES", services)
+        monkeypatch.setattr(scan_runner, "platform_deadline", lambda platform: deadline)
+    return replace
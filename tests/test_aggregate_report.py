@@ -0,0 +1,46 @@
+from datetime import datetime, timezone
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from app.models.social_post import SocialPost
+from app.routers import aggregate
+from app.services import scan_runner
+
+class FeedService:
+    async def get_matching_posts(self, on_post=None, on_progress=None):
+        post = SocialPost(
+            platform="bluesky",
+            content="what are you building?",
+            author="someone",
+            url="https://example.com/1",
+            timestamp=datetime(2025, 2, 2, tzinfo=timezone.utc),
+            keyword_matched="building",
+        )
+        on_post(post)
+        return [post]
+
+class BrokenService:
+    async def get_matching_posts(self, on_post=None, on_progress=None):
+        raise ConnectionError("unreachable")
+
+def test_aggregate_scan_report(platform_services, monkeypatch):
+    notified = []
+
+    async def send_notification(posts):
+        notified.extend(posts)
+        return True
+
+    platform_services({"bluesky": FeedService, "youtube": BrokenService})
+    monkeypatch.setattr(aggregate, "AGGREGATE_PLATFORMS", ["bluesky", "youtube"])
+    monkeypatch.setattr(scan_runner, "send_notification", send_notification)
+
+    app = FastAPI()
+    app.include_router(aggregate.router)
+    result = TestClient(app).get("/aggregate/scan/report").json()
+
+    assert [post["url"] for post in result["posts"]] == ["https://example.com/1"]
+    assert set(result["platforms"]) == {"bluesky", "youtube"}
+    assert result["platforms"]["bluesky"]["status"] == "ok"
+    assert result["platforms"]["bluesky"]["posts_found"] == 1
+    assert result["platforms"]["youtube"]["status"] == "error"
+    assert result["platforms"]["youtube"]["error"] == "unreachable"
+    assert len(notified) == 1
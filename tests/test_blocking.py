@@ -0,0 +1,38 @@
+import asyncio
+import threading
+from app.services.blocking import BlockingExecutor
+
+def test_executor_bounds_blocking_calls_and_keeps_the_loop_free():
+    executor = BlockingExecutor("youtube", 2)
+    release = threading.Event()
+    started = threading.Semaphore(0)
+
+    def blocking_call(n):
+        started.release()
+        release.wait(timeout=5)
+        if n == 3:
+            raise ValueError("quota exceeded")
+        return threading.current_thread().name
+
+    async def run():
+        calls = asyncio.gather(*(executor.run(blocking_call, n) for n in range(4)), return_exceptions=True)
+        # The loop keeps serving other work while both workers are held
+        for _ in range(2):
+            assert await asyncio.to_thread(started.acquire, timeout=5)
+        stats = executor.stats()
+        # and the other two calls wait for a free worker
+        third_started = await asyncio.to_thread(started.acquire, timeout=0.05)
+        release.set()
+        return stats, third_started, await calls
+
+    during, third_started, results = asyncio.run(run())
+    executor.shutdown()
+
+    assert during["in_flight"] == 2 and during["queued"] == 2
+    assert not third_started
+    assert all(name.startswith("youtube-sdk") for name in results[:3])
+    assert isinstance(results[3], ValueError)
+
+    stats = executor.stats()
+    assert stats["peak_in_flight"] == 2 and stats["in_flight"] == 0 and stats["queued"] == 0
+    assert stats["completed"] == 3 and stats["failed"] == 1
@@ -0,0 +1,116 @@
+import asyncio
+import json
+import time
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
+from app.services.bluesky_service import BlueskyService
+from app.services.bluesky_jetstream import JetstreamConsumer, JetstreamReplay, decode_post
+from app.services.matchers.base_matcher import BaseMatcher
+from app.services.matchers.matcher_chain import MatcherChain
+from app.services.dedup_store import post_key
+from app.services.watermark_store import WatermarkStore
+
+BASE_US = int((time.time() - 3600) * 1_000_000)
+
+def post_event(n, text):
+    return json.dumps({
+        "did": "did:plc:author",
+        "time_us": BASE_US + n * 1_000_000,
+        "kind": "commit",
+        "commit": {"operation": "create", "collection": "app.bsky.feed.post", "rkey": f"rkey{n}", "record": {"text": text}},
+    })
+
+def like_event(n):
+    return json.dumps({
+        "did": "did:plc:fan",
+        "time_us": BASE_US + n * 1_000_000,
+        "kind": "commit",
+        "commit": {"operation": "create", "collection": "app.bsky.feed.like", "rkey": f"like{n}", "record": {}},
+    })
+
+LAST_POST = datetime.fromtimestamp((BASE_US + 39 * 1_000_000) / 1_000_000, timezone.utc)
+MESSAGES = [post_event(n, f"my startup idea {n}" if n % 3 == 0 else f"lunch {n}") if n % 4 else like_event(n) for n in range(1, 41)]
+
+def test_decode_post_skips_other_events():
+    assert decode_post(like_event(1)) is None
+    assert decode_post(post_event(2, "hi")).rkey == "rkey2"
+
+def test_stream_and_feed_posts_share_a_dedup_key(settings):
+    streamed = decode_post(post_event(7, "my startup idea"))
+    polled = SimpleNamespace(
+        uri="at://did:plc:author/app.bsky.feed.post/rkey7",
+        indexed_at=datetime.fromtimestamp(streamed.time_us / 1_000_000, timezone.utc).isoformat(),
+        record=SimpleNamespace(text="my startup idea"),
+        author=SimpleNamespace(handle="author.bsky.social"),
+    )
+    consumer = make_consumer(None, None, [])
+    feed_post = BlueskyService()._normalize_post(polled, "startup idea")
+    assert post_key(consumer.normalize_post(streamed, "startup idea")) == post_key(feed_post)
+
+def make_consumer(replay, watermarks, notified):
+    async def on_matches(posts):
+        notified.extend(posts)
+        return True
+
+    matcher = MatcherChain({"keywords": ["startup idea"]}, [BaseMatcher])
+    return JetstreamConsumer(
+        "wss://jetstream.test/subscribe", matcher, on_matches, watermarks,
+        queue_size=2, batch_size=3, flush_seconds=3600, connect=replay, reconnect_delay=0.01,
+    )
+
+def test_consumer_reconnects_resumes_and_flushes(tmp_path):
+    watermarks = WatermarkStore(str(tmp_path / "state.db"), timedelta(days=36500))
+    expected = {f"rkey{n}" for n in range(1, 41) if n % 4 and n % 3 == 0}
+    # Consumed up to just before the recording on an earlier run
+    asyncio.run(watermarks.advance("bluesky", "jetstream", datetime.fromtimestamp(BASE_US / 1_000_000 - 10, timezone.utc)))
+
+    async def run(replay, notified):
+        consumer = make_consumer(replay, watermarks, notified)
+        consumer.start()
+        for _ in range(200):
+            await asyncio.sleep(0.01)
+            if consumer.matched_checkpoint == LAST_POST and consumer.queue.empty():
+                break
+        status = consumer.status()
+        await consumer.stop()
+        return consumer, status
+
+    notified = []
+    replay = JetstreamReplay(MESSAGES, drop_after=10)
+    consumer, status = asyncio.run(run(replay, notified))
+    # Dropped once, resumed from the last received post (rewound a few seconds)
+    assert status.reconnects == 1 and len(replay.urls) == 2
+    assert "cursor=" in replay.urls[1]
+    assert {post.url.rsplit("/", 1)[1] for post in notified} == expected
+    assert consumer.state.checkpoint == LAST_POST
+
+    # A new consumer resumes from the saved checkpoint and sees only the rewind window
+    notified = []
+    replay = JetstreamReplay(MESSAGES)
+    asyncio.run(run(replay, notified))
+    assert {post.url.rsplit("/", 1)[1] for post in notified} <= {"rkey36", "rkey39"}
+
+def test_undelivered_matches_stay_pending_without_a_checkpoint(tmp_path):
+    watermarks = WatermarkStore(str(tmp_path / "state.db"), timedelta(days=36500))
+    attempts = []
+
+    async def on_matches(posts):
+        attempts.append(len(posts))
+        return len(attempts) > 1
+
+    matcher = MatcherChain({"keywords": ["startup idea"]}, [BaseMatcher])
+    consumer = JetstreamConsumer("wss://jetstream.test/subscribe", matcher, on_matches, watermarks)
+    post = decode_post(post_event(3, "my startup idea"))
+    consumer.pending = [consumer.normalize_post(post, "startup idea")]
+    consumer.matched_checkpoint = consumer.item_time(post)
+
+    async def run():
+        await consumer.flush()
+        assert len(consumer.pending) == 1
+        assert await watermarks.get("bluesky", "jetstream") is None
+        await consumer.flush()
+        assert consumer.pending == []
+        assert await watermarks.get("bluesky", "jetstream") == consumer.item_time(post)
+
+    asyncio.run(run())
+    assert attempts == [1, 1]
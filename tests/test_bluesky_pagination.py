@@ -0,0 +1,105 @@
+import asyncio
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
+from app.services import bluesky_service
+from app.services.bluesky_service import BlueskyService
+
+NOW = datetime.now(timezone.utc)
+
+def feed_item(n, age):
+    indexed_at = (NOW - age).isoformat().replace("+00:00", "Z")
+    return SimpleNamespace(post=SimpleNamespace(
+        uri=f"at://did:plc:author/app.bsky.feed.post/{n}",
+        indexed_at=indexed_at,
+        record=SimpleNamespace(text=f"share your startup idea {n}" if n % 2 == 0 else f"lunch {n}"),
+        author=SimpleNamespace(handle="someone.bsky.social"),
+        like_count=0,
+        repost_count=0,
+    ))
+
+class FakeFeedClient:
+    """Pages of two posts, the third page older than the cutoff"""
+    def __init__(self):
+        self.logins = 0
+        self.profile_lookups = 0
+        self.pages = []
+        self.in_flight = 0
+        self.peak = 0
+        self.app = SimpleNamespace(bsky=SimpleNamespace(
+            actor=SimpleNamespace(get_profile=self.get_profile),
+            feed=SimpleNamespace(get_feed=self.get_feed),
+        ))
+
+    async def login(self, login, password):
+        self.logins += 1
+
+    async def get_profile(self, params):
+        self.profile_lookups += 1
+        return SimpleNamespace(did="did:plc:owner")
+
+    async def get_feed(self, params):
+        self.in_flight += 1
+        self.peak = max(self.peak, self.in_flight)
+        await asyncio.sleep(0.01)
+        self.in_flight -= 1
+        page = int(params["cursor"] or 0)
+        self.pages.append((params["feed"], page))
+        age = timedelta(minutes=5) if page < 2 else timedelta(hours=5)
+        return SimpleNamespace(
+            feed=[feed_item(page * 2 + i, age) for i in range(2)],
+            cursor=str(page + 1),
+        )
+
+def make_service(settings, keywords, monkeypatch, feeds):
+    settings.BLUESKY_FEED_CONCURRENCY = 2
+    settings.BLUESKY_MAX_FEED_PAGES = 10
+    keywords("bluesky", {"keywords": ["startup idea"], "feeds": feeds})
+    monkeypatch.setattr(bluesky_service, "AsyncClient", FakeFeedClient)
+    return BlueskyService()
+
+def test_feeds_are_paged_to_the_cutoff_concurrently(settings, keywords, monkeypatch):
+    feeds = ["owner.bsky.social/one", "owner.bsky.social/two"]
+    service = make_service(settings, keywords, monkeypatch, feeds)
+    settings.BLUESKY_FEED_LOOKBACK_MINUTES = 0
+    progress = []
+
+    posts = asyncio.run(service.get_matching_posts(on_progress=progress.append))
+
+    # Pages 0 and 1 are recent, page 2 is entirely past the cutoff
+    assert sorted(page for _, page in service.client.pages) == [0, 0, 1, 1, 2, 2]
+    assert service.client.peak == 2
+    assert service.client.logins == 1
+    assert service.client.profile_lookups == 1
+    assert len(posts) == 4
+    assert sorted(event["checked"] for event in progress) == [6, 6]
+
+    # The watermark stops the next scan from re-reading the same posts
+    assert asyncio.run(service.get_matching_posts()) == []
+
+def test_page_limit_keeps_the_feed_cutoff(settings, keywords, monkeypatch):
+    service = make_service(settings, keywords, monkeypatch, ["owner.bsky.social/one"])
+    settings.BLUESKY_MAX_FEED_PAGES = 1
+    cutoff = NOW - timedelta(hours=2)
+    asyncio.run(service.watermarks.advance("bluesky", "owner.bsky.social/one", cutoff))
+
+    assert len(asyncio.run(service.get_matching_posts())) == 1
+
+    # Page 1 was never read, so the next scan reaches back to the same cutoff
+    assert asyncio.run(service.watermarks.get("bluesky", "owner.bsky.social/one")) == cutoff
+
+def test_posts_indexed_out_of_order_are_read_within_the_lookback(settings, keywords, monkeypatch):
+    service = make_service(settings, keywords, monkeypatch, ["owner.bsky.social/one"])
+    settings.BLUESKY_FEED_LOOKBACK_MINUTES = 30
+    asyncio.run(service.get_matching_posts())
+
+    # Shows up in the feed after newer posts were read, with an older indexed_at
+    late = feed_item(100, timedelta(minutes=8))
+
+    async def get_feed(params):
+        if params["cursor"]:
+            return SimpleNamespace(feed=[], cursor=None)
+        return SimpleNamespace(feed=[late], cursor="1")
+
+    service.client.app.bsky.feed.get_feed = get_feed
+    posts = asyncio.run(service.get_matching_posts())
+    assert [post.post_id for post in posts] == [late.post.uri]
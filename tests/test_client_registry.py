@@ -0,0 +1,77 @@
+import asyncio
+import threading
+from datetime import timedelta
+from app.services.client_registry import ClientRegistry
+
+class FakeService:
+    created = []
+
+    def __init__(self):
+        self.closed = False
+        self.thread = threading.current_thread()
+        FakeService.created.append(self)
+
+    async def close(self):
+        self.closed = True
+
+def test_registry_reuses_and_replaces_services(settings):
+    FakeService.created = []
+
+    async def run():
+        registry = ClientRegistry(timedelta(hours=1))
+        async with registry.lease("reddit", FakeService) as first:
+            assert registry.in_use("reddit") and not registry.in_use("twitter")
+        async with registry.lease("reddit", FakeService) as second:
+            assert first is second
+        assert not registry.in_use("reddit")
+        # Built off the event loop's thread
+        assert first.thread is not threading.current_thread()
+
+        # A failed scan discards the service
+        try:
+            async with registry.lease("reddit", FakeService) as service:
+                raise RuntimeError("session expired")
+        except RuntimeError:
+            pass
+        assert service.closed
+        async with registry.lease("reddit", FakeService) as fresh:
+            assert fresh is not first
+
+        # Services past their max age are rebuilt
+        registry.max_age = timedelta(0)
+        async with registry.lease("reddit", FakeService) as new:
+            assert new is not fresh and fresh.closed
+        registry.max_age = timedelta(hours=1)
+
+        # One closed while leased closes when released
+        async with registry.lease("reddit", FakeService) as leased:
+            await registry.close()
+            assert not leased.closed
+        assert all(service.closed for service in FakeService.created)
+
+    asyncio.run(run())
+    assert len(FakeService.created) == 3
+
+def test_leases_of_a_platform_take_turns(settings):
+    FakeService.created = []
+    active = []
+    overlaps = []
+
+    async def scan(registry, platform):
+        async with registry.lease(platform, FakeService) as service:
+            active.append(platform)
+            overlaps.append(sorted(active))
+            await asyncio.sleep(0.01)
+            active.remove(platform)
+            return service
+
+    async def run():
+        registry = ClientRegistry(timedelta(hours=1))
+        return await asyncio.gather(scan(registry, "reddit"), scan(registry, "reddit"), scan(registry, "twitter"))
+
+    first, second, other = asyncio.run(run())
+    assert first is second and other is not first
+    # The two reddit scans never held the service at the same time
+    assert ["reddit", "reddit"] not in overlaps and ["reddit", "reddit", "twitter"] not in overlaps
+    # Other platforms aren't held up
+    assert ["reddit", "twitter"] in overlaps
@@ -0,0 +1,98 @@
+import asyncio
+from datetime import datetime, timedelta, timezone
+from app.models.social_post import SocialPost
+from app.services import scan_runner
+from app.services.dedup_store import BloomFilter, DedupStore
+
+def make_post(url, platform="reddit", post_id=None):
+    return SocialPost(
+        platform=platform,
+        content="share your startup",
+        author="someone",
+        url=url,
+        timestamp=datetime(2025, 2, 2, tzinfo=timezone.utc),
+        keyword_matched="share",
+        post_id=post_id,
+    )
+
+def test_bloom_filter_has_no_false_negatives():
+    bloom = BloomFilter(1000, 0.01)
+    keys = [f"reddit:https://reddit.com/r/SaaS/{i}" for i in range(1000)]
+    for key in keys:
+        bloom.add(key)
+    assert all(key in bloom for key in keys)
+    false_positives = sum(f"youtube:{i}" in bloom for i in range(10000))
+    assert false_positives < 300
+
+def test_dedup_store_drops_posts_seen_before(tmp_path):
+    db_path = str(tmp_path / "state.db")
+    store = DedupStore(db_path, timedelta(hours=1), capacity=100, error_rate=0.01)
+    first = [make_post("https://reddit.com/1"), make_post("https://reddit.com/2"), make_post("https://reddit.com/1")]
+    second = [
+        make_post("https://reddit.com/2"),
+        make_post("https://reddit.com/3"),
+        # Same URL on another platform, and comments sharing a reel URL
+        make_post("https://reddit.com/1", platform="bluesky"),
+        make_post("https://instagram.com/p/abc", "instagram", "1"),
+        make_post("https://instagram.com/p/abc", "instagram", "2"),
+    ]
+
+    async def handle(store, posts):
+        new_posts = await store.filter_new(posts)
+        await store.mark_seen(new_posts)
+        store.release(new_posts)
+        return new_posts
+
+    async def run():
+        assert [post.url for post in await handle(store, first)] == ["https://reddit.com/1", "https://reddit.com/2"]
+        assert [(post.platform, post.post_id) for post in await handle(store, second)] == [
+            ("reddit", None), ("bluesky", None), ("instagram", "1"), ("instagram", "2"),
+        ]
+        # A fresh process loads what was seen from the database
+        restarted = DedupStore(db_path, timedelta(hours=1), capacity=100, error_rate=0.01)
+        assert await restarted.filter_new(first + second) == []
+        # Expired entries are forgotten
+        expired = DedupStore(db_path, timedelta(seconds=-1), capacity=100, error_rate=0.01)
+        assert len(await expired.filter_new(first)) == 2
+
+    asyncio.run(run())
+
+def test_posts_are_pending_until_marked_seen(tmp_path):
+    store = DedupStore(str(tmp_path / "state.db"), timedelta(hours=1), capacity=100, error_rate=0.01)
+    posts = [make_post("https://reddit.com/1"), make_post("https://reddit.com/2")]
+
+    async def run():
+        held = await store.filter_new(posts)
+        # A concurrent scan doesn't pick up posts another one is handling
+        assert await store.filter_new(posts) == []
+        # Released without being marked, they are new again
+        store.release(held)
+        held = await store.filter_new(posts)
+        assert len(held) == 2
+        await store.mark_seen(held[:1])
+        store.release(held)
+        assert [post.url for post in await store.filter_new(posts)] == ["https://reddit.com/2"]
+
+    asyncio.run(run())
+
+def test_failed_notification_is_retried_with_the_next_one(settings, monkeypatch):
+    sent = []
+
+    async def send_notification(posts):
+        sent.append([post.url for post in posts])
+        return len(sent) > 1
+
+    monkeypatch.setattr(scan_runner, "send_notification", send_notification)
+    first = [make_post("https://reddit.com/1"), make_post("https://reddit.com/2")]
+
+    async def run():
+        # Every match is returned, whether or not it was emailed
+        assert len(await scan_runner.filter_and_notify(first, apply_ai_filter=False)) == 2
+        assert len(await scan_runner.filter_and_notify([make_post("https://reddit.com/3")], apply_ai_filter=False)) == 1
+        assert len(await scan_runner.filter_and_notify(first, apply_ai_filter=False)) == 2
+
+    asyncio.run(run())
+    assert sent == [
+        ["https://reddit.com/1", "https://reddit.com/2"],
+        ["https://reddit.com/1", "https://reddit.com/2", "https://reddit.com/3"],
+    ]
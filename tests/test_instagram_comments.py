@@ -0,0 +1,92 @@
+import asyncio
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
+from app.services.instagram_service import InstagramService
+
+NOW = datetime.now(timezone.utc).replace(microsecond=0)
+
+def comment(n):
+    return SimpleNamespace(
+        pk=n,
+        text=f"startup idea {n}" if n % 5 == 0 else f"nice {n}",
+        created_at_utc=(NOW - timedelta(minutes=n)).replace(tzinfo=None),
+        user=SimpleNamespace(username="fan"),
+        like_count=0,
+    )
+
+class FakeClient:
+    """One account with one reel; comments a minute apart, fetched newest first in chunks"""
+    def __init__(self, events):
+        self.events = events
+        self.comments = [comment(n) for n in range(1, 200)]
+
+    def user_id_from_username(self, username):
+        self.events.append(("user_id", username))
+        return "42"
+
+    def user_clips(self, user_id, amount):
+        self.events.append(("clips", user_id))
+        return [SimpleNamespace(id="reel1", code="abc", comment_count=len(self.comments))]
+
+    def media_info(self, media_id):
+        self.events.append(("media_info", media_id))
+        return SimpleNamespace(comment_count=len(self.comments))
+
+    def media_comments_chunk(self, media_id, max_amount, min_id=None):
+        start = int(min_id or 0)
+        self.events.append(("chunk", start))
+        chunk = self.comments[start:start + max_amount]
+        return chunk, str(start + max_amount)
+
+def make_service(settings, keywords, events):
+    settings.INSTAGRAM_EXECUTOR_WORKERS = 1
+    keywords("instagram", {"keywords": ["startup idea"], "accounts": ["someone"]})
+    service = InstagramService()
+    service.client = FakeClient(events)
+    return service
+
+def test_reel_comments_are_matched_chunk_by_chunk_until_the_cutoff(settings, keywords):
+    events = []
+    service = make_service(settings, keywords, events)
+    progress = []
+
+    posts = asyncio.run(service.get_matching_posts(
+        on_post=lambda post: events.append(("match", post.post_id)),
+        on_progress=progress.append,
+    ))
+
+    # Comments within the last hour, in 20-30 comment chunks, stopping at the cutoff
+    assert sorted(int(post.post_id) for post in posts) == list(range(5, 60, 5))
+    assert progress[0]["checked"] == 59
+    chunks = [start for kind, start in events if kind == "chunk"]
+    assert len(chunks) == 3 or (len(chunks) == 2 and chunks[1] >= 30)
+    # The first chunk's matches were reported before the second chunk was fetched
+    assert events[:4] == [("user_id", "someone"), ("clips", "42"), ("chunk", 0), ("match", "5")]
+
+    # While the listing is cached the reel's count is looked up again; unchanged, its comments aren't paged
+    events.clear()
+    assert asyncio.run(service.get_matching_posts()) == []
+    assert events == [("media_info", "reel1")]
+
+    # A new comment shows in the fresh count even though the listing and user id
+    # are still cached, and the reel is read from its watermark in a single chunk
+    events.clear()
+    service.client.comments.insert(0, comment(0))
+    posts = asyncio.run(service.get_matching_posts())
+    assert [post.post_id for post in posts] == ["0"]
+    assert events == [("media_info", "reel1"), ("chunk", 0)]
+
+def test_user_id_is_kept_after_a_transient_error(settings, keywords):
+    events = []
+    service = make_service(settings, keywords, events)
+    asyncio.run(service.get_matching_posts())
+
+    def user_clips(user_id, amount):
+        raise ConnectionError("connection reset")
+
+    service.client.user_clips = user_clips
+    asyncio.run(service.cache.invalidate("instagram_reels", "42"))
+    events.clear()
+    asyncio.run(service.get_matching_posts())
+    assert asyncio.run(service.cache.get("instagram_user_id", "someone", timedelta(hours=1))) == "42"
+    assert ("user_id", "someone") not in events
@@ -0,0 +1,115 @@
+import asyncio
+import random
+import re
+import numpy as np
+from app.config.settings import get_keywords
+from app.services.matchers.base_matcher import BaseMatcher
+from app.services.matchers.question_matcher import QuestionMatcher, PatternSet, QUESTION_PATTERNS
+from app.services.matchers.matcher_chain import MatcherChain
+from app.services.blocking import get_executor
+from app.services.matchers.semantic_matcher import SemanticMatcher
+
+def linear_match(text, keywords):
+    """Reference first-match scan the keyword index has to agree with"""
+    text = text.lower()
+    for excl in keywords.get("exclude_keywords", []):
+        if excl.lower() in text:
+            return False, ""
+    for keyword in keywords["keywords"]:
+        if keyword.lower() in text:
+            return True, keyword
+    return False, ""
+
+def test_keyword_index_matches_linear_scan():
+    random.seed(7)
+    alphabet = list("abcdefghijklmnopqrstuvwxyz -")
+    for platform, section in get_keywords().items():
+        if not isinstance(section, dict):
+            continue
+        terms = section["keywords"] + section.get("exclude_keywords", [])
+        for _ in range(2000):
+            text = "".join(random.choice(alphabet) for _ in range(random.randint(0, 20)))
+            text += random.choice(terms) + " " + random.choice(terms).upper()[:random.randint(1, 12)]
+            assert BaseMatcher.match(text, section) == linear_match(text, section), (platform, text)
+
+def test_keyword_index_priority_and_overlaps():
+    section = {
+        "keywords": ["self-promotion", "promotional", "share", "shares", "idea"],
+        "exclude_keywords": ["I will not promote"],
+    }
+    assert BaseMatcher.match("Self-Promotional thread", section) == (True, "self-promotion")
+    assert BaseMatcher.match("a self-promotional post", section) == (True, "self-promotion")
+    assert BaseMatcher.match("great promotional ideas", section) == (True, "promotional")
+    assert BaseMatcher.match("who shares an idea", section) == (True, "share")
+    assert BaseMatcher.match("I will not promote, but here's my idea", section) == (False, "")
+    assert BaseMatcher.match("nothing to see", section) == (False, "")
+
+def test_question_matcher_reports_first_pattern_in_list_order():
+    texts = [
+        "Need an idea? Also, what are you working on?",
+        "What's your biggest problem you're facing right now",
+        "SHOW US YOUR PROJECT and tell me about your startup",
+        "Time for self-promotion: plug your product below",
+        "how do I get users for my MVP",
+        "nothing interesting here",
+    ]
+    for text in texts:
+        expected = next((p for p in QUESTION_PATTERNS if re.search(p, text)), None)
+        matches, label = QuestionMatcher.match(text, {})
+        assert matches == (expected is not None)
+        assert label == (f"question:{expected}" if expected else "")
+
+def test_pattern_set_requires_case_insensitive_patterns():
+    try:
+        PatternSet([r"how (do|can) i"])
+    except ValueError:
+        return
+    assert False, "expected ValueError"
+
+def test_matcher_chain_batch_agrees_with_per_item_matching():
+    section = get_keywords()["reddit"]
+    chain = MatcherChain(section, [BaseMatcher, QuestionMatcher])
+    texts = [
+        "What are you working on this week?",
+        "Here is my latest project",
+        "I will not promote, but what are you building?",
+        "how did you get your first 100 users",
+        "",
+        "nothing to see",
+    ]
+    expected = []
+    for text in texts:
+        result = BaseMatcher.match(text, section)
+        if not result[0]:
+            result = QuestionMatcher.match(text, section)
+        expected.append(result)
+    assert asyncio.run(chain.match_many(texts)) == expected
+    assert [asyncio.run(chain.match(text)) for text in texts] == expected
+
+class FakeEncoder:
+    """Bag-of-letters embeddings standing in for the sentence transformer"""
+    def __init__(self):
+        self.calls = []
+
+    def encode(self, texts, batch_size, convert_to_numpy, normalize_embeddings):
+        self.calls.append((len(texts), batch_size))
+        vectors = np.zeros((len(texts), 26))
+        for row, text in enumerate(texts):
+            for char in text.lower():
+                if "a" <= char <= "z":
+                    vectors[row, ord(char) - ord("a")] += 1
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        return vectors / np.where(norms == 0, 1, norms)
+
+def test_semantic_matcher_encodes_phrases_once(settings):
+    matcher = SemanticMatcher(threshold=0.95, batch_size=16)
+    matcher._model = FakeEncoder()
+    section = {"keywords": ["startup idea"], "semantic_intents": ["share your project"]}
+
+    results = asyncio.run(matcher.match_many(["Idea startup!", "your project - share", "zzz"], section))
+    assert results == [(True, "semantic:startup idea"), (True, "semantic:share your project"), (False, "")]
+    assert asyncio.run(matcher.match("startup idea", section)) == (True, "semantic:startup idea")
+    # Phrases encoded on first use only, then one call per batch of texts
+    assert matcher._model.calls == [(2, 16), (3, 16), (1, 16)]
+    # Both batches were matched on the semantic executor, off the event loop
+    assert get_executor("semantic").stats()["completed"] == 2
@@ -0,0 +1,119 @@
+import asyncio
+import json
+import re
+from datetime import datetime, timezone
+from types import SimpleNamespace
+from app.models.social_post import SocialPost
+from app.services import openai_service
+from app.services.openai_service import PROMPT_VERSION, OpenAIService
+from app.services.verdict_cache import verdict_key
+
+def make_post(n, platform="reddit", content=None):
+    return SocialPost(
+        platform=platform,
+        content=content or (f"lead {n}" if n % 2 == 0 else f"chatter {n}"),
+        author="someone",
+        url=f"https://example.com/{n}",
+        timestamp=datetime(2025, 2, 2, tzinfo=timezone.utc),
+        keyword_matched="idea",
+    )
+
+def tool_response(arguments):
+    call = SimpleNamespace(function=SimpleNamespace(arguments=json.dumps(arguments)))
+    return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(tool_calls=[call]))])
+
+class FakeCompletions:
+    """Promotes even-numbered "lead" posts; posts 13 and 14 can't be evaluated and
+    batches containing post 7 come back missing a verdict"""
+    def __init__(self):
+        self.calls = []
+        self.in_flight = 0
+        self.peak_in_flight = 0
+
+    async def create(self, model, messages, tools, tool_choice):
+        prompt = messages[-1]["content"]
+        numbers = [int(number) for number in re.findall(r"Content: (?:lead|chatter) (\d+)", prompt)]
+        self.calls.append(numbers)
+        self.in_flight += 1
+        self.peak_in_flight = max(self.peak_in_flight, self.in_flight)
+        await asyncio.sleep(0.01)
+        self.in_flight -= 1
+        if numbers in ([13], [14]):
+            raise ValueError("malformed response")
+        if len(numbers) == 1:
+            return tool_response({"promote": numbers[0] % 2 == 0})
+        verdicts = [
+            {"post": index, "promote": number % 2 == 0}
+            for index, number in enumerate(numbers, 1) if number != 7
+        ]
+        return tool_response({"verdicts": verdicts})
+
+def make_service(settings, monkeypatch, batch_size, keep_on_error, cache_verdicts=False):
+    settings.OPENAI_MODEL = "test-model"
+    settings.OPENAI_BATCH_SIZE = batch_size
+    settings.OPENAI_CONCURRENCY = 2
+    settings.OPENAI_KEEP_ON_ERROR = keep_on_error
+    settings.OPENAI_VERDICT_CACHE_ENABLED = cache_verdicts
+    completions = FakeCompletions()
+    monkeypatch.setattr(
+        openai_service, "AsyncOpenAI", lambda api_key: SimpleNamespace(chat=SimpleNamespace(completions=completions))
+    )
+    return OpenAIService()
+
+def test_batches_run_concurrently_with_verdicts_per_post(settings, monkeypatch):
+    service = make_service(settings, monkeypatch, batch_size=4, keep_on_error=False)
+    posts = [make_post(n) for n in range(1, 13)]
+
+    kept = asyncio.run(service.filter_promotion_worthy(posts))
+
+    assert [post.url for post in kept] == [f"https://example.com/{n}" for n in range(2, 13, 2)]
+    # Three batches, the one missing post 7's verdict redone a post at a time
+    assert sorted(service.client.chat.completions.calls, key=lambda numbers: (len(numbers), numbers)) == [
+        [5], [6], [7], [8], [1, 2, 3, 4], [5, 6, 7, 8], [9, 10, 11, 12],
+    ]
+    assert service.client.chat.completions.peak_in_flight == 2
+
+def test_failed_posts_are_isolated(settings, monkeypatch):
+    posts = [make_post(n) for n in range(11, 16)]
+
+    service = make_service(settings, monkeypatch, batch_size=1, keep_on_error=True)
+    kept = asyncio.run(service.filter_promotion_worthy(posts))
+    assert [post.url for post in kept] == [f"https://example.com/{n}" for n in (12, 13, 14)]
+
+    service = make_service(settings, monkeypatch, batch_size=1, keep_on_error=False)
+    kept = asyncio.run(service.filter_promotion_worthy(posts))
+    assert [post.url for post in kept] == ["https://example.com/12"]
+
+def test_verdicts_are_cached_by_normalized_text(settings, monkeypatch):
+    settings.OPENAI_VERDICT_CACHE_MAX_ENTRIES = 3
+    posts = [make_post(n) for n in (2, 3, 13)]
+    # A cross-post of post 2 differing only in case and whitespace
+    posts.append(make_post(20, platform="bluesky", content="  LEAD\n 2 "))
+
+    async def run():
+        service = make_service(settings, monkeypatch, batch_size=1, keep_on_error=True, cache_verdicts=True)
+        kept = await service.filter_promotion_worthy(posts)
+        assert [post.url for post in kept] == [f"https://example.com/{n}" for n in (2, 13, 20)]
+        assert sorted(service.client.chat.completions.calls) == [[2], [3], [13]]
+
+        # Only post 13, which couldn't be evaluated, is sent again
+        service = make_service(settings, monkeypatch, batch_size=1, keep_on_error=False, cache_verdicts=True)
+        kept = await service.filter_promotion_worthy(posts + [make_post(4)])
+        assert [post.url for post in kept] == [f"https://example.com/{n}" for n in (2, 20, 4)]
+        assert sorted(service.client.chat.completions.calls) == [[4], [13]]
+
+        # Another model doesn't reuse the verdicts
+        service = make_service(settings, monkeypatch, batch_size=1, keep_on_error=False, cache_verdicts=True)
+        settings.OPENAI_MODEL = "other-model"
+        await service.filter_promotion_worthy(posts[:1])
+        assert service.client.chat.completions.calls == [[2]]
+
+        verdicts = service.verdicts
+        stats = await verdicts.stats()
+        assert (stats.hits, stats.misses) == (2, 6)
+        # The least recently used verdict beyond max_entries was evicted
+        assert stats.entries == 3
+        newest = [verdict_key(make_post(4), "test-model", PROMPT_VERSION), verdict_key(posts[0], "other-model", PROMPT_VERSION)]
+        assert await verdicts.get_many(newest) == dict.fromkeys(newest, True)
+
+    asyncio.run(run())
@@ -0,0 +1,67 @@
+import asyncio
+import pytest
+from app.services.pacing import RequestPacer
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+        self.sleeps = []
+
+    def __call__(self):
+        return self.now
+
+    async def sleep(self, seconds):
+        self.sleeps.append(round(seconds, 3))
+        self.now += seconds
+
+def test_pacer_spaces_requests_and_caps_the_rate():
+    clock = FakeClock()
+    pacer = RequestPacer("twitter", "me", requests_per_minute=30, burst=2, min_delay=0.1, max_delay=0.1, clock=clock, sleep=clock.sleep)
+
+    async def run():
+        starts = []
+        for _ in range(3):
+            await pacer.acquire()
+            starts.append(clock.now)
+        # Local work between requests counts toward both limits
+        clock.now += 10
+        await pacer.acquire()
+        starts.append(clock.now)
+        return starts
+
+    starts = asyncio.run(run())
+    # The jittered gap, then the empty bucket refilling at half a request per second
+    assert starts[:3] == pytest.approx([0, 0.1, 2.0])
+    assert starts[3] == pytest.approx(12.0)
+    assert clock.sleeps == [0.1, 1.9]
+    assert pacer.stats()["requests"] == 4 and pacer.stats()["waited_seconds"] == 2.0
+
+def test_pacer_serves_concurrent_waiters_in_turn():
+    clock = FakeClock()
+    pacer = RequestPacer("instagram", "me", requests_per_minute=600, burst=5, min_delay=1, max_delay=2, clock=clock, sleep=clock.sleep)
+    starts = []
+
+    async def request():
+        await pacer.acquire()
+        starts.append(clock.now)
+
+    async def run():
+        await asyncio.gather(*(request() for _ in range(4)))
+
+    asyncio.run(run())
+    gaps = [b - a for a, b in zip(starts, starts[1:])]
+    assert len(starts) == 4 and all(1 <= gap <= 2 for gap in gaps)
+
+def test_pacer_charges_request_cost():
+    clock = FakeClock()
+    pacer = RequestPacer("openai", "tokens", requests_per_minute=600, burst=100, min_delay=0, max_delay=0, clock=clock, sleep=clock.sleep)
+
+    async def run():
+        await pacer.acquire(80)
+        await pacer.acquire(50)
+        # More than the bucket holds waits for a full bucket
+        await pacer.acquire(500)
+
+    asyncio.run(run())
+    # 30 tokens short at 10 a second, then 100 short
+    assert clock.sleeps == [3.0, 10.0]
@@ -0,0 +1,103 @@
+import asyncio
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
+from app.services import reddit_comment_stream
+from app.services.matchers.base_matcher import BaseMatcher
+from app.services.matchers.matcher_chain import MatcherChain
+from app.services.reddit_comment_stream import RedditCommentStream
+from app.services.watermark_store import WatermarkStore
+
+BASE = datetime.now(timezone.utc) - timedelta(hours=1)
+
+def comment(n, suffix=""):
+    return SimpleNamespace(
+        id=f"c{n}{suffix}",
+        body=f"my startup idea {n}" if n % 3 == 0 else f"nice {n}",
+        link_title="What are you building?",
+        author="someone",
+        permalink=f"/r/SaaS/comments/abc/x/c{n}",
+        created_utc=(BASE + timedelta(seconds=n)).timestamp(),
+        subreddit="SaaS",
+        score=1,
+    )
+
+class FakeReddit:
+    """Comment stream that yields recent comments oldest first, then waits; the first stream fails part way"""
+    def __init__(self, comments, fail_after=None):
+        self.comments = comments
+        self.fail_after = fail_after
+        self.streams = []
+        self.clients = 0
+        self.closed = 0
+
+    async def subreddit(self, name):
+        reddit = self
+
+        class Stream:
+            async def comments(self, skip_existing):
+                reddit.streams.append(name)
+                fail_after = reddit.fail_after if len(reddit.streams) == 1 else None
+                for i, item in enumerate(reddit.comments):
+                    if i == fail_after:
+                        raise ConnectionError("Reddit stream failed")
+                    yield item
+                await asyncio.Event().wait()
+
+        return SimpleNamespace(stream=Stream())
+
+def run_stream(monkeypatch, watermarks, reddit, notified):
+    class FakeService:
+        def __init__(self):
+            self.reddit = reddit
+            reddit.clients += 1
+
+        async def ensure_client(self):
+            pass
+
+        async def close(self):
+            reddit.closed += 1
+
+    async def on_matches(posts):
+        notified.extend(posts)
+        return True
+
+    async def run():
+        monkeypatch.setattr(reddit_comment_stream, "RedditService", FakeService)
+        stream = RedditCommentStream(
+            ["SaaS", "startups"], MatcherChain({"keywords": ["startup idea"]}, [BaseMatcher]), on_matches, watermarks,
+            queue_size=2, batch_size=3, flush_seconds=3600, reconnect_delay=0.01,
+        )
+        stream.start()
+        last = max(item.created_utc for item in reddit.comments)
+        for _ in range(200):
+            await asyncio.sleep(0.01)
+            if stream.matched_checkpoint and stream.matched_checkpoint.timestamp() == last and stream.queue.empty():
+                break
+        await stream.stop()
+        return stream.status()
+
+    return asyncio.run(run())
+
+def test_comment_stream_resumes_after_failure_and_restart(settings, tmp_path, monkeypatch):
+    watermarks = WatermarkStore(str(tmp_path / "state.db"), timedelta(days=1))
+    asyncio.run(watermarks.advance("reddit", "comments", BASE))
+    comments = [comment(n) for n in range(1, 31)]
+    # Arrives in the same second as c12, but only in the relisting
+    comments.insert(12, comment(12, "late"))
+    reddit = FakeReddit(comments, fail_after=12)
+
+    notified = []
+    status = run_stream(monkeypatch, watermarks, reddit, notified)
+    # The relisting after the failure skips what was already received
+    assert reddit.streams == ["SaaS+startups", "SaaS+startups"]
+    # Each connection had its own client, closed when it ended
+    assert reddit.clients == reddit.closed == 2
+    assert status.reconnects == 1
+    assert sorted(post.post_id for post in notified) == sorted(["t1_c12late"] + [f"t1_c{n}" for n in range(3, 31, 3)])
+    assert status.checkpoint.timestamp() == comment(30).created_utc
+
+    # After a restart only comments from the checkpoint's second on are matched
+    reddit = FakeReddit([comment(n) for n in range(1, 34)])
+    notified = []
+    run_stream(monkeypatch, watermarks, reddit, notified)
+    assert [post.post_id for post in notified] == ["t1_c30", "t1_c33"]
@@ -0,0 +1,86 @@
+import asyncio
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
+from app.services import reddit_service
+from app.services.reddit_service import RedditService, MAX_LISTING_LIMIT
+
+NOW = datetime.now(timezone.utc)
+
+def submission(subreddit, minutes_ago, n):
+    return SimpleNamespace(
+        subreddit=subreddit,
+        created_utc=(NOW - timedelta(minutes=minutes_ago)).timestamp(),
+        title=f"startup idea {n}" if minutes_ago % 20 == 5 else f"question {n}",
+        selftext="",
+        author="someone",
+        permalink=f"/r/{subreddit}/comments/{n}",
+        score=1,
+        num_comments=0,
+    )
+
+class FakeReddit:
+    """Each subreddit gets a post every 10 minutes; combined listings merge them newest first"""
+    def __init__(self):
+        self.listings = []
+
+    async def subreddit(self, name):
+        reddit = self
+
+        class Listing:
+            async def new(self, limit):
+                reddit.listings.append((name, limit))
+                posts = [
+                    submission(sub, minutes, i * 100 + minutes)
+                    for i, sub in enumerate(name.split("+"))
+                    for minutes in range(5, 300, 10)
+                ]
+                posts.sort(key=lambda post: -post.created_utc)
+                for post in posts[:limit]:
+                    await asyncio.sleep(0)
+                    yield post
+
+        return Listing()
+
+def make_service(settings, keywords, monkeypatch, subreddits):
+    settings.REDDIT_COMBINED_CHUNK_SIZE = 2
+    settings.REDDIT_LISTING_CONCURRENCY = 2
+    keywords("reddit", {"keywords": ["startup idea"], "subreddits": subreddits})
+    reddit = FakeReddit()
+    monkeypatch.setattr(reddit_service, "TCPConnector", lambda **kwargs: None)
+    monkeypatch.setattr(reddit_service, "ClientSession", lambda **kwargs: None)
+    monkeypatch.setattr(reddit_service.asyncpraw, "Reddit", lambda **kwargs: reddit)
+    return RedditService()
+
+def test_combined_listings_keep_per_subreddit_attribution(settings, keywords, monkeypatch):
+    service = make_service(settings, keywords, monkeypatch, ["SaaS", "startups", "Entrepreneur"])
+    # startups was scanned 20 minutes ago, the others have no watermark yet
+    asyncio.run(service.watermarks.advance("reddit", "r/startups", NOW - timedelta(minutes=20)))
+    progress = []
+
+    posts = asyncio.run(service.get_matching_posts(on_progress=progress.append))
+
+    assert sorted(name for name, _ in service.reddit.listings) == ["Entrepreneur", "SaaS+startups"]
+    assert all(limit == MAX_LISTING_LIMIT for _, limit in service.reddit.listings)
+    counts = {event["source"]: event["checked"] for event in progress}
+    assert counts == {"r/SaaS": 6, "r/startups": 2, "r/Entrepreneur": 6}
+    assert {post.subreddit for post in posts} == {"SaaS", "startups", "Entrepreneur"}
+    assert all(post.url.startswith(f"https://reddit.com/r/{post.subreddit}/") for post in posts)
+
+    # Post rates are now known, so the next listings only ask for what the window needs
+    service.reddit.listings = []
+    asyncio.run(service.get_matching_posts())
+    assert all(limit == 100 for _, limit in service.reddit.listings)
+
+def test_truncated_listing_keeps_unreached_cutoffs(settings, keywords, monkeypatch):
+    monkeypatch.setattr(reddit_service, "MAX_LISTING_LIMIT", 4)
+    service = make_service(settings, keywords, monkeypatch, ["SaaS", "startups"])
+    saas_cutoff = NOW - timedelta(minutes=90)
+    asyncio.run(service.watermarks.advance("reddit", "r/SaaS", saas_cutoff))
+    asyncio.run(service.watermarks.advance("reddit", "r/startups", NOW - timedelta(minutes=10)))
+
+    asyncio.run(service.get_matching_posts())
+
+    # Four posts reach back 15 minutes: past startups' cutoff but not SaaS's
+    assert service.reddit.listings == [("SaaS+startups", 4)]
+    assert asyncio.run(service.watermarks.get("reddit", "r/SaaS")) == saas_cutoff
+    assert asyncio.run(service.watermarks.get("reddit", "r/startups")) == NOW - timedelta(minutes=5)
@@ -0,0 +1,153 @@
+import asyncio
+import pytest
+from app.services import resilience, scan_runner
+from app.services.resilience import AUTH, CLIENT, LOCAL, TRANSIENT, CircuitBreaker, CircuitOpen, ResilientCaller
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+        self.sleeps = []
+
+    def __call__(self):
+        return self.now
+
+    async def sleep(self, seconds):
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+class ExpiredSession(Exception):
+    pass
+
+class NotFound(Exception):
+    pass
+
+class OutOfQuota(Exception):
+    pass
+
+def classify(e):
+    if isinstance(e, ExpiredSession):
+        return AUTH
+    if isinstance(e, NotFound):
+        return CLIENT
+    if isinstance(e, OutOfQuota):
+        return LOCAL
+    return TRANSIENT
+
+def make_caller(clock, reauth=None, retries=2, threshold=5):
+    breaker = CircuitBreaker("test", threshold, 60, clock=clock)
+    return ResilientCaller(breaker, retries, 1, 8, classify, reauth, sleep=clock.sleep)
+
+def test_caller_retries_transient_errors_and_logs_in_again_once():
+    clock = FakeClock()
+    logins = []
+
+    async def reauth():
+        logins.append(clock.now)
+
+    caller = make_caller(clock, reauth)
+    outcomes = [ConnectionError("reset"), ExpiredSession(), ConnectionError("reset"), "ok"]
+    calls = []
+
+    async def request(n):
+        calls.append(n)
+        outcome = outcomes.pop(0)
+        if isinstance(outcome, Exception):
+            raise outcome
+        return outcome
+
+    assert asyncio.run(caller.call(request, 7)) == "ok"
+    assert calls == [7, 7, 7, 7] and len(logins) == 1
+    assert len(clock.sleeps) == 2 and all(0 <= delay <= 2 for delay in clock.sleeps)
+    assert caller.breaker.state == "closed" and caller.breaker.consecutive_failures == 0
+
+    # A second auth error after logging in again is final, and login calls never re-authenticate
+    async def expired():
+        raise ExpiredSession()
+
+    with pytest.raises(ExpiredSession):
+        asyncio.run(caller.call(expired))
+    with pytest.raises(ExpiredSession):
+        asyncio.run(caller.login(expired))
+    assert len(logins) == 2
+
+    # Client errors are raised without retries and don't count against the platform
+    async def missing():
+        raise NotFound()
+
+    clock.sleeps.clear()
+    with pytest.raises(NotFound):
+        asyncio.run(caller.call(missing))
+    assert clock.sleeps == [] and caller.breaker.consecutive_failures == 0
+
+    # Local refusals are raised without retries and leave the failure count as it was
+    async def unreachable():
+        raise ConnectionError("unreachable")
+
+    async def refused():
+        raise OutOfQuota()
+
+    caller = make_caller(clock, retries=0)
+    with pytest.raises(ConnectionError):
+        asyncio.run(caller.call(unreachable))
+    with pytest.raises(OutOfQuota):
+        asyncio.run(caller.call(refused))
+    assert clock.sleeps == [] and caller.breaker.consecutive_failures == 1
+
+def test_breaker_opens_fails_fast_and_recovers():
+    clock = FakeClock()
+    caller = make_caller(clock, retries=1, threshold=3)
+    calls = []
+
+    async def down():
+        calls.append(clock.now)
+        raise ConnectionError("unreachable")
+
+    async def up():
+        calls.append(clock.now)
+        return "ok"
+
+    with pytest.raises(ConnectionError):
+        asyncio.run(caller.call(down))
+    # The third failure opens the circuit, cutting the second call's retries short
+    with pytest.raises(ConnectionError):
+        asyncio.run(caller.call(down))
+    assert len(calls) == 3 and caller.breaker.state == "open"
+
+    for _ in range(10):
+        with pytest.raises(CircuitOpen):
+            asyncio.run(caller.call(up))
+    assert len(calls) == 3 and caller.breaker.short_circuited == 10
+
+    # Half-open after the reset period: a failure reopens at once, a success closes
+    clock.now += 60
+    with pytest.raises(ConnectionError):
+        asyncio.run(caller.call(down))
+    assert caller.breaker.state == "open" and caller.breaker.trips == 2
+    clock.now += 60
+    assert asyncio.run(caller.call(up)) == "ok"
+    assert caller.breaker.state == "closed"
+
+def test_scan_reports_platform_degraded_when_its_circuit_opened(platform_services, monkeypatch):
+    breaker = CircuitBreaker("flaky", 2, 60)
+
+    class FlakyService:
+        async def get_matching_posts(self, on_post=None, on_progress=None):
+            for source in ["a", "b", "c", "d"]:
+                try:
+                    breaker.check()
+                    raise ConnectionError("unreachable")
+                except CircuitOpen as e:
+                    on_progress({"source": source, "error": str(e)})
+                except ConnectionError as e:
+                    breaker.record_failure()
+                    on_progress({"source": source, "error": str(e)})
+            return []
+
+    platform_services({"flaky": FlakyService}, deadline=1)
+    monkeypatch.setitem(resilience._breakers, "flaky", breaker)
+    progress = []
+
+    _, status = asyncio.run(scan_runner.scan_platform("flaky", on_progress=progress.append))
+
+    assert status.status == "degraded" and "circuit open" in status.error
+    assert [event["error"].startswith("flaky circuit open") for event in progress] == [False, False, True, True]
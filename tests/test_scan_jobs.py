@@ -0,0 +1,119 @@
+import asyncio
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
+from app.models.social_post import SocialPost
+from app.services import scan_runner
+from app.services.scan_jobs import ScanJobManager
+
+class CountingService:
+    instances = 0
+
+    def __init__(self):
+        CountingService.instances += 1
+
+    async def get_matching_posts(self, on_post=None, on_progress=None):
+        await asyncio.sleep(0.05)
+        post = SocialPost(
+            platform="reddit",
+            content="share your startup",
+            author="someone",
+            url="https://example.com/1",
+            timestamp=datetime(2025, 2, 2, tzinfo=timezone.utc),
+            keyword_matched="share",
+        )
+        on_post(post)
+        on_progress({"source": "r/SaaS", "checked": 5, "matched": 1, "error": None})
+        return [post]
+
+def test_jobs_for_the_same_scope_coalesce(platform_services, monkeypatch):
+    async def passthrough(posts, ai_filter_views):
+        return {apply_ai_filter: posts for apply_ai_filter in ai_filter_views}
+
+    platform_services({"reddit": CountingService})
+    monkeypatch.setattr(scan_runner, "filter_and_notify_views", passthrough)
+    CountingService.instances = 0
+
+    async def run():
+        manager = ScanJobManager(timedelta(minutes=5))
+        first, created_first = manager.submit("reddit")
+        second, created_second = manager.submit("reddit")
+        assert manager.is_busy("reddit") and not manager.is_busy("twitter")
+        assert first.snapshot().platforms["reddit"].status == "running"
+        await first.task
+        return manager, first, second, created_first, created_second
+
+    manager, first, second, created_first, created_second = asyncio.run(run())
+    assert created_first and not created_second
+    assert first is second
+    assert CountingService.instances == 1
+
+    snapshot = manager.get(first.id).snapshot()
+    assert snapshot.status == "completed"
+    assert snapshot.sources_scanned == 1
+    assert snapshot.platforms["reddit"].status == "ok"
+    assert [post.url for post in snapshot.posts] == ["https://example.com/1"]
+
+def test_requests_with_and_without_the_ai_filter_share_one_scan(platform_services, monkeypatch):
+    notified = []
+
+    async def send_notification(posts):
+        notified.append([post.url for post in posts])
+        return True
+
+    async def reject_all(posts):
+        return []
+
+    platform_services({"reddit": CountingService})
+    monkeypatch.setattr(scan_runner, "ai_filter", reject_all)
+    monkeypatch.setattr(scan_runner, "send_notification", send_notification)
+    CountingService.instances = 0
+
+    async def run():
+        manager = ScanJobManager(timedelta(minutes=5))
+        filtered, _ = manager.submit("reddit", apply_ai_filter=True)
+        unfiltered, created = manager.submit("reddit", apply_ai_filter=False)
+        assert filtered is unfiltered and not created
+        await filtered.task
+        return filtered
+
+    job = asyncio.run(run())
+    assert CountingService.instances == 1
+    assert job.snapshot(apply_ai_filter=True).posts == []
+    assert [post.url for post in job.snapshot(apply_ai_filter=False).posts] == ["https://example.com/1"]
+    # Only the least filtered view is emailed
+    assert notified == [["https://example.com/1"]]
+
+def test_view_nobody_asked_for_is_built_on_request(platform_services, monkeypatch):
+    filtered = []
+
+    async def ai_filter(posts):
+        filtered.append(len(posts))
+        return []
+
+    platform_services({"reddit": CountingService})
+    monkeypatch.setattr(scan_runner, "ai_filter", ai_filter)
+    monkeypatch.setattr(scan_runner, "send_notification", lambda posts: asyncio.sleep(0, True))
+
+    async def run():
+        job, _ = ScanJobManager(timedelta(minutes=5)).submit("reddit", apply_ai_filter=False)
+        await job.task
+        try:
+            job.snapshot(apply_ai_filter=True)
+        except ValueError:
+            pass
+        else:
+            assert False, "expected ValueError for a view that was never built"
+        await job.ensure_view(True)
+        return job
+
+    job = asyncio.run(run())
+    assert filtered == [1]
+    assert job.snapshot(apply_ai_filter=True).posts == []
+    assert len(job.snapshot(apply_ai_filter=False).posts) == 1
+
+def test_unknown_scope_is_rejected():
+    try:
+        ScanJobManager(timedelta(minutes=5)).submit("myspace")
+    except ValueError:
+        return
+    assert False, "expected ValueError"
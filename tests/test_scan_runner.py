@@ -0,0 +1,46 @@
+import asyncio
+import time
+from datetime import datetime, timezone
+from app.models.social_post import SocialPost
+from app.services import scan_runner
+
+def make_post(platform, n):
+    return SocialPost(
+        platform=platform,
+        content=f"post {n}",
+        author="someone",
+        url=f"https://example.com/{platform}/{n}",
+        timestamp=datetime(2025, 2, 2, tzinfo=timezone.utc),
+        keyword_matched="idea",
+    )
+
+class FastService:
+    async def get_matching_posts(self, on_post=None, on_progress=None):
+        posts = [make_post("fast", n) for n in range(2)]
+        for post in posts:
+            on_post(post)
+        return posts
+
+class SlowService:
+    async def get_matching_posts(self, on_post=None, on_progress=None):
+        on_post(make_post("slow", 0))
+        await asyncio.sleep(10)
+
+class BrokenService:
+    async def get_matching_posts(self, on_post=None, on_progress=None):
+        raise RuntimeError("login failed")
+
+def test_scan_platforms_keeps_partial_results(platform_services):
+    platform_services({"fast": FastService, "slow": SlowService, "broken": BrokenService}, deadline=0.2)
+
+    started = time.monotonic()
+    posts, statuses = asyncio.run(scan_runner.scan_platforms(["fast", "slow", "broken"]))
+    elapsed = time.monotonic() - started
+
+    assert [post.url for post in posts] == [
+        "https://example.com/fast/0", "https://example.com/fast/1", "https://example.com/slow/0",
+    ]
+    assert statuses["fast"].status == "ok" and statuses["fast"].posts_found == 2
+    assert statuses["slow"].status == "timeout" and statuses["slow"].posts_found == 1
+    assert statuses["broken"].status == "error" and statuses["broken"].error == "login failed"
+    assert elapsed < 1
@@ -0,0 +1,67 @@
+import asyncio
+import json
+from datetime import datetime, timezone
+from app.models.social_post import SocialPost
+from app.services import scan_runner, scan_stream
+
+class FeedService:
+    async def get_matching_posts(self, on_post=None, on_progress=None):
+        post = SocialPost(
+            platform="bluesky",
+            content="what are you building?",
+            author="someone",
+            url="https://example.com/1",
+            timestamp=datetime(2025, 2, 2, tzinfo=timezone.utc),
+            keyword_matched="building",
+        )
+        on_post(post)
+        on_progress({"source": "feed-a", "checked": 10, "matched": 1, "error": None})
+        return [post]
+
+def test_stream_scan_emits_posts_progress_and_status(platform_services, monkeypatch):
+    notified = []
+
+    async def fake_notification(posts, apply_ai_filter):
+        notified.extend(posts)
+        return posts
+
+    platform_services({"bluesky": FeedService})
+    monkeypatch.setattr(scan_stream, "filter_and_notify", fake_notification)
+
+    async def collect():
+        return [line async for line in scan_stream.stream_scan(["bluesky"], "ndjson")]
+
+    events = [json.loads(line) for line in asyncio.run(collect())]
+    assert [event["event"] for event in events] == ["post", "progress", "platform", "done"]
+    assert events[0]["data"]["url"] == "https://example.com/1"
+    assert events[1]["data"] == {"platform": "bluesky", "source": "feed-a", "checked": 10, "matched": 1, "error": None}
+    assert events[2]["data"]["status"] == "ok"
+    assert events[3]["data"] == {"posts_found": 1}
+    assert len(notified) == 1
+
+def test_scan_finishes_and_notifies_after_client_disconnects(platform_services, monkeypatch):
+    class SlowFeedService(FeedService):
+        async def get_matching_posts(self, on_post=None, on_progress=None):
+            posts = await super().get_matching_posts(on_post, on_progress)
+            await asyncio.sleep(0.05)
+            return posts
+
+    async def run():
+        notified = asyncio.Event()
+
+        async def fake_notification(posts, apply_ai_filter):
+            notified.set()
+            return posts
+
+        platform_services({"bluesky": SlowFeedService})
+        monkeypatch.setattr(scan_stream, "filter_and_notify", fake_notification)
+
+        stream = scan_stream.stream_scan(["bluesky"], "ndjson")
+        assert json.loads(await stream.__anext__())["event"] == "post"
+        await stream.aclose()
+        await asyncio.wait_for(notified.wait(), timeout=1)
+
+    asyncio.run(run())
+
+def test_format_event_as_sse():
+    assert scan_stream.format_event("done", {"posts_found": 0}, "sse") == 'event: done\ndata: {"posts_found": 0}\n\n'
@@ -0,0 +1,60 @@
+import asyncio
+from datetime import timedelta
+from app.services import scan_runner, scheduler
+from app.services.scan_jobs import ScanJobManager
+
+class SlowService:
+    running = 0
+    peak = 0
+
+    async def get_matching_posts(self, on_post=None, on_progress=None):
+        SlowService.running += 1
+        SlowService.peak = max(SlowService.peak, SlowService.running)
+        await asyncio.sleep(0.1)
+        SlowService.running -= 1
+        return []
+
+def test_scheduler_runs_without_overlap_and_skips_busy_platforms(platform_services, monkeypatch):
+    async def passthrough(posts, apply_ai_filter):
+        return posts
+
+    platform_services({"reddit": SlowService, "youtube": SlowService})
+    monkeypatch.setattr(scan_runner, "filter_and_notify", passthrough)
+    # Interval shorter than a run, so runs would overlap without the scheduler's guard
+    monkeypatch.setattr(scheduler, "platform_interval", lambda platform: 0)
+
+    async def run():
+        manager = ScanJobManager(timedelta(minutes=5))
+        scan_scheduler = scheduler.ScanScheduler(manager, ["reddit", "youtube"], 0, False)
+        # A manual youtube scan is already running when the scheduler starts
+        manual, _ = manager.submit("youtube")
+        scan_scheduler.start()
+        await asyncio.sleep(0.35)
+        await scan_scheduler.stop()
+        await manager.shutdown()
+        return scan_scheduler.status()
+
+    status = {state.platform: state for state in asyncio.run(run())}
+    assert status["reddit"].runs >= 2
+    assert status["reddit"].last_job_id is not None
+    assert status["reddit"].next_run_at is not None
+    assert status["youtube"].skipped_runs >= 1
+    # Never more than one reddit scan plus the manual youtube scan at once
+    assert SlowService.peak <= 2
+
+def test_scheduler_skips_a_platform_scanned_outside_the_job_manager(platform_services, monkeypatch):
+    platform_services({"reddit": SlowService})
+    monkeypatch.setattr(scheduler, "platform_interval", lambda platform: 0)
+
+    async def run():
+        manager = ScanJobManager(timedelta(minutes=5))
+        scan_scheduler = scheduler.ScanScheduler(manager, ["reddit"], 0, False)
+        # A direct /reddit/scan request holds the platform's service
+        async with scan_runner.get_client_registry().lease("reddit", SlowService):
+            scan_scheduler.start()
+            await asyncio.sleep(0.05)
+        await scan_scheduler.stop()
+        return scan_scheduler.status()[0]
+
+    status = asyncio.run(run())
+    assert status.skipped_runs >= 1 and status.runs == 0
@@ -0,0 +1,131 @@
+import asyncio
+import json
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
+from app.services import twitter_service
+from app.services.twitter_service import TwitterService, MAX_TWEET_PAGE_SIZE, MIN_TWEET_PAGE_SIZE
+
+NOW = datetime.now(timezone.utc)
+
+def tweet(community, minutes_ago):
+    return SimpleNamespace(
+        id=f"{community}-{minutes_ago}",
+        text="my startup idea" if minutes_ago % 10 == 0 else "hello",
+        created_at_datetime=(NOW - timedelta(minutes=minutes_ago)).replace(tzinfo=None),
+        user=SimpleNamespace(screen_name="someone"),
+    )
+
+class FakeResult:
+    def __init__(self, client, tweets, count, offset=0):
+        self.client = client
+        self.tweets = tweets
+        self.count = count
+        self.offset = offset
+
+    def __iter__(self):
+        return iter(self.tweets[self.offset:self.offset + self.count])
+
+    async def next(self):
+        self.client.requests.append(("next", self.count))
+        await asyncio.sleep(0)
+        return FakeResult(self.client, self.tweets, self.count, self.offset + self.count)
+
+class FakeClient:
+    """busy gets a tweet a minute, quiet one an hour"""
+    def __init__(self):
+        self.requests = []
+        self.timelines = {
+            "busy": [tweet("busy", m) for m in range(0, 300)],
+            "quiet": [tweet("quiet", m) for m in range(30, 300, 60)],
+        }
+
+    async def get_community_tweets(self, community_id, tweet_type, count):
+        self.requests.append((community_id, count))
+        await asyncio.sleep(0)
+        return FakeResult(self, self.timelines[community_id], count)
+
+def make_service(settings, keywords):
+    settings.TWITTER_COMMUNITY_CONCURRENCY = 2
+    keywords("twitter", {"keywords": ["startup idea"], "communities": ["busy", "quiet"]})
+    service = TwitterService()
+    service.client = FakeClient()
+    return service
+
+def test_communities_paginate_to_the_cutoff_and_adapt_to_activity(settings, keywords):
+    service = make_service(settings, keywords)
+    progress = []
+
+    posts = asyncio.run(service.get_matching_posts(on_progress=progress.append))
+
+    counts = {event["source"]: event["checked"] for event in progress}
+    assert counts == {"busy": 60, "quiet": 1}
+    assert len([post for post in posts if post.community == "busy"]) == 6
+    # busy needed two pages to reach back an hour, quiet one
+    assert sorted(service.client.requests) == [("busy", MAX_TWEET_PAGE_SIZE), ("next", MAX_TWEET_PAGE_SIZE), ("quiet", MAX_TWEET_PAGE_SIZE)]
+    assert service.tweet_rates["busy"] > 50 * service.tweet_rates["quiet"]
+
+    # Five minutes on, quiet is not due yet and busy only needs a small page
+    service.last_polled = {community: polled - timedelta(minutes=5) for community, polled in service.last_polled.items()}
+    service.client.requests = []
+    progress = []
+    asyncio.run(service.get_matching_posts(on_progress=progress.append))
+    assert service.client.requests == [("busy", MIN_TWEET_PAGE_SIZE)]
+    assert {event["source"] for event in progress} == {"busy", "quiet"}
+
+def test_failed_poll_is_retried_on_the_next_scan(settings, keywords):
+    service = make_service(settings, keywords)
+    asyncio.run(service.get_matching_posts())
+    polled = dict(service.last_polled)
+
+    async def unavailable(community_id, tweet_type, count):
+        raise ConnectionError("unreachable")
+
+    # A minute on, busy is due but its request fails; it stays due
+    service.last_polled = {community: at - timedelta(minutes=1) for community, at in polled.items()}
+    get_community_tweets = service.client.get_community_tweets
+    service.client.get_community_tweets = unavailable
+    asyncio.run(service.get_matching_posts())
+    assert service.last_polled["busy"] == polled["busy"] - timedelta(minutes=1)
+
+    service.client.get_community_tweets = get_community_tweets
+    service.client.requests = []
+    asyncio.run(service.get_matching_posts())
+    assert [community for community, _ in service.client.requests] == ["busy"]
+
+def test_page_limit_keeps_the_community_cutoff(settings, keywords):
+    settings.TWITTER_MAX_PAGES = 1
+    service = make_service(settings, keywords)
+    busy_cutoff = NOW - timedelta(minutes=90)
+    asyncio.run(service.watermarks.advance("twitter", "busy", busy_cutoff))
+
+    asyncio.run(service.get_matching_posts())
+
+    # One page of busy's tweets falls short of its cutoff, quiet's reaches it
+    assert asyncio.run(service.watermarks.get("twitter", "busy")) == busy_cutoff
+    assert asyncio.run(service.watermarks.get("twitter", "quiet")) == NOW - timedelta(minutes=30)
+
+def test_concurrent_reauthentication_logs_in_once(settings, keywords, tmp_path, monkeypatch):
+    logins = []
+
+    class LoginClient:
+        def __init__(self, language):
+            pass
+
+        async def login(self, auth_info_1, auth_info_2, password):
+            logins.append(auth_info_1)
+            await asyncio.sleep(0.01)
+
+        def save_cookies(self, path):
+            with open(path, "w") as f:
+                json.dump({}, f)
+
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(twitter_service, "Client", LoginClient)
+    service = make_service(settings, keywords)
+
+    async def run():
+        await asyncio.gather(*(service._reauthenticate() for _ in range(3)))
+
+    asyncio.run(run())
+    assert logins == ["test"]
+    assert isinstance(service.client, LoginClient)
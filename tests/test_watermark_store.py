@@ -0,0 +1,36 @@
+import asyncio
+from datetime import datetime, timedelta, timezone
+from app.services.watermark_store import WatermarkStore
+
+def test_watermarks_only_move_forward(tmp_path):
+    store = WatermarkStore(str(tmp_path / "state.db"), timedelta(days=1))
+    now = datetime.now(timezone.utc).replace(microsecond=0)
+    default = now - timedelta(minutes=5)
+
+    async def run():
+        assert await store.get("reddit", "r/SaaS") is None
+        assert await store.cutoff("reddit", "r/SaaS", default) == default
+
+        await store.advance("reddit", "r/SaaS", now - timedelta(hours=2))
+        await store.advance("reddit", "r/SaaS", now - timedelta(hours=3))
+        assert await store.get("reddit", "r/SaaS") == now - timedelta(hours=2)
+        # An older watermark than the interval widens the window to cover the gap
+        assert await store.cutoff("reddit", "r/SaaS", default) == now - timedelta(hours=2)
+        # Sources are tracked separately
+        assert await store.get("youtube", "r/SaaS") is None
+
+        await store.advance("reddit", "r/startups", now - timedelta(days=3))
+        cutoff = await store.cutoff("reddit", "r/startups", default)
+        assert now - timedelta(days=1, minutes=1) < cutoff < now - timedelta(hours=23)
+
+    asyncio.run(run())
+
+def test_disabled_store_keeps_default_cutoff(tmp_path):
+    store = WatermarkStore(str(tmp_path / "state.db"), timedelta(days=1), enabled=False)
+    default = datetime.now(timezone.utc)
+
+    async def run():
+        await store.advance("bluesky", "feed", default)
+        assert await store.cutoff("bluesky", "feed", default - timedelta(hours=1)) == default - timedelta(hours=1)
+
+    asyncio.run(run())
@@ -0,0 +1,143 @@
+import asyncio
+import pytest
+from datetime import datetime, timedelta, timezone
+from googleapiclient.errors import HttpError
+from httplib2 import Response
+from app.services import youtube_service
+from app.services.youtube_quota import QuotaBudget, QuotaExhausted
+from app.services.youtube_service import YouTubeService
+
+NOW = datetime.now(timezone.utc)
+
+class FakeRequest:
+    def __init__(self, response):
+        self.response = response
+
+    def execute(self, http=None):
+        return self.response
+
+class FlakyRequest:
+    """Fails with a 503 the first time it is executed"""
+    def __init__(self, response):
+        self.response = response
+        self.attempts = 0
+
+    def execute(self, http=None):
+        self.attempts += 1
+        if self.attempts == 1:
+            raise HttpError(Response({"status": 503}), b"backend error")
+        return self.response
+
+class FakeResource:
+    def __init__(self, api, handler):
+        self.api = api
+        self.handler = handler
+
+    def list(self, **params):
+        self.api.calls.append((self.handler.__name__, params))
+        return FakeRequest(self.handler(**params))
+
+class FakeYouTube:
+    """Two channels with two videos each; comment counts can be bumped between scans"""
+    def __init__(self):
+        self.calls = []
+        self.comment_counts = {"v1": 3, "v2": 0, "v3": 2, "v4": None}
+
+    def channels(self):
+        def channels(part, id, maxResults):
+            return {"items": [{"id": c, "contentDetails": {"relatedPlaylists": {"uploads": "UU" + c[2:]}}} for c in id.split(",")]}
+        return FakeResource(self, channels)
+
+    def playlistItems(self):
+        def playlistItems(part, playlistId, maxResults):
+            videos = {"UUone": ["v1", "v2"], "UUtwo": ["v3", "v4"]}[playlistId]
+            return {"items": [{"contentDetails": {"videoId": v}} for v in videos]}
+        return FakeResource(self, playlistItems)
+
+    def videos(self):
+        def videos(part, id, maxResults):
+            items = []
+            for video_id in id.split(","):
+                statistics = {} if self.comment_counts[video_id] is None else {"commentCount": str(self.comment_counts[video_id])}
+                items.append({"id": video_id, "snippet": {"title": f"Video {video_id}"}, "statistics": statistics})
+            return {"items": items}
+        return FakeResource(self, videos)
+
+    def commentThreads(self):
+        def commentThreads(part, videoId, maxResults, order, pageToken):
+            comments = [
+                {"snippet": {"topLevelComment": {"id": f"{videoId}c{n}", "snippet": {
+                    "textDisplay": "what's your startup idea" if n == 0 else "nice",
+                    "authorDisplayName": "viewer",
+                    "publishedAt": (NOW - timedelta(minutes=n + 1)).isoformat().replace("+00:00", "Z"),
+                }}}}
+                for n in range(self.comment_counts[videoId])
+            ]
+            return {"items": comments}
+        return FakeResource(self, commentThreads)
+
+def make_service(settings, keywords, monkeypatch):
+    settings.YOUTUBE_VIDEO_CONCURRENCY = 2
+    keywords("youtube", {"keywords": ["startup idea"], "channels": ["UCone", "UCtwo"]})
+    api = FakeYouTube()
+    monkeypatch.setattr(youtube_service, "build", lambda *args, **kwargs: api)
+    return YouTubeService()
+
+def test_uploads_crawl_batches_lookups_and_skips_unchanged_videos(settings, keywords, monkeypatch):
+    service = make_service(settings, keywords, monkeypatch)
+    api = service.youtube
+
+    posts = asyncio.run(service.get_matching_posts())
+    assert sorted(post.video_id for post in posts) == ["v1", "v3"]
+    assert [name for name, _ in api.calls] == [
+        "channels", "playlistItems", "playlistItems", "videos", "commentThreads", "commentThreads",
+    ]
+    assert asyncio.run(service.quota.used()) == 6
+    assert dict(api.calls)["videos"]["id"] == "v1,v2,v3,v4"
+
+    # Nothing changed: playlist ids are cached and no comments are paged
+    api.calls = []
+    api.comment_counts["v3"] = 3
+    asyncio.run(service.get_matching_posts())
+    assert [name for name, _ in api.calls] == ["playlistItems", "playlistItems", "videos", "commentThreads"]
+    assert api.calls[-1][1]["videoId"] == "v3"
+
+def test_scan_defers_videos_that_would_exceed_the_quota(settings, keywords, monkeypatch):
+    # Enough for the lookups and one comment page
+    settings.YOUTUBE_DAILY_QUOTA = 5
+    service = make_service(settings, keywords, monkeypatch)
+    progress = []
+
+    posts = asyncio.run(service.get_matching_posts(on_progress=progress.append))
+    assert len(posts) == 1
+    status = asyncio.run(service.quota.status())
+    assert status.remaining == 0 and status.refused_calls == 1
+    assert any(event["error"] and "quota exhausted" in event["error"] for event in progress)
+
+    # The deferred video is picked up once there is quota again
+    service.quota.daily_limit = 10000
+    service.youtube.calls = []
+    posts = asyncio.run(service.get_matching_posts())
+    assert len(posts) == 1
+    assert [params["videoId"] for name, params in service.youtube.calls if name == "commentThreads"] == [posts[0].video_id]
+
+
+def test_each_retried_attempt_is_charged(settings, keywords, monkeypatch):
+    settings.RETRY_ATTEMPTS = 1
+    settings.RETRY_BASE_DELAY_SECONDS = 0
+    service = make_service(settings, keywords, monkeypatch)
+    request = FlakyRequest({"items": []})
+
+    assert asyncio.run(service._execute("search.list", request)) == {"items": []}
+    assert request.attempts == 2
+    assert asyncio.run(service.quota.used()) == 200
+
+def test_quota_usage_survives_a_restart(settings):
+    asyncio.run(QuotaBudget(settings.STATE_DB_PATH, 150).acquire("search.list"))
+
+    # A new process sees what the last one spent today
+    restarted = QuotaBudget(settings.STATE_DB_PATH, 150)
+    assert asyncio.run(restarted.used()) == 100
+    with pytest.raises(QuotaExhausted):
+        asyncio.run(restarted.acquire("search.list"))
+    assert asyncio.run(restarted.used()) == 100